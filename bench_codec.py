@@ -0,0 +1,75 @@
+"""
+Micro-benchmark for the backend envelope codec: the string pipeline (encrypt_response / quote /
+json.dumps, res.text / decrypt_data / json.loads) against the bytes pipeline (encode_body,
+chunked EnvelopeDecoder). Reports best-of-N time and tracemalloc peak per payload size.
+
+    python bench_codec.py                      # 1 KB .. 32 MB
+    python bench_codec.py --sizes 1e6,1e7 --repeat 5
+"""
+import argparse
+import json
+import os
+import time
+import tracemalloc
+from urllib.parse import quote
+
+# enc_dec reads the AES key at import; a throwaway one is enough for timing
+os.environ.setdefault("AES_ENCRYPTION_KEY", os.urandom(16).hex())
+os.environ.setdefault("AES_ENCRYPTION_IV", os.urandom(16).hex())
+
+from enc_dec import STREAM_CHUNK_SIZE, decode_chunks, decrypt_data, encode_body, encrypt_response
+
+DEFAULT_SIZES = "1e3,1e5,1e6,1e7,3.2e7"
+
+def upload_payload(size: int) -> dict:
+    """A base64 file upload, like add_member_record."""
+    return {"userId": "u", "formData": {"reportTypeId": 1, "title": "scan", "file": "QUJD" * (size // 4), "originalName": "scan.pdf"}}
+
+def task_list_response(size: int) -> dict:
+    """A long task list, like /fetch_task_list."""
+    row = {"taskId": 123456, "memberName": "Member Name", "taskType": "call", "status": "pending", "dueDate": "2026-01-01"}
+    rows = max(1, size // len(json.dumps(row)))
+    return {"code": 200, "data": {"tasks": [dict(row, taskId=i) for i in range(rows)]}}
+
+def old_encode(data: dict) -> bytes:
+    return json.dumps({"encParams": quote(encrypt_response(json.dumps(data)), safe="")}).encode("utf-8")
+
+def old_decode(body: bytes) -> dict:
+    return json.loads(decrypt_data(body.decode("utf-8")))
+
+def new_decode(body: bytes) -> dict:
+    # chunks as they arrive from iter_content / aiter_bytes
+    return decode_chunks((body[i:i + STREAM_CHUNK_SIZE] for i in range(0, len(body), STREAM_CHUNK_SIZE)), len(body))
+
+def measure(fn, arg, repeat: int):
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn(arg)
+        best = min(best, time.perf_counter() - started)
+    tracemalloc.start()
+    fn(arg)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return best, peak
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default=DEFAULT_SIZES, help="comma-separated payload sizes in bytes")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'case':<8}{'size':>12}{'old ms':>12}{'new ms':>12}{'speedup':>9}{'old peak MB':>14}{'new peak MB':>14}")
+    for size in (int(float(s)) for s in args.sizes.split(",")):
+        payload = upload_payload(size)
+        assert encode_body(payload) == old_encode(payload)
+        response = encrypt_response(json.dumps(task_list_response(size))).encode("utf-8")
+        assert new_decode(response) == old_decode(response)
+        for case, old, new, arg in (("encode", old_encode, encode_body, payload), ("decode", old_decode, new_decode, response)):
+            old_time, old_peak = measure(old, arg, args.repeat)
+            new_time, new_peak = measure(new, arg, args.repeat)
+            print(f"{case:<8}{size:>12,}{old_time * 1000:>12.2f}{new_time * 1000:>12.2f}{old_time / new_time:>8.2f}x"
+                  f"{old_peak / 1e6:>14.1f}{new_peak / 1e6:>14.1f}")
+
+if __name__ == "__main__":
+    main()
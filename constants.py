@@ -1,13 +1,122 @@
-from enc_dec import make_request
+from enc_dec import make_request, make_request_async
+import asyncio
+import threading
+import time
 import tkinter as tk
+from typing import Optional
 from datetime import date, timedelta
 from tkinter import filedialog, messagebox
 import base64
 import os
 import mimetypes
-import concurrent.futures
+from name_index import NameIndex
+from entity_store import EntityStore
+from pagination import TASK_PAGE_SIZE, PagedRequest
+
+STATIC_REFRESH_INTERVAL = int(os.getenv("STATIC_REFRESH_INTERVAL", "3600"))
+STATIC_RETRY_INTERVAL = int(os.getenv("STATIC_RETRY_INTERVAL", "30"))
+# Optional service token so static data can load at startup, before any user connects
+STATIC_CONSTANTS_ACCESS_TOKEN = os.getenv("STATIC_CONSTANTS_ACCESS_TOKEN")
+
+def _build_static_group(name: str, response: dict) -> dict:
+    """Derived lookups for one static fetch."""
+    data = response.get("data", {}) if response else {}
+    if name == "service_categories":
+        servies_categories_list = [{"categoryName": c["categoryName"], "categoryId": c["categoryId"]} for c in data.get("categories", [])]
+        return {
+            "servies_categories_list": servies_categories_list,
+            "service_category_names": [category["categoryName"] for category in servies_categories_list],
+            "category_lookup": {entry["categoryName"]: entry["categoryId"] for entry in servies_categories_list},
+            "category_index": NameIndex((entry["categoryName"], entry["categoryId"]) for entry in servies_categories_list),
+        }
+    if name == "ticket_types":
+        ticket_types_list = [{"ticket_type": t["ticket_type"], "id": t["id"]} for t in data.get("ticketTypes", [])]
+        return {
+            "ticket_types_list": ticket_types_list,
+            "ticket_type_category_names": [ticket["ticket_type"] for ticket in ticket_types_list],
+            "ticket_type_lookup": {entry["ticket_type"]: entry["id"] for entry in ticket_types_list},
+            "ticket_type_index": NameIndex((entry["ticket_type"], entry["id"]) for entry in ticket_types_list),
+        }
+    if name == "streams":
+        streams_list = [{"streamName": c["label"], "streamId": c["value"]} for c in data.get("status", {}).get("Cancelled", [])]
+        return {
+            "streams_list": streams_list,
+            "stream_names": [stream["streamName"] for stream in streams_list],
+            "streams_lookup": {stream["streamName"]: stream["streamId"] for stream in streams_list},
+            "streams_index": NameIndex((stream["streamName"], stream["streamId"]) for stream in streams_list),
+        }
+    if name == "report_types":
+        return {
+            "report_type_names": [item.get('reportType') for item in data.get('reportTypes', []) if item.get('reportType')],
+            "report_type_lookup": {item.get('reportType'): item.get('reportTypeId') for item in data.get('reportTypes', []) if item.get('reportType') and item.get('reportTypeId')},
+            "report_type_index": NameIndex((item.get('reportType'), item.get('reportTypeId')) for item in data.get('reportTypes', []) if item.get('reportTypeId')),
+        }
+    if name == "conditions":
+        return {
+            "condition_names": [item.get('conditionName') for item in data.get('conditions', []) if item.get('conditionName')],
+            "condition_lookup": {item.get('conditionName'): item.get('conditionId') for item in data.get('conditions', []) if item.get('conditionName') and item.get('conditionId')},
+            "condition_index": NameIndex((item.get('conditionName'), item.get('conditionId')) for item in data.get('conditions', []) if item.get('conditionId')),
+        }
+    if name == "dismiss_reasons":
+        return {
+            "dismiss_reason_names": [item.get('dropdownLabel') for item in data.get('options', []) if item.get('dropdownLabel')],
+            "dismiss_reason_lookup": {item.get('dropdownLabel'): item.get('dropdownValue') for item in data.get('options', []) if item.get('dropdownLabel') and item.get('dropdownValue')},
+        }
+    if name == "complete_reasons":
+        return {
+            "complete_reason_names": [item.get('dropdownLabel') for item in data.get('options', []) if item.get('dropdownLabel')],
+            "complete_reason_lookup": {item.get('dropdownLabel'): item.get('dropdownValue') for item in data.get('options', []) if item.get('dropdownLabel') and item.get('dropdownValue')},
+        }
+    if name == "care_navigator_list":
+        return {
+            "care_navigator_names": [item.get('userName') for item in data.get('users', []) if item.get('userName')],
+            "care_navigator_lookup": {item.get('userName'): item.get('id') for item in data.get('users', []) if item.get('userName') and item.get('id')},
+            "care_navigator_index": NameIndex((item.get('userName'), item.get('id')) for item in data.get('users', []) if item.get('id')),
+            "current_cn": data.get("self", ""),
+        }
+    if name == "break_reasons":
+        return {"break_reason_names": [item.get('reason') for item in data.get('reasons', []) if item.get('reason')]}
+    raise KeyError(name)
+
+STATIC_GROUPS = ("service_categories", "ticket_types", "streams", "report_types", "conditions",
+                 "break_reasons", "dismiss_reasons", "complete_reasons", "care_navigator_list")
+STATIC_FIELDS = frozenset(field for group in STATIC_GROUPS for field in _build_static_group(group, {}))
+
+class StaticSnapshot:
+    """
+    Immutable set of static lookups from one load. Groups whose fetch failed keep the values of
+    the previous snapshot, so a partial outage never blanks lookups that were already good.
+    """
+
+    def __init__(self, results: dict, previous: Optional["StaticSnapshot"] = None):
+        failed = []
+        for group in STATIC_GROUPS:
+            response = results.get(group)
+            if response and "error" not in response:
+                fields = _build_static_group(group, response)
+            else:
+                failed.append(group)
+                fields = previous.group_fields(group) if previous else _build_static_group(group, {})
+            for field, value in fields.items():
+                object.__setattr__(self, field, value)
+        object.__setattr__(self, "failed_groups", tuple(failed))
+        object.__setattr__(self, "loaded_at", time.time())
+
+    def __setattr__(self, name, value):
+        raise AttributeError("StaticSnapshot is immutable; build a new one instead")
+
+    def group_fields(self, group: str) -> dict:
+        return {field: getattr(self, field) for field in _build_static_group(group, {})}
+
+    @classmethod
+    def empty(cls) -> "StaticSnapshot":
+        return cls({})
 
 class StaticConstants:
+    """
+    Process-wide holder of the current `StaticSnapshot`. Reloads build a new snapshot and swap the
+    reference in one assignment, so readers always see a complete, consistent set of lookups.
+    """
     _instance = None
 
     def __new__(cls, *args, **kwargs):
@@ -15,110 +124,219 @@ class StaticConstants:
             cls._instance = super().__new__(cls)
         return cls._instance
 
-    def __init__(self, access_token):
-        if not hasattr(self, 'loaded'):
+    def __init__(self, access_token=None):
+        if not hasattr(self, 'snapshot'):
             self.access_token = access_token
-            self.load_static_data()
-            self.loaded = True
-
-    def load_static_data(self):
-        print("Loading static constants for the first time...")
-        with concurrent.futures.ThreadPoolExecutor() as executor:
-            future_to_fetch = {
-                executor.submit(self.fetch_service_categories): "service_categories",
-                executor.submit(self.fetch_ticket_types): "ticket_types",
-                executor.submit(self.fetch_call_cancellation_streams): "streams",
-                executor.submit(self.fetch_report_types): "report_types",
-                executor.submit(self.fetch_conditions): "conditions",
-                executor.submit(self.fetch_break_reasons): "break_reasons",
-                executor.submit(self.fetch_dismiss_reasons): "dismiss_reasons",
-                executor.submit(self.fetch_complete_reasons): "complete_reasons",
-                executor.submit(self.fetch_care_navigator_list): "care_navigator_list"
-            }
-
-            results = {}
-            for future in concurrent.futures.as_completed(future_to_fetch):
-                fetch_name = future_to_fetch[future]
-                try:
-                    data = future.result()
-                    results[fetch_name] = data
-                except Exception as exc:
-                    print(f'{fetch_name} generated an exception: {exc}')
-
-        service_categories = results.get("service_categories", {})
-        self.servies_categories_list = [{"categoryName": c["categoryName"], "categoryId": c["categoryId"]} for c in service_categories.get("data", {}).get("categories", [])]
-        self.service_category_names = [category["categoryName"] for category in self.servies_categories_list]
-        self.category_lookup = {entry["categoryName"]: entry["categoryId"] for entry in self.servies_categories_list}
-
-        ticket_types = results.get("ticket_types", {})
-        self.ticket_types_list = [{"ticket_type": t["ticket_type"], "id": t["id"]} for t in ticket_types.get("data", {}).get("ticketTypes", [])]
-        self.ticket_type_category_names = [ticket["ticket_type"] for ticket in self.ticket_types_list]
-        self.ticket_type_lookup = {entry["ticket_type"]: entry["id"] for entry in self.ticket_types_list}
-
-        streams = results.get("streams", {})
-        self.streams_list = [{"streamName": c["label"], "streamId": c["value"]} for c in streams.get("data", {}).get("status", {}).get("Cancelled", [])]
-        self.stream_names = [stream["streamName"] for stream in self.streams_list]
-        self.streams_lookup = {stream["streamName"]: stream["streamId"] for stream in self.streams_list}
-
-        report_types = results.get("report_types", {})
-        self.report_type_names = [item.get('reportType') for item in report_types.get('data', {}).get('reportTypes', []) if item.get('reportType')]
-        self.report_type_lookup = {item.get('reportType'): item.get('reportTypeId') for item in report_types.get('data', {}).get('reportTypes', []) if item.get('reportType') and item.get('reportTypeId')}
-
-        conditions = results.get("conditions", {})
-        self.condition_names = [item.get('conditionName') for item in conditions.get('data', {}).get('conditions', []) if item.get('conditionName')]
-        self.condition_lookup = {item.get('conditionName'): item.get('conditionId') for item in conditions.get('data', {}).get('conditions', []) if item.get('conditionName') and item.get('conditionId')}
-
-        dismiss_reasons = results.get("dismiss_reasons", {})
-        self.dismiss_reason_names = [item.get('dropdownLabel') for item in dismiss_reasons.get('data', {}).get('options', []) if item.get('dropdownLabel')]
-        self.dismiss_reason_lookup = {item.get('dropdownLabel'): item.get('dropdownValue') for item in dismiss_reasons.get('data', {}).get('options', []) if item.get('dropdownLabel') and item.get('dropdownValue')}
-
-        complete_reasons = results.get("complete_reasons", {})
-        self.complete_reason_names = [item.get('dropdownLabel') for item in complete_reasons.get('data', {}).get('options', []) if item.get('dropdownLabel')]
-        self.complete_reason_lookup = {item.get('dropdownLabel'): item.get('dropdownValue') for item in complete_reasons.get('data', {}).get('options', []) if item.get('dropdownLabel') and item.get('dropdownValue')}
-
-        care_navigator_list = results.get("care_navigator_list", {})
-        self.care_navigator_names = [item.get('userName') for item in care_navigator_list.get('data', {}).get('users', []) if item.get('userName')]
-        self.care_navigator_lookup = {item.get('userName'): item.get('id') for item in care_navigator_list.get('data', {}).get('users', []) if item.get('userName') and item.get('id')}
-        self.current_cn = care_navigator_list.get("data", {}).get("self", "")
-
-        break_reasons = results.get("break_reasons", {})
-        self.break_reason_names = [item.get('reason') for item in break_reasons.get('data', {}).get('reasons', []) if item.get('reason')]
-
-    def fetch_service_categories(self):
+            self.snapshot = StaticSnapshot.empty()
+            self.loaded = False
+
+    def __getattr__(self, name):
+        # keep `static_constants.<lookup>` working for callers that read fields directly
+        if name in STATIC_FIELDS and "snapshot" in self.__dict__:
+            return getattr(self.__dict__["snapshot"], name)
+        raise AttributeError(name)
+
+    async def load_static_data(self) -> bool:
+        """
+        Fetch everything concurrently on the event loop, swap in the new snapshot, and report whether
+        every group loaded. Only `StaticConstantsRefresher` calls this, one load at a time.
+        """
+        print("Loading static constants...")
+        fetches = {
+            "service_categories": self.fetch_service_categories(),
+            "ticket_types": self.fetch_ticket_types(),
+            "streams": self.fetch_call_cancellation_streams(),
+            "report_types": self.fetch_report_types(),
+            "conditions": self.fetch_conditions(),
+            "break_reasons": self.fetch_break_reasons(),
+            "dismiss_reasons": self.fetch_dismiss_reasons(),
+            "complete_reasons": self.fetch_complete_reasons(),
+            "care_navigator_list": self.fetch_care_navigator_list(),
+        }
+        outputs = await asyncio.gather(*fetches.values(), return_exceptions=True)
+
+        results = {}
+        for fetch_name, data in zip(fetches, outputs):
+            if isinstance(data, Exception):
+                print(f'{fetch_name} generated an exception: {data}')
+            else:
+                results[fetch_name] = data
+
+        snapshot = StaticSnapshot(results, previous=self.snapshot)
+        self.snapshot = snapshot
+        self.loaded = self.loaded or len(snapshot.failed_groups) < len(STATIC_GROUPS)
+        if snapshot.failed_groups:
+            print(f"Static constants loaded with failures: {snapshot.failed_groups}")
+        return not snapshot.failed_groups
+
+    async def fetch_service_categories(self):
         endpoint_name = "/fetch_service_categories"
-        return make_request(endpoint_name=endpoint_name, data={}, access_token=self.access_token)
+        return await make_request_async(endpoint_name=endpoint_name, data={}, access_token=self.access_token)
 
-    def fetch_ticket_types(self):
+    async def fetch_ticket_types(self):
         endpoint_name = "/fetch_all_ticket_types"
-        return make_request(endpoint_name=endpoint_name, data={}, access_token=self.access_token)
+        return await make_request_async(endpoint_name=endpoint_name, data={}, access_token=self.access_token)
 
-    def fetch_call_cancellation_streams(self):
+    async def fetch_call_cancellation_streams(self):
         endpoint_name = "/fetch_call_status"
-        return make_request(endpoint_name=endpoint_name, data={}, access_token=self.access_token)
+        return await make_request_async(endpoint_name=endpoint_name, data={}, access_token=self.access_token)
 
-    def fetch_report_types(self):
+    async def fetch_report_types(self):
         endpoint_name = "/fetch_report_types"
-        return make_request(data={}, endpoint_name=endpoint_name, access_token=self.access_token)
+        return await make_request_async(data={}, endpoint_name=endpoint_name, access_token=self.access_token)
 
-    def fetch_conditions(self):
+    async def fetch_conditions(self):
         endpoint_name = "/fetch_conditions"
-        return make_request(data={}, endpoint_name=endpoint_name, access_token=self.access_token)
+        return await make_request_async(data={}, endpoint_name=endpoint_name, access_token=self.access_token)
 
-    def fetch_break_reasons(self):
+    async def fetch_break_reasons(self):
         endpoint_name = "/fetch_break_reasons"
-        return make_request(data={}, endpoint_name=endpoint_name, access_token=self.access_token)
+        return await make_request_async(data={}, endpoint_name=endpoint_name, access_token=self.access_token)
 
-    def fetch_dismiss_reasons(self):
+    async def fetch_dismiss_reasons(self):
         endpoint_name = "/fetch_dropdown_list"
-        return make_request(data={"settingKeyword": "taskdismissreasoncncall"}, endpoint_name=endpoint_name, access_token=self.access_token)
+        return await make_request_async(data={"settingKeyword": "taskdismissreasoncncall"}, endpoint_name=endpoint_name, access_token=self.access_token)
 
-    def fetch_complete_reasons(self):
+    async def fetch_complete_reasons(self):
         endpoint_name = "/fetch_dropdown_list"
-        return make_request(data={"settingKeyword": "taskcompletionmemberreachout"}, endpoint_name=endpoint_name, access_token=self.access_token)
+        return await make_request_async(data={"settingKeyword": "taskcompletionmemberreachout"}, endpoint_name=endpoint_name, access_token=self.access_token)
 
-    def fetch_care_navigator_list(self):
+    async def fetch_care_navigator_list(self):
         endpoint_name = "/care_navigator_list"
-        return make_request(data={"excludeCapacityExhausted": "", "excludeSelf": "", "hideReadOnly": "Y", "supervisor": ""}, endpoint_name=endpoint_name, access_token=self.access_token)
+        return await make_request_async(data={"excludeCapacityExhausted": "", "excludeSelf": "", "hideReadOnly": "Y", "supervisor": ""}, endpoint_name=endpoint_name, access_token=self.access_token)
+
+class StaticConstantsRefresher:
+    """
+    Background task that keeps `StaticConstants` fresh: loads at startup (when a token is known),
+    reloads every STATIC_REFRESH_INTERVAL seconds, and retries every STATIC_RETRY_INTERVAL
+    seconds while any group is failing. Loads run on the event loop through the async transport;
+    requests never wait on a refresh, only on the very first load attempt when nothing has been loaded yet.
+    """
+
+    def __init__(self, static_constants: StaticConstants, interval: int = STATIC_REFRESH_INTERVAL, retry_interval: int = STATIC_RETRY_INTERVAL):
+        self.static_constants = static_constants
+        self.interval = interval
+        self.retry_interval = retry_interval
+        self._task: Optional[asyncio.Task] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._ready: Optional[asyncio.Event] = None
+
+    def offer_token(self, access_token: Optional[str]) -> None:
+        """Use the most recent user token when no service token is configured (user tokens expire)."""
+        if not access_token or STATIC_CONSTANTS_ACCESS_TOKEN:
+            return
+        first = not self.static_constants.access_token
+        self.static_constants.access_token = access_token
+        if first and self._wakeup is not None:
+            self._wakeup.set()
+
+    async def start(self) -> None:
+        if self._task is None:
+            self._wakeup = asyncio.Event()
+            self._ready = asyncio.Event()
+            if STATIC_CONSTANTS_ACCESS_TOKEN:
+                self.static_constants.access_token = STATIC_CONSTANTS_ACCESS_TOKEN
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def wait_ready(self, timeout: float) -> None:
+        """Wait for the first load attempt (successful or not), at most `timeout` seconds."""
+        if self.static_constants.loaded or (self._ready is not None and self._ready.is_set()):
+            return
+        await self.start()
+        try:
+            await asyncio.wait_for(self._ready.wait(), timeout)
+        except asyncio.TimeoutError:
+            print("Static constants not ready yet; continuing with empty lookups")
+
+    async def _run(self) -> None:
+        while True:
+            if not self.static_constants.access_token:
+                await self._wakeup.wait()
+                self._wakeup.clear()
+                continue
+            try:
+                ok = await self.static_constants.load_static_data()
+            except Exception as exc:
+                print(f"Static constants refresh failed: {exc}")
+                ok = False
+            # the first attempt releases waiting requests even when it failed: they go ahead with
+            # whatever snapshot exists instead of each waiting out the timeout during an outage
+            self._ready.set()
+            await asyncio.sleep(self.interval if ok else self.retry_interval)
+
+def _failed_response(response) -> bool:
+    """An `{"error": ...}` from make_request (or a non-dict); kept out of group_results so it is retried."""
+    return response is not None and (not isinstance(response, dict) or "error" in response)
+
+def _build_dynamic_group(name: str, response: dict) -> dict:
+    """Derived per-member lookups for one lazily loaded group."""
+    data = response.get("data", {}) if response else {}
+    if name == "disenrollment_reasons":
+        disenrollment_reasons_list = [{"reason": r["reason"], "recordId": r["recordId"]} for r in data.get("reasons", [])]
+        return {
+            "disenrollment_reasons_list": disenrollment_reasons_list,
+            "reason_names": [reason["reason"] for reason in disenrollment_reasons_list],
+            "reason_lookup": {reason["reason"]: reason["recordId"] for reason in disenrollment_reasons_list},
+            "reason_index": NameIndex((reason["reason"], reason["recordId"]) for reason in disenrollment_reasons_list),
+        }
+    if name == "health_metric_details":
+        metrics_details_list = [{"metricsName": m["metricsName"], "metricsId": m["metricsId"], "keyword": m["keyword"], "unit": m["unit"]} for m in data.get("metrics", [])]
+        return {
+            "metrics_details_list": metrics_details_list,
+            "metric_name_unit_list": [{"metricsName": entry["metricsName"], "unit": entry["unit"]} for entry in metrics_details_list],
+            "metrics_index": NameIndex.from_records(metrics_details_list, "metricsName", alias_field="keyword"),
+        }
+    if name == "form_data_details":
+        return {
+            "city_names": [item.get('label') for item in data.get('city', []) if item.get('label')],
+            "city_lookup": {item.get('label'): item.get('value') for item in data.get('city', []) if item.get('label') and item.get('value')},
+            "city_index": NameIndex((item.get('label'), item.get('value')) for item in data.get('city', []) if item.get('value')),
+            "partner_names": [item.get('partnerName') for item in data.get('partner', []) if item.get('partnerName')],
+            "partner_lookup": {item.get('partnerName'): item.get('id') for item in data.get('partner', []) if item.get('partnerName') and item.get('id')},
+            "partner_index": NameIndex((item.get('partnerName'), item.get('id')) for item in data.get('partner', []) if item.get('id')),
+            "labtest_names": [item.get('label') for item in data.get('labTest', []) if item.get('label')],
+            "labtest_lookup": {item.get('label'): item.get('value') for item in data.get('labTest', []) if item.get('label') and item.get('value')},
+            "labtest_index": NameIndex((item.get('label'), item.get('value')) for item in data.get('labTest', []) if item.get('value')),
+        }
+    if name == "home_care_details":
+        return {
+            "hc_cat_names": [item.get('label') for item in data.get('category', []) if item.get('label')],
+            "hc_cat_lookup": {item.get('label'): item.get('categoryName') for item in data.get('category', []) if item.get('label') and item.get('categoryName')},
+            "hc_cat_index": NameIndex((item.get('label'), item.get('categoryName')) for item in data.get('category', []) if item.get('categoryName')),
+        }
+    if name == "home_base_details":
+        products = (data or {}).get('products') or []
+        return {
+            "hb_product_names": [item.get('label') for item in products if item.get('label')],
+            "hb_product_lookup": {item.get('label'): item.get('id') for item in products if item.get('label') and item.get('id')},
+            "hb_product_index": NameIndex((item.get('label'), item.get('id')) for item in products if item.get('id')),
+        }
+    if name == "insights":
+        return {"insights_7_days": data.get("insights", {})}
+    raise KeyError(name)
+
+DYNAMIC_GROUPS = ("disenrollment_reasons", "health_metric_details", "form_data_details", "home_care_details", "home_base_details", "insights")
+DYNAMIC_FIELDS = {field: group for group in DYNAMIC_GROUPS for field in _build_dynamic_group(group, {})}
+
+# listName accepted by the `member_option_lists` tool -> field holding the option names
+MEMBER_OPTION_LISTS = {
+    "disenrollment_reasons": "reason_names",
+    "health_metrics": "metric_name_unit_list",
+    "cities": "city_names",
+    "partner_clinics": "partner_names",
+    "lab_tests": "labtest_names",
+    "home_care_categories": "hc_cat_names",
+    "home_based_products": "hb_product_names",
+}
 
 class DynamicConstants:
     def __init__(self, user_id, access_token, cn_id, static_constants: StaticConstants):
@@ -126,46 +344,14 @@ class DynamicConstants:
         self.access_token = access_token
         self.cn_id = cn_id
         
-        # --- Inherit from StaticConstants ---
-        self.servies_categories_list = static_constants.servies_categories_list
-        self.service_category_names = static_constants.service_category_names
-        self.category_lookup = static_constants.category_lookup
-        self.ticket_types_list = static_constants.ticket_types_list
-        self.ticket_type_category_names = static_constants.ticket_type_category_names
-        self.ticket_type_lookup = static_constants.ticket_type_lookup
-        self.streams_list = static_constants.streams_list
-        self.stream_names = static_constants.stream_names
-        self.streams_lookup = static_constants.streams_lookup
-        self.report_type_names = static_constants.report_type_names
-        self.report_type_lookup = static_constants.report_type_lookup
-        self.condition_names = static_constants.condition_names
-        self.condition_lookup = static_constants.condition_lookup
-        self.dismiss_reason_names = static_constants.dismiss_reason_names
-        self.dismiss_reason_lookup = static_constants.dismiss_reason_lookup
-        self.complete_reason_names = static_constants.complete_reason_names
-        self.complete_reason_lookup = static_constants.complete_reason_lookup
-        self.care_navigator_names = static_constants.care_navigator_names
-        self.care_navigator_lookup = static_constants.care_navigator_lookup
-        self.current_cn = static_constants.current_cn
-        self.break_reason_names = static_constants.break_reason_names
+        # Static lookups are read through `static_constants.snapshot` (see __getattr__), so a
+        # background refresh reaches live sessions without rebuilding them.
+        self.static_constants = static_constants
         
         # --- Dynamic Properties ---
+        # Per-member lookups in DYNAMIC_FIELDS (reason_names, city_lookup, insights_7_days, ...)
+        # are not set here: each group loads on first access, once per session (see __getattr__).
         self.user_profile = None
-        self.disenrollment_reasons_list = []
-        self.reason_names = []
-        self.reason_lookup = {}
-        self.metrics_details_list = []
-        self.metric_name_unit_list = []
-        self.city_names = []
-        self.city_lookup = {}
-        self.partner_names = []
-        self.partner_lookup = {}
-        self.labtest_names = []
-        self.labtest_lookup = {}
-        self.hc_cat_names = []
-        self.hc_cat_lookup = {}
-        self.hb_product_names = []
-        self.hb_product_lookup = {}
         self.request_type_lookup = {
             "All": "all",
             "Medication Requests": "mr",
@@ -174,60 +360,76 @@ class DynamicConstants:
             "Home Based Vaccines": "hbv",
             "Telehealth Services": "ths"
         }
-        self.insights_7_days = {}
+        self.request_type_index = NameIndex(self.request_type_lookup.items())
+        # full lists cut by projection.project_tool_result, keyed by (tool name, list name)
+        self.result_pages = {}
+        self.group_results = {}  # raw backend response per loaded group
+        self.entities = EntityStore()  # profile, tickets, locker files, breaks, scheduled calls
+        self._group_locks = {group: threading.Lock() for group in DYNAMIC_GROUPS}
+
+    def __getattr__(self, name):
+        if name in STATIC_FIELDS and "static_constants" in self.__dict__:
+            return getattr(self.__dict__["static_constants"].snapshot, name)
+        if name in DYNAMIC_FIELDS and "_group_locks" in self.__dict__:
+            self.load_group(DYNAMIC_FIELDS[name])
+            if name in self.__dict__:
+                return self.__dict__[name]
+            # the fetch failed: empty lookups for now, the next access retries
+            return _build_dynamic_group(DYNAMIC_FIELDS[name], {})[name]
+        raise AttributeError(name)
+
+    def is_loaded(self, group: str) -> bool:
+        return group in self.group_results
+
+    def _fetch_group(self, group: str) -> dict:
+        if group == "insights":
+            return self.fetch_last_7days_task_insights()
+        return getattr(self, f"fetch_{group}")()
+
+    def load_group(self, group: str) -> None:
+        """Fetch and derive one group; concurrent callers wait for the same fetch instead of repeating it."""
+        if group in self.group_results:
+            return
+        with self._group_locks[group]:
+            if group in self.group_results:
+                return
+            try:
+                response = self._fetch_group(group)
+            except Exception as exc:
+                print(f'{group} generated an exception: {exc}')
+                return
+            if _failed_response(response):
+                print(f'{group} could not be loaded: {response}')
+                return
+            self.__dict__.update(_build_dynamic_group(group, response or {}))
+            self.group_results[group] = response or {}
 
     def load(self):
+        """
+        Session start: only the member profile is fetched up front. The 7-day insights (needed by
+        the greeting) are prefetched in the background; everything else loads on first use.
+        """
         self.user_profile = self.fetch_user_profile_details()
+        self.entities.put("profile", self.user_profile)
+        threading.Thread(target=self.load_group, args=("insights",), daemon=True).start()
+
+    def to_state(self) -> dict:
+        """JSON-safe snapshot of what was fetched for this member (static lookups are not included)."""
+        return {
+            "user_profile": self.user_profile,
+            "group_results": dict(self.group_results),
+            "result_pages": [[tool, name, items] for (tool, name), items in self.result_pages.items()],
+        }
 
-        with concurrent.futures.ThreadPoolExecutor() as executor:
-            future_to_fetch = {
-                executor.submit(self.fetch_disenrollment_reasons): "disenrollment_reasons",
-                executor.submit(self.fetch_health_metric_details): "health_metric_details",
-                executor.submit(self.fetch_form_data_details): "form_data_details",
-                executor.submit(self.fetch_home_care_details): "home_care_details",
-                executor.submit(self.fetch_home_base_details): "home_base_details",
-            }
+    def restore(self, state: dict) -> None:
+        """Rebuild from `to_state` output without hitting the backend; groups not in it still load lazily."""
+        self.user_profile = state.get("user_profile")
+        for group, response in (state.get("group_results") or {}).items():
+            if group in DYNAMIC_GROUPS and not _failed_response(response):
+                self.__dict__.update(_build_dynamic_group(group, response or {}))
+                self.group_results[group] = response or {}
+        self.result_pages = {(tool, name): items for tool, name, items in state.get("result_pages") or []}
 
-            results = {}
-            for future in concurrent.futures.as_completed(future_to_fetch):
-                fetch_name = future_to_fetch[future]
-                try:
-                    data = future.result()
-                    results[fetch_name] = data
-                except Exception as exc:
-                    print(f'{fetch_name} generated an exception: {exc}')
-
-        disenrollment_reasons = results.get("disenrollment_reasons", {})
-        self.disenrollment_reasons_list = [{"reason": r["reason"], "recordId": r["recordId"]} for r in disenrollment_reasons.get("data", {}).get("reasons", [])]
-        self.reason_names = [reason["reason"] for reason in self.disenrollment_reasons_list]
-        self.reason_lookup = {reason["reason"]: reason["recordId"] for reason in self.disenrollment_reasons_list}
-
-        health_metric_details = results.get("health_metric_details", {})
-        self.metrics_details_list = [{"metricsName": m["metricsName"], "metricsId": m["metricsId"], "keyword": m["keyword"], "unit": m["unit"]} for m in health_metric_details.get("data", {}).get("metrics", [])]
-        self.metric_name_unit_list = [{"metricsName": entry["metricsName"], "unit": entry["unit"]} for entry in self.metrics_details_list]
-
-        form_data_details = results.get("form_data_details", {})
-        self.city_names = [item.get('label') for item in form_data_details.get('data', {}).get('city', []) if item.get('label')]
-        self.city_lookup = {item.get('label'): item.get('value') for item in form_data_details.get('data', {}).get('city', []) if item.get('label') and item.get('value')}
-        self.partner_names = [item.get('partnerName') for item in form_data_details.get('data', {}).get('partner', []) if item.get('partnerName')]
-        self.partner_lookup = {item.get('partnerName'): item.get('id') for item in form_data_details.get('data', {}).get('partner', []) if item.get('partnerName') and item.get('id')}
-        self.labtest_names = [item.get('label') for item in form_data_details.get('data', {}).get('labTest', []) if item.get('label')]
-        self.labtest_lookup = {item.get('label'): item.get('value') for item in form_data_details.get('data', {}).get('labTest', []) if item.get('label') and item.get('value')}
-
-        home_care_details = results.get("home_care_details", {})
-        self.hc_cat_names = [item.get('label') for item in home_care_details.get('data', {}).get('category', []) if item.get('label')]
-        self.hc_cat_lookup = {item.get('label'): item.get('categoryName') for item in home_care_details.get('data', {}).get('category', []) if item.get('label') and item.get('categoryName')}
-
-        home_base_details = results.get("home_base_details", {})
-        if home_base_details and home_base_details.get('data') and home_base_details.get('data').get('products'):
-            self.hb_product_names = [item.get('label') for item in home_base_details.get('data', {}).get('products', []) if item.get('label')]
-            self.hb_product_lookup = {item.get('label'): item.get('id') for item in home_base_details.get('data', {}).get('products', []) if item.get('label') and item.get('id')}
-        else:
-            self.hb_product_names = []
-            self.hb_product_lookup = {}
-        
-        self.insights_7_days = self.fetch_last_7days_task_insights().get("data", {}).get("insights", {})
-    
     def select_file(self):
         root = tk.Tk()
         root.withdraw()
@@ -316,12 +518,15 @@ class DynamicConstants:
                 "searchCompletedBy": "",
                 "searchContract": "",
                 "calledFrom": "tasklist",
-                "page": 1,
-                "perPage": 1000,
                 "sortColumn": "",
                 "sortDirection": "asc",
                 "download": "N"
             }
-            return make_request(data=data, endpoint_name=endpoint_name, access_token=self.access_token)
+            # only the insights summary is used, so one page is enough and only the summary is kept
+            output = PagedRequest(endpoint_name, data, self.access_token, items_key="tasks",
+                                  per_page_key="perPage", per_page=TASK_PAGE_SIZE).first()
+            if not isinstance(output, dict) or "error" in output:
+                return output
+            return {"code": output.get("code"), "data": {"insights": (output.get("data") or {}).get("insights", {})}}
         except Exception as e:
             return {"error": "Sorry, I can't fetch care navigator's task list at the moment. Please try again later."}
@@ -0,0 +1,135 @@
+import json
+from abc import ABC, abstractmethod
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+# "memory" keeps state in this process only (single worker); "sqlite:///abs/path.db" or
+# "sqlite:relative.db" shares it between workers on the same host. Other backends (Redis, Postgres)
+# only need to implement load/save/delete.
+CONVERSATION_STORE = os.getenv("CONVERSATION_STORE", "memory")
+CONVERSATION_STORE_TTL = int(os.getenv("CONVERSATION_STORE_TTL", "86400"))
+CONVERSATION_STORE_MAX_ENTRIES = int(os.getenv("CONVERSATION_STORE_MAX_ENTRIES", "1000"))  # in-memory store only
+
+def store_key(key: tuple) -> str:
+    return "|".join(str(k) for k in key)
+
+class ConversationStore(ABC):
+    """
+    Serialized chat state (see `LLMChatSession.to_state`) keyed by the session registry key.
+    `shared` tells the caller whether another worker may have written a newer version.
+    """
+
+    shared = False
+
+    @abstractmethod
+    def load(self, key: str) -> Optional[Dict[str, Any]]:
+        ...
+
+    @abstractmethod
+    def save(self, key: str, state: Dict[str, Any]) -> None:
+        ...
+
+    @abstractmethod
+    def delete(self, key: str) -> None:
+        ...
+
+    def version(self, key: str) -> int:
+        state = self.load(key)
+        return int(state.get("version", 0)) if state else 0
+
+class InMemoryConversationStore(ConversationStore):
+    """
+    Process-local store; states are kept as JSON so behaviour matches the shared backends.
+    Entries are ordered by last save, which is also expiry order (fixed TTL), so expired entries
+    are dropped from the front on each save and the least recently saved one goes past `max_entries`.
+    """
+
+    def __init__(self, ttl: int = CONVERSATION_STORE_TTL, max_entries: int = CONVERSATION_STORE_MAX_ENTRIES):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._states: "OrderedDict[str, tuple]" = OrderedDict()  # key -> (expires_at, json)
+        self._lock = threading.Lock()
+
+    def load(self, key: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            entry = self._states.get(key)
+            if entry is None or entry[0] < time.time():
+                self._states.pop(key, None)
+                return None
+            return json.loads(entry[1])
+
+    def save(self, key: str, state: Dict[str, Any]) -> None:
+        encoded = json.dumps(state, default=str)
+        now = time.time()
+        with self._lock:
+            self._states[key] = (now + self.ttl, encoded)
+            self._states.move_to_end(key)
+            while self._states:
+                oldest, (expires_at, _) = next(iter(self._states.items()))
+                if expires_at >= now and len(self._states) <= self.max_entries:
+                    break
+                del self._states[oldest]
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._states.pop(key, None)
+
+class SQLiteConversationStore(ConversationStore):
+    """File-backed store for local multi-worker testing; every worker opens the same database file."""
+
+    shared = True
+
+    def __init__(self, path: str, ttl: int = CONVERSATION_STORE_TTL):
+        self.path = path
+        self.ttl = ttl
+        self._local = threading.local()
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS conversations ("
+                "key TEXT PRIMARY KEY, version INTEGER NOT NULL, state TEXT NOT NULL, expires_at REAL NOT NULL)"
+            )
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=10)
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn = conn
+        return conn
+
+    def load(self, key: str) -> Optional[Dict[str, Any]]:
+        row = self._connect().execute(
+            "SELECT state FROM conversations WHERE key = ? AND expires_at >= ?", (key, time.time())
+        ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def version(self, key: str) -> int:
+        row = self._connect().execute(
+            "SELECT version FROM conversations WHERE key = ? AND expires_at >= ?", (key, time.time())
+        ).fetchone()
+        return int(row[0]) if row else 0
+
+    def save(self, key: str, state: Dict[str, Any]) -> None:
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO conversations (key, version, state, expires_at) VALUES (?, ?, ?, ?)",
+                (key, int(state.get("version", 0)), json.dumps(state, default=str), time.time() + self.ttl),
+            )
+
+    def delete(self, key: str) -> None:
+        with self._connect() as conn:
+            conn.execute("DELETE FROM conversations WHERE key = ?", (key,))
+
+def build_conversation_store(spec: str = CONVERSATION_STORE) -> ConversationStore:
+    if spec.startswith("sqlite:"):
+        path = spec[len("sqlite:"):]
+        if path.startswith("//"):
+            path = path[2:]  # sqlite:///abs/path.db -> /abs/path.db
+        return SQLiteConversationStore(path or "conversations.db")
+    if spec != "memory":
+        print(f"[conversation_store] unknown CONVERSATION_STORE={spec!r}; using in-memory store")
+    return InMemoryConversationStore()
@@ -4,8 +4,16 @@ import base64
 import os
 from dotenv import load_dotenv
 import json
-from urllib.parse import quote
 import requests
+import httpx
+import asyncio
+import time
+
+import transport
+from response_cache import response_cache
+from resilience import RETRYABLE_STATUS, RetryPolicy, endpoint_group
+from single_flight import flight_key, single_flight
+import metrics
 
 load_dotenv()
 
@@ -43,34 +51,176 @@ def decrypt_data(encrypted_text: str) -> str:
 # result = decrypt_data(encrypted_text="ALNJa8IfeMc4937zj1RMzKb8+840b71pGDPO58SRZZkcneYuj7pGfJ+1nvFbJTrG4F8/OQ52gZjb+ZGsFo0i4A==")
 # print(result)
 
-def make_request(endpoint_name: str, data, access_token: str) -> dict[str, object]:
+# base64 alphabet; anything else in a response body (quotes, newlines) is skipped like b64decode does
+_B64_CHARS = b"ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789+/="
+_NOT_B64 = bytes(b for b in range(256) if b not in _B64_CHARS)
+_SEPARATORS = (b'"', b"\n", b"\r", b" ", b"\\")  # what a body can carry besides base64
+# quote(..., safe='') of base64 only ever rewrites these three characters
+_URL_QUOTED = ((b"+", b"%2B"), (b"/", b"%2F"), (b"=", b"%3D"))
+STREAM_CHUNK_SIZE = 256 * 1024
+
+def encode_body(data) -> bytes:
     """
-    make request to get actual response for all the tools
+    Request body `{"encParams": "<url-quoted base64 AES-CBC ciphertext>"}` built on bytes: the
+    ciphertext is written into one preallocated buffer and only the last block is padded.
+    A CBC cipher object carries chaining state, so each message gets a new one.
     """
-    # BASE_URL1 = "https://apiv6.goqii.com/carenavigator"
+    plain = json.dumps(data).encode("utf-8")
+    whole = len(plain) - len(plain) % AES.block_size
+    pad_len = AES.block_size - len(plain) % AES.block_size
+    encrypted = bytearray(whole + AES.block_size)
+    out = memoryview(encrypted)
+    cipher = AES.new(KEY, AES.MODE_CBC, IV)
+    if whole:
+        cipher.encrypt(memoryview(plain)[:whole], output=out[:whole])
+    cipher.encrypt(plain[whole:] + bytes([pad_len]) * pad_len, output=out[whole:])
+    encoded = base64.b64encode(encrypted)
+    for char, quoted in _URL_QUOTED:
+        encoded = encoded.replace(char, quoted)
+    return b'{"encParams": "' + encoded + b'"}'
+
+class EnvelopeDecoder:
+    """
+    Incremental base64 -> AES-CBC decrypt -> unpad for a response body fed in chunks of any size,
+    so a large body is decrypted while it downloads and never held as text. With `size_hint`
+    (the Content-Length) the plaintext buffer is allocated once and decrypted into in place.
+    The last cipher block is held back until `finish()`, which strips the padding.
+    """
+
+    def __init__(self, size_hint: int = 0):
+        self._cipher = AES.new(KEY, AES.MODE_CBC, IV)
+        self._b64 = bytearray()          # base64 characters short of a 4-character group
+        self._encrypted = bytearray()    # ciphertext not decrypted yet
+        self._plain = bytearray(size_hint * 3 // 4)
+        self._size = 0
+
+    def feed(self, chunk: bytes) -> None:
+        if any(sep in chunk for sep in _SEPARATORS):
+            chunk = chunk.translate(None, _NOT_B64)
+        self._b64 += chunk
+        ready = len(self._b64) - len(self._b64) % 4
+        if ready:
+            with memoryview(self._b64) as b64:
+                self._encrypted += base64.b64decode(b64[:ready])
+            del self._b64[:ready]
+            self._decrypt(((len(self._encrypted) - 1) // AES.block_size) * AES.block_size)
+
+    def _decrypt(self, size: int) -> None:
+        if size <= 0:
+            return
+        with memoryview(self._encrypted) as encrypted:
+            if self._size + size <= len(self._plain):
+                with memoryview(self._plain) as plain:
+                    self._cipher.decrypt(encrypted[:size], output=plain[self._size:self._size + size])
+            else:
+                del self._plain[self._size:]
+                self._plain += self._cipher.decrypt(encrypted[:size])
+        self._size += size
+        del self._encrypted[:size]
+
+    def finish(self) -> bytearray:
+        if self._b64:
+            self._encrypted += base64.b64decode(bytes(self._b64))
+            self._b64.clear()
+        if not self._encrypted or len(self._encrypted) % AES.block_size:
+            raise ValueError("ciphertext is not a whole number of AES blocks")
+        self._decrypt(len(self._encrypted))
+        del self._plain[self._size:]
+        pad_len = self._plain[-1]
+        if not 1 <= pad_len <= AES.block_size or self._plain[-pad_len:] != bytes([pad_len]) * pad_len:
+            raise ValueError("invalid padding in decrypted response")
+        del self._plain[-pad_len:]
+        plain, self._plain = self._plain, bytearray()
+        return plain
+
+def _content_length(res) -> int:
+    try:
+        return int(res.headers.get("Content-Length") or 0)
+    except ValueError:
+        return 0
+
+def decode_chunks(chunks, size_hint: int = 0) -> dict:
+    decoder = EnvelopeDecoder(size_hint)
+    for chunk in chunks:
+        decoder.feed(chunk)
+    # decode first so the plaintext buffer is freed before parsing allocates the objects
+    return json.loads(decoder.finish().decode("utf-8"))
+
+async def adecode_chunks(chunks, size_hint: int = 0) -> dict:
+    decoder = EnvelopeDecoder(size_hint)
+    async for chunk in chunks:
+        decoder.feed(chunk)
+    return json.loads(decoder.finish().decode("utf-8"))
+
+def decode_body(body: bytes) -> dict:
+    return decode_chunks((body,), len(body))
+
+def _build_request(endpoint_name: str, data, access_token: str):
     url = BASE_URL + endpoint_name
     headers = {
         "Content-Type": "application/json",
         "Authorization": access_token
     }
+    return url, encode_body(data), headers
 
-    json_str = json.dumps(data)
-    print(json_str)
-    encrypted = encrypt_response(json_str)
-    encoded = quote(encrypted, safe='')
+def _is_read(endpoint_name: str) -> bool:
+    return endpoint_name.startswith("/fetch_")
 
-    payload = {
-        "encParams": encoded
-    }
+def _retry_policy(endpoint_name: str) -> RetryPolicy:
+    # only reads are retried; a write may have landed even when the response was lost
+    return RetryPolicy(endpoint_group(endpoint_name), idempotent=_is_read(endpoint_name))
+
+def make_request(endpoint_name: str, data, access_token: str) -> dict[str, object]:
+    """
+    make request to get actual response for all the tools
+    """
+    # BASE_URL1 = "https://apiv6.goqii.com/carenavigator"
+    cached = response_cache.get(endpoint_name, data, access_token)
+    if cached is not None:
+        return cached
+    if _is_read(endpoint_name):
+        # identical reads already in flight (e.g. every session loading at shift start) share one upstream call
+        return single_flight.do(flight_key(endpoint_name, data, access_token),
+                                lambda: _send_request(endpoint_name, data, access_token))
+    return _send_request(endpoint_name, data, access_token)
+
+def _send_request(endpoint_name: str, data, access_token: str) -> dict[str, object]:
+    started = time.perf_counter()
+    output = _post_envelope(endpoint_name, data, access_token)
+    metrics.record_backend(endpoint_name, time.perf_counter() - started, output)
+    return output
+
+def _post_envelope(endpoint_name: str, data, access_token: str) -> dict[str, object]:
+    policy = _retry_policy(endpoint_name)
+    if not policy.allow():
+        return policy.open_error()
+    url, body, headers = _build_request(endpoint_name, data, access_token)
+    res = None
 
     try:
-        res = requests.post(url, json=payload, headers=headers)
+        while True:
+            try:
+                res = transport.post(url, content=body, headers=headers, stream=True)
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+                delay = policy.failed(e)
+                if delay is None:
+                    raise
+                time.sleep(delay)
+                continue
+            if res.status_code not in RETRYABLE_STATUS:
+                policy.succeeded()
+                break
+            delay = policy.failed(res)
+            if delay is None:
+                break
+            res.close()
+            time.sleep(delay)
         res.raise_for_status()
         # print("Raw encrypted response:", res.text)
 
-        decrypted = decrypt_data(res.text)
-        # print("Decrypted JSON string:", decrypted)
-        return json.loads(decrypted)
+        output = decode_chunks(res.iter_content(STREAM_CHUNK_SIZE), _content_length(res))
+        response_cache.put(endpoint_name, data, output, access_token)
+        return output
     
     except requests.exceptions.RequestException as e:
         print("API request failed:", e)
@@ -78,4 +228,79 @@ def make_request(endpoint_name: str, data, access_token: str) -> dict[str, objec
     
     except json.JSONDecodeError as e:
         # print("Decryption failed or invalid JSON:", e)
-        return {"error": "Invalid JSON from decrypted response", "raw": decrypted}
+        return {"error": "Invalid JSON from decrypted response", "raw": e.doc}
+
+    except ValueError as e:
+        print(f"decrypt_data Exception: {e}")
+        return {"error": "Could not decrypt the response"}
+
+    finally:
+        if res is not None:
+            res.close()
+        # a mutation may have landed even if the response was unusable
+        response_cache.invalidate_for(endpoint_name, data)
+
+async def make_request_async(endpoint_name: str, data, access_token: str) -> dict[str, object]:
+    """
+    async variant of `make_request` for callers already on the event loop (async tools, the static
+    constants refresh); same cache, single-flight and retry policy, on the pooled httpx client
+    """
+    cached = response_cache.get(endpoint_name, data, access_token)
+    if cached is not None:
+        return cached
+    if _is_read(endpoint_name):
+        return await single_flight.ado(flight_key(endpoint_name, data, access_token),
+                                       lambda: _send_request_async(endpoint_name, data, access_token))
+    return await _send_request_async(endpoint_name, data, access_token)
+
+async def _send_request_async(endpoint_name: str, data, access_token: str) -> dict[str, object]:
+    started = time.perf_counter()
+    output = await _apost_envelope(endpoint_name, data, access_token)
+    metrics.record_backend(endpoint_name, time.perf_counter() - started, output)
+    return output
+
+async def _apost_envelope(endpoint_name: str, data, access_token: str) -> dict[str, object]:
+    policy = _retry_policy(endpoint_name)
+    if not policy.allow():
+        return policy.open_error()
+    url, body, headers = _build_request(endpoint_name, data, access_token)
+    res = None
+
+    try:
+        while True:
+            try:
+                res = await transport.apost(url, content=body, headers=headers, stream=True)
+            except httpx.TransportError as e:
+                delay = policy.failed(e)
+                if delay is None:
+                    raise
+                await asyncio.sleep(delay)
+                continue
+            if res.status_code not in RETRYABLE_STATUS:
+                policy.succeeded()
+                break
+            delay = policy.failed(res)
+            if delay is None:
+                break
+            await res.aclose()
+            await asyncio.sleep(delay)
+        res.raise_for_status()
+        output = await adecode_chunks(res.aiter_bytes(STREAM_CHUNK_SIZE), _content_length(res))
+        response_cache.put(endpoint_name, data, output, access_token)
+        return output
+
+    except httpx.HTTPError as e:
+        print("API request failed:", e)
+        return {"error": str(e)}
+
+    except json.JSONDecodeError as e:
+        return {"error": "Invalid JSON from decrypted response", "raw": e.doc}
+
+    except ValueError as e:
+        print(f"decrypt_data Exception: {e}")
+        return {"error": "Could not decrypt the response"}
+
+    finally:
+        if res is not None:
+            await res.aclose()
+        response_cache.invalidate_for(endpoint_name, data)
@@ -0,0 +1,105 @@
+import copy
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from name_index import normalize_name
+import metrics
+
+# How long a fetched entity may stand in for a new fetch inside a tool (explicit list tools always refetch)
+ENTITY_STORE_TTL = float(os.getenv("ENTITY_STORE_TTL", "60"))
+
+ENTITY_KINDS = ("profile", "tickets", "locker_files", "breaks", "scheduled_calls")
+
+# Mutating tool -> entities it makes stale; (kind, arg) drops only the entry keyed by that argument
+INVALIDATED_BY: Dict[str, tuple] = {
+    "assign_program": ("profile",),
+    "stop_condition": ("profile",),
+    "restart_condition": ("profile",),
+    "remove_condition": ("profile",),
+    "change_pathway": ("profile",),
+    "disenroll_member": ("profile",),
+    "raise_new_ticket": ("tickets",),
+    "add_comment_on_ticket": ("tickets",),
+    "add_member_record": (("locker_files", "reportType"),),
+    "remove_specific_record": (("locker_files", "reportType"),),
+    "add_break": ("breaks",),
+    "delete_break": ("breaks",),
+    "cancel_or_reschedule_call": ("scheduled_calls",),
+    "schedule_call_with_cn": ("scheduled_calls",),
+}
+
+def _usable(value: Any) -> bool:
+    return value is not None and not (isinstance(value, dict) and "error" in value)
+
+class EntityStore:
+    """
+    Per-session snapshot of member entities the tools resolve names against (profile, tickets,
+    locker files per report type, breaks, scheduled calls). Values are copied in and out, so the
+    store never shares objects with tool results.
+    """
+
+    def __init__(self, ttl: float = ENTITY_STORE_TTL):
+        self.ttl = ttl
+        self._entries: Dict[Tuple[str, str], Tuple[float, Any]] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    @staticmethod
+    def _key(kind: str, key: Any) -> Tuple[str, str]:
+        return kind, normalize_name(key) if key is not None else ""
+
+    def get(self, kind: str, key: Any = None) -> Optional[Any]:
+        """A copy of the entity if it was stored within the TTL, else None."""
+        with self._lock:
+            entry = self._entries.get(self._key(kind, key))
+            if entry is None or entry[0] < time.monotonic():
+                self.misses += 1
+                metrics.entity_lookups.inc(result="miss")
+                return None
+            self.hits += 1
+            value = entry[1]
+        metrics.entity_lookups.inc(result="hit")
+        return copy.deepcopy(value)
+
+    def put(self, kind: str, value: Any, key: Any = None) -> None:
+        if not _usable(value):
+            return
+        with self._lock:
+            self._entries[self._key(kind, key)] = (time.monotonic() + self.ttl, copy.deepcopy(value))
+
+    def fetch(self, kind: str, loader: Callable[[], Any], key: Any = None) -> Any:
+        """The fresh stored entity, or `loader()` (stored when it is not an error)."""
+        value = self.get(kind, key)
+        if value is None:
+            value = loader()
+            self.put(kind, value, key)
+        return value
+
+    def invalidate(self, kind: str, key: Any = None) -> None:
+        """Drop one keyed entry, or every entry of `kind` when no key is given."""
+        with self._lock:
+            if key is not None:
+                dropped = [self._key(kind, key)] if self._key(kind, key) in self._entries else []
+            else:
+                dropped = [k for k in self._entries if k[0] == kind]
+            for k in dropped:
+                del self._entries[k]
+            self.invalidations += len(dropped)
+
+    def invalidate_after(self, tool_name: str, args: Optional[dict] = None) -> None:
+        """Called after every tool run; mutations invalidate even when they failed (they may have landed)."""
+        for target in INVALIDATED_BY.get(tool_name, ()):
+            if isinstance(target, tuple):
+                kind, arg = target
+                self.invalidate(kind, (args or {}).get(arg))
+            else:
+                self.invalidate(target)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"entries": len(self._entries), "hits": self.hits, "misses": self.misses,
+                    "invalidations": self.invalidations}
@@ -0,0 +1,116 @@
+import asyncio
+import math
+import os
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Optional
+
+# Opt-in: a duplicate request is sent when the first one is slower than the recent
+# LLM_HEDGE_PERCENTILE latency; the first response wins and the other is cancelled.
+LLM_HEDGE_ENABLED = os.getenv("LLM_HEDGE_ENABLED", "0") == "1"
+LLM_HEDGE_PERCENTILE = float(os.getenv("LLM_HEDGE_PERCENTILE", "95"))
+LLM_HEDGE_BUDGET = float(os.getenv("LLM_HEDGE_BUDGET", "0.05"))        # max hedges as a fraction of requests
+LLM_HEDGE_MIN_DELAY = float(os.getenv("LLM_HEDGE_MIN_DELAY", "0.5"))   # never hedge sooner than this
+LLM_HEDGE_MIN_SAMPLES = int(os.getenv("LLM_HEDGE_MIN_SAMPLES", "20"))  # no hedging until latency is known
+HEDGE_WINDOW = 300  # seconds of traffic the budget is measured over
+
+class LatencyTracker:
+    """Latencies of the most recent calls, for percentile-based hedge delays."""
+
+    def __init__(self, size: int = 500):
+        self.samples: Deque[float] = deque(maxlen=size)
+
+    def record(self, seconds: float) -> None:
+        self.samples.append(seconds)
+
+    def percentile(self, p: float) -> Optional[float]:
+        if not self.samples:
+            return None
+        ordered = sorted(self.samples)
+        index = min(len(ordered) - 1, max(0, math.ceil(p / 100 * len(ordered)) - 1))
+        return ordered[index]
+
+class HedgeBudget:
+    """Allows a hedge only while hedges stay under `ratio` of the requests seen in the window."""
+
+    def __init__(self, ratio: float = LLM_HEDGE_BUDGET, window: float = HEDGE_WINDOW):
+        self.ratio = ratio
+        self.window = window
+        self._requests: Deque[float] = deque()
+        self._hedges: Deque[float] = deque()
+
+    def _trim(self, now: float) -> None:
+        for stamps in (self._requests, self._hedges):
+            while stamps and stamps[0] < now - self.window:
+                stamps.popleft()
+
+    def record_request(self) -> None:
+        self._requests.append(time.monotonic())
+
+    def allows_hedge(self) -> bool:
+        self._trim(time.monotonic())
+        return len(self._hedges) + 1 <= self.ratio * len(self._requests)
+
+    def record_hedge(self) -> None:
+        self._hedges.append(time.monotonic())
+
+class Hedger:
+    def __init__(self, enabled: bool = LLM_HEDGE_ENABLED, percentile: float = LLM_HEDGE_PERCENTILE,
+                 min_delay: float = LLM_HEDGE_MIN_DELAY, min_samples: int = LLM_HEDGE_MIN_SAMPLES,
+                 budget: Optional[HedgeBudget] = None):
+        self.enabled = enabled
+        self.percentile = percentile
+        self.min_delay = min_delay
+        self.min_samples = min_samples
+        self.latency = LatencyTracker()
+        self.budget = budget or HedgeBudget()
+        self.hedged = 0
+        self.hedge_wins = 0
+
+    def hedge_delay(self) -> Optional[float]:
+        if not self.enabled or len(self.latency.samples) < self.min_samples:
+            return None
+        return max(self.min_delay, self.latency.percentile(self.percentile) or 0.0)
+
+    async def run(self, factory: Callable[[], Awaitable[Any]], hedge_factory: Optional[Callable[[], Awaitable[Any]]] = None,
+                  can_hedge: Optional[Callable[[], bool]] = None,
+                  on_discard: Optional[Callable[[Any], Awaitable[None]]] = None) -> Any:
+        """
+        Await `factory()`; if it is still running after the hedge delay (and the budget and
+        `can_hedge` allow), race it against `hedge_factory()`. The loser is cancelled, or handed to
+        `on_discard` if it finished too. Errors only surface once both attempts have failed.
+        """
+        self.budget.record_request()
+        started = time.monotonic()
+        primary = asyncio.ensure_future(factory())
+        tasks = [primary]
+        try:
+            delay = self.hedge_delay()
+            if delay is not None:
+                await asyncio.wait({primary}, timeout=delay)
+                if not primary.done() and self.budget.allows_hedge() and (can_hedge is None or can_hedge()):
+                    self.budget.record_hedge()
+                    self.hedged += 1
+                    print(f"[hedge] no response after {delay:.2f}s; sending a hedged request")
+                    tasks.append(asyncio.ensure_future((hedge_factory or factory)()))
+            pending = set(tasks)
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                winner = next((t for t in tasks if t in done and not t.cancelled() and t.exception() is None), None)
+                if winner is not None:
+                    self.latency.record(time.monotonic() - started)
+                    if winner is not primary:
+                        self.hedge_wins += 1
+                    for t in tasks:
+                        if t is not winner and t.done() and not t.cancelled() and t.exception() is None and on_discard:
+                            await on_discard(t.result())
+                    return winner.result()
+            return primary.result()  # every attempt failed: raise the primary's error
+        finally:
+            for t in tasks:
+                if not t.done():
+                    t.cancel()
+                elif not t.cancelled():
+                    t.exception()  # mark a losing failure as retrieved
+
+hedger = Hedger()
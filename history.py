@@ -0,0 +1,94 @@
+import json
+import os
+from typing import Any, Dict, List
+
+from google.genai import types
+
+HISTORY_TOKEN_BUDGET = int(os.getenv("HISTORY_TOKEN_BUDGET", "24000"))
+HISTORY_KEEP_RECENT_TURNS = int(os.getenv("HISTORY_KEEP_RECENT_TURNS", "3"))
+CHARS_PER_TOKEN = 4  # rough Gemini ratio for English/JSON; counting locally avoids a count_tokens round trip
+SUMMARY_MAX_KEYS = 12
+
+def _part_chars(part: types.Part) -> int:
+    if getattr(part, "text", None):
+        return len(part.text)
+    if getattr(part, "function_call", None):
+        return len(part.function_call.name or "") + len(json.dumps(part.function_call.args or {}, default=str))
+    if getattr(part, "function_response", None):
+        return len(part.function_response.name or "") + len(json.dumps(part.function_response.response or {}, default=str))
+    return 0
+
+def estimate_tokens(content: types.Content) -> int:
+    return sum(_part_chars(p) for p in (content.parts or [])) // CHARS_PER_TOKEN + 1
+
+def _summarize(value: Any, depth: int = 0) -> Any:
+    """Shape-preserving digest of a tool payload: scalars kept (truncated), lists reduced to their length."""
+    if isinstance(value, dict):
+        if depth >= 2:
+            return f"<object with {len(value)} fields>"
+        out = {k: _summarize(v, depth + 1) for k, v in list(value.items())[:SUMMARY_MAX_KEYS]}
+        if len(value) > SUMMARY_MAX_KEYS:
+            out["..."] = f"{len(value) - SUMMARY_MAX_KEYS} more fields"
+        return out
+    if isinstance(value, list):
+        return f"<{len(value)} items>"
+    if isinstance(value, str) and len(value) > 120:
+        return value[:120] + "..."
+    return value
+
+def _is_user_turn(content: types.Content) -> bool:
+    return content.role == "user" and any(getattr(p, "text", None) for p in (content.parts or []))
+
+class HistoryManager:
+    """
+    Keeps `LLMChatSession.contents` under a token budget. The most recent turns stay verbatim;
+    older tool responses are replaced by compact summaries and, if still over budget,
+    the oldest whole turns are dropped (whole turns keep function call/response pairs intact).
+    """
+
+    def __init__(self, token_budget: int = HISTORY_TOKEN_BUDGET, keep_recent_turns: int = HISTORY_KEEP_RECENT_TURNS):
+        self.token_budget = token_budget
+        self.keep_recent_turns = max(1, keep_recent_turns)
+
+    def total_tokens(self, contents: List[types.Content]) -> int:
+        return sum(estimate_tokens(c) for c in contents)
+
+    def _turn_starts(self, contents: List[types.Content]) -> List[int]:
+        return [i for i, c in enumerate(contents) if _is_user_turn(c)]
+
+    def _compact_responses(self, contents: List[types.Content], end: int) -> None:
+        for i in range(end):
+            content = contents[i]
+            if content.role != "function":
+                continue
+            parts = []
+            for p in content.parts or []:
+                fr = getattr(p, "function_response", None)
+                if fr and not (fr.response or {}).get("_compacted"):
+                    summary: Dict[str, Any] = {"_compacted": True, "note": "older tool result summarised; call the tool again for full data"}
+                    summary["summary"] = _summarize(fr.response or {})
+                    p = types.Part.from_function_response(name=fr.name, response=summary)
+                parts.append(p)
+            contents[i] = types.Content(role=content.role, parts=parts)
+
+    def compact(self, contents: List[types.Content]) -> None:
+        """Compact `contents` in place so the next request fits the budget."""
+        if self.total_tokens(contents) <= self.token_budget:
+            return
+        starts = self._turn_starts(contents)
+        if len(starts) > self.keep_recent_turns:
+            self._compact_responses(contents, starts[-self.keep_recent_turns])
+
+        # drop oldest turns, never the current one
+        while self.total_tokens(contents) > self.token_budget:
+            starts = self._turn_starts(contents)
+            if len(starts) < 2:
+                break
+            del contents[:starts[1]]
+
+        # a single oversized turn: summarise all but the latest tool results
+        if self.total_tokens(contents) > self.token_budget:
+            last_function = max((i for i, c in enumerate(contents) if c.role == "function"), default=None)
+            if last_function is not None:
+                self._compact_responses(contents, last_function)
+        print(f"[history] compacted to {len(contents)} messages, ~{self.total_tokens(contents)} tokens")
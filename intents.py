@@ -0,0 +1,136 @@
+import os
+import re
+from datetime import date, timedelta
+from typing import Any, Callable, Dict, List, Optional
+
+from tool_router import member_selected
+
+# Formulaic requests answered by calling the mapped tool directly, without a Gemini round trip
+FAST_PATH_ENABLED = os.getenv("FAST_PATH_ENABLED", "1") == "1"
+MAX_RENDERED_ITEMS = 10
+
+def week_start(today: Optional[date] = None) -> date:
+    """Monday of the current week; the member context gives the model the same date for "this week"."""
+    today = today or date.today()
+    return today - timedelta(days=today.weekday())
+
+_FILLER = re.compile(r"\b(please|pls|kindly|can you|could you|would you|for me|navi)\b")
+
+def normalize(message: str) -> str:
+    text = (message or "").lower().replace("’", "'")
+    text = _FILLER.sub(" ", text)
+    text = re.sub(r"[^\w' ]+", " ", text)
+    return " ".join(text.split())
+
+def _label(key: str) -> str:
+    return re.sub(r"(?<!^)(?=[A-Z])", " ", key).replace("_", " ").strip().capitalize()
+
+def _first_list(value: Any) -> Optional[list]:
+    if isinstance(value, list):
+        return value
+    if isinstance(value, dict):
+        for v in value.values():
+            found = _first_list(v)
+            if found is not None:
+                return found
+    return None
+
+def _scalars(item: dict, fields: Optional[List[str]] = None, limit: int = 4) -> List[str]:
+    keys = [k for k in (fields or []) if item.get(k) not in (None, "")] or \
+           [k for k, v in item.items() if isinstance(v, (str, int, float)) and v != ""][:limit]
+    return [f"{_label(k)}: {item[k]}" for k in keys]
+
+def render_list(title: str, empty: str, fields: Optional[List[str]] = None) -> Callable[[Any], Optional[str]]:
+    """Renderer for payloads holding one list of records; None (-> fall back to the model) on errors."""
+    def render(result: Any) -> Optional[str]:
+        if not isinstance(result, dict) or "error" in result:
+            return None
+        items = _first_list(result)
+        if items is None:
+            return None
+        if not items:
+            return empty
+        lines = [f"{title} ({len(items)})"]
+        for item in items[:MAX_RENDERED_ITEMS]:
+            lines.append(", ".join(_scalars(item, fields)) if isinstance(item, dict) else str(item))
+        if len(items) > MAX_RENDERED_ITEMS:
+            lines.append(f"...and {len(items) - MAX_RENDERED_ITEMS} more. Ask me to show the rest.")
+        return "\n".join(lines)
+    return render
+
+def render_summary(title: str) -> Callable[[Any], Optional[str]]:
+    """Renderer for summaries: top-level values, one level of nested counts, and short record lists."""
+    def render(result: Any) -> Optional[str]:
+        if not isinstance(result, dict) or "error" in result or not result:
+            return None
+        lines = [title]
+        for key, value in result.items():
+            if isinstance(value, (str, int, float)):
+                lines.append(f"{_label(key)}: {value}")
+            elif isinstance(value, dict):
+                lines.extend(f"{_label(key)} - {_label(k)}: {v}" for k, v in value.items() if isinstance(v, (str, int, float)))
+            elif isinstance(value, list):
+                lines.append(f"{_label(key)} ({len(value)})")
+                lines.extend(", ".join(_scalars(i)) if isinstance(i, dict) else str(i) for i in value[:MAX_RENDERED_ITEMS])
+        return "\n".join(lines) if len(lines) > 1 else None
+    return render
+
+class Intent:
+    def __init__(self, name: str, pattern: str, tool: str, render: Callable[[Any], Optional[str]],
+                 args: Optional[Callable[[], Dict[str, Any]]] = None, requires_member: bool = False):
+        self.name = name
+        self.pattern = re.compile(pattern)
+        self.tool = tool
+        self.render = render
+        self.args = args or dict
+        self.requires_member = requires_member
+
+    def answer(self, result: Any) -> Optional[str]:
+        """Reply text for a tool result, or None when its shape is unexpected and the model should answer."""
+        if isinstance(result, dict) and "error" in result:
+            return str(result["error"])  # tool errors are already worded for the user
+        return self.render(result)
+
+class IntentMatcher:
+    """
+    Ordered list of intents matched against the whole normalised message; anything that does not
+    match exactly (extra words, a member-only intent with no member selected) goes to the model.
+    """
+
+    def __init__(self, intents: Optional[List[Intent]] = None):
+        self.intents: List[Intent] = list(intents or [])
+        self.hits: Dict[str, int] = {}
+
+    def register(self, intent: Intent) -> None:
+        self.intents.append(intent)
+
+    def match(self, message: str, dynamic_constants) -> Optional[Intent]:
+        if not FAST_PATH_ENABLED:
+            return None
+        text = normalize(message)
+        for intent in self.intents:
+            if intent.pattern.fullmatch(text):
+                if intent.requires_member and not member_selected(dynamic_constants):
+                    return None
+                self.hits[intent.name] = self.hits.get(intent.name, 0) + 1
+                return intent
+        return None
+
+_SHOW = r"(?:(?:show|list|get|give|fetch|view|display|see|tell)(?: me)?(?: all)? )?(?:what are |what's |whats |what is )?"
+
+DEFAULT_INTENTS = [
+    Intent("todays_tasks", _SHOW + r"(?:my |the )?(?:tasks? (?:for )?today|today's tasks?|todays tasks?)",
+           "get_todays_tasks", render_list("Today's tasks", "You have no tasks for today.")),
+    Intent("upcoming_call", _SHOW + r"(?:the |my |member's |members )?(?:next |upcoming |next upcoming )(?:scheduled )?calls?",
+           "member_upcoming_scheduled_call",
+           render_list("Upcoming scheduled calls", "The member has no upcoming scheduled calls.",
+                       ["date", "time", "callType", "title", "status"]),
+           requires_member=True),
+    Intent("my_breaks", _SHOW + r"(?:my )?(?:breaks|working plans?(?: and breaks)?|working hours)",
+           "get_working_plans_and_breaks", render_summary("Your working plans and breaks")),
+    Intent("weekly_summary", _SHOW + r"(?:my |the )?(?:weekly summary|summary (?:for|of) (?:this|the) week)(?: for this week)?",
+           "get_weekly_summary", render_summary("Weekly summary"),
+           args=lambda: {"startDate": week_start().strftime("%Y-%m-%d")}),
+]
+
+intent_matcher = IntentMatcher(DEFAULT_INTENTS)
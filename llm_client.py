@@ -1,6 +1,6 @@
 # from google import genai
 # from tool_config import GEMINI_API_KEY, CONFIG
-# from tool_funcs import TOOL_MAP
+# from tool_funcs import ASYNC_TOOL_MAP, TOOL_MAP
 # from google.genai import types
 
 # client = genai.Client(api_key=GEMINI_API_KEY)
@@ -47,10 +47,11 @@
 #             return "Try Again!"
 
 from datetime import datetime
+import asyncio
+import concurrent.futures
 import logging
 import time
-import random
-from typing import Any, Dict, Optional
+from typing import Any, Awaitable, Callable, Dict, Optional
 
 from google import genai
 from google.genai import types
@@ -59,74 +60,452 @@ from google.genai.errors import ClientError
 from tool_config import GEMINI_API_KEY, TOOLS
 from tool_funcs import TOOL_MAP
 from constants import DynamicConstants, StaticConstants
-from system_prompt import get_system_prompt
+from system_prompt import get_member_context_prompt, get_static_system_prompt
+from prompt_cache import build_prompt_cache
+from history import CHARS_PER_TOKEN, HistoryManager, estimate_tokens
+from projection import project_tool_result
+from tool_router import select_tools
+from intents import Intent, intent_matcher
+from llm_scheduler import LLMOverloaded, llm_scheduler
+from hedging import hedger
+from resilience import CircuitOpen, backoff_delay, breaker_for, budget_for, retry_after_seconds
+from session_registry import token_digest
+import metrics
 
 logger = logging.getLogger("llm_client")
 logger.setLevel(logging.INFO)
 
 MODEL_NAME = "gemini-2.5-flash"
 MAX_TOOL_STEPS = 8
+MAX_PARALLEL_TOOLS = 4  # per-session cap on function calls from one model turn running at once
 MAX_RETRIES = 5
 BASE_BACKOFF = 0.5
 BACKOFF_CAP = 8.0
 
 _client = genai.Client(api_key=GEMINI_API_KEY)
+_prompt_cache = build_prompt_cache(_client)
+# trips on outages (5xx, timeouts, long Retry-After) so turns fail fast instead of sleeping through retries
+_gemini_breaker = breaker_for("gemini")
+_gemini_retry_budget = budget_for("gemini")
 
-def _sleep_with_jitter(base: float, attempt: int) -> None:
-    delay = min(BACKOFF_CAP, base * (2 ** (attempt - 1)))
-    delay = delay * (0.5 + random.random())
+# on_event(event_name, payload) callback used by the streaming path, e.g. ("chunk", {"text": ...})
+EventCallback = Callable[[str, Dict[str, Any]], Awaitable[None]]
+
+def _backoff_delay(base: float, attempt: int) -> float:
+    return backoff_delay(base, attempt, BACKOFF_CAP)
+
+def _retry_delay(attempt: int, err: Optional[Exception]) -> float:
+    """Server-provided Retry-After when there is one, else jittered exponential backoff."""
+    retry_after = retry_after_seconds(err) if err is not None else None
+    return retry_after if retry_after is not None else _backoff_delay(BASE_BACKOFF, attempt)
+
+def _can_retry(attempt: int) -> bool:
+    """Within the attempt cap and the shared retry budget, and Gemini not marked down meanwhile."""
+    _gemini_breaker.check()
+    return attempt < MAX_RETRIES and _gemini_retry_budget.try_spend()
+
+def _sleep_with_jitter(attempt: int, err: Optional[Exception]) -> None:
+    delay = _retry_delay(attempt, err)
     print(f"[retry] sleeping {delay:.2f}s before attempt {attempt+1}")
     time.sleep(delay)
 
+async def _async_sleep_with_jitter(attempt: int, err: Optional[Exception]) -> None:
+    delay = _retry_delay(attempt, err)
+    print(f"[retry] sleeping {delay:.2f}s before attempt {attempt+1}")
+    await asyncio.sleep(delay)
+
+async def _hedged(factory: Callable[[], Awaitable[Any]], tokens: int,
+                  on_discard: Optional[Callable[[Any], Awaitable[None]]] = None) -> Any:
+    """One Gemini call through the (opt-in) hedger; a hedge only goes out if a scheduler slot is free right now."""
+    async def hedge() -> Any:
+        # slot taken inside the task: a hedge cancelled before it starts never holds one
+        if not llm_scheduler.try_acquire(tokens):
+            raise LLMOverloaded("no free Gemini slot for the hedged request")
+        try:
+            return await factory()
+        finally:
+            llm_scheduler.release(tokens)
+    return await hedger.run(factory, hedge, can_hedge=lambda: llm_scheduler.has_free_slot(tokens), on_discard=on_discard)
+
+async def _open_stream(contents: list[types.Content], config) -> tuple:
+    """Start a stream and wait for its first chunk, so hedging races on time to first token."""
+    stream = await _client.aio.models.generate_content_stream(model=MODEL_NAME, contents=contents, config=config)
+    it = stream.__aiter__()
+    opened = False
+    try:
+        first = await it.__anext__()
+        opened = True
+        return first, it
+    except StopAsyncIteration:
+        opened = True
+        return None, it
+    finally:
+        if not opened:
+            # cancelled (lost the hedge race) or failed before the first chunk: nobody else will close it
+            await _close_stream((None, it))
+
+async def _close_stream(opened: tuple) -> None:
+    aclose = getattr(opened[1], "aclose", None)
+    if aclose:
+        await aclose()
+
+async def _stream_chunks(first, it):
+    if first is not None:
+        yield first
+        async for chunk in it:
+            yield chunk
+
+def _record_usage(usage_metadata: Any) -> None:
+    if usage_metadata is None:
+        return
+    metrics.llm_tokens.inc(getattr(usage_metadata, "prompt_token_count", None) or 0, direction="in")
+    metrics.llm_tokens.inc(getattr(usage_metadata, "candidates_token_count", None) or 0, direction="out")
+
+def _record_turn(started: float, path: str, outcome: str, tool_steps: Optional[int]) -> None:
+    metrics.turns.inc(path=path, outcome=outcome)
+    metrics.turn_seconds.observe(time.perf_counter() - started)
+    if tool_steps is not None:
+        metrics.tool_steps_per_turn.observe(tool_steps)
+
+def _is_cache_error(e: ClientError) -> bool:
+    """A request rejected because of the cached prefix itself (expired or deleted), not the request."""
+    code = getattr(e, "code", None)
+    message = str(getattr(e, "message", None) or e).lower()
+    return bool(code and int(code) == 404) or "cachedcontent" in message or "cached content" in message
+
+def _is_rate_limited(e: ClientError) -> bool:
+    code = getattr(e, "code", None)
+    return bool(code and int(code) == 429)
+
+def _is_fatal_client_error(e: ClientError) -> bool:
+    code = getattr(e, "code", None)
+    print(f"[llm] ClientError code={code} msg={getattr(e,'message',str(e))}")
+    return bool(code and int(code) in (400, 401, 403))
+
+def _merge_stream_part(parts: list[types.Part], part: types.Part) -> None:
+    """Append a streamed part, folding consecutive plain-text deltas into a single part."""
+    prev = parts[-1] if parts else None
+    is_text = lambda p: getattr(p, "text", None) is not None and not getattr(p, "function_call", None) and not getattr(p, "thought", None)
+    if prev is not None and is_text(prev) and is_text(part):
+        parts[-1] = types.Part(text=prev.text + part.text, thought_signature=prev.thought_signature or part.thought_signature)
+    else:
+        parts.append(part)
+
 class LLMChatSession:
-    def __init__(self, user_id: str, access_token: str, cn_id: Optional[str], static_constants: StaticConstants):
+    def __init__(self, user_id: str, access_token: str, cn_id: Optional[str], static_constants: StaticConstants,
+                 state: Optional[dict] = None):
         self.user_id = user_id if user_id is not None else ""
         self.access_token = access_token
+        self.token_digest = token_digest(access_token)
         self.cn_id = cn_id
         self.dynamic_constants = DynamicConstants(user_id, access_token, cn_id, static_constants)
-        self.dynamic_constants.load()
+        if state is None:
+            self.dynamic_constants.load()
+        else:
+            self.dynamic_constants.restore(state.get("constants") or {})
         
         session_tool_map = {}
         for name, func in TOOL_MAP.items():
             session_tool_map[name] = lambda *args, func=func, **kwargs: func(self.dynamic_constants, *args, **kwargs)
             
         self.tool_map = session_tool_map
-        self.contents: list[types.Content] = []
+        self.async_tool_map = {}  # awaited by _arun_tool instead of the blocking TOOL_MAP function
+        for name, func in ASYNC_TOOL_MAP.items():
+            self.async_tool_map[name] = lambda *args, func=func, **kwargs: func(self.dynamic_constants, *args, **kwargs)
+        self.contents: list[types.Content] = [types.Content.model_validate(c) for c in (state or {}).get("contents", [])]
+        self.version = int((state or {}).get("version", 0))  # bumped per saved turn; see conversation_store
+        self.history = HistoryManager()
+        self._tool_semaphore: Optional[asyncio.Semaphore] = None  # created lazily inside the event loop
         
-        system_prompt = get_system_prompt(self.dynamic_constants)
+        self.tools = TOOLS  # narrowed per turn by _route_tools (uncached requests only)
+        self.static_prompt = ""
+        self.member_prompt = ""
+        self._static_snapshot = None  # prompts are built at the start of the first turn
+
+    def to_state(self) -> dict:
+        """JSON-safe session state for a ConversationStore; pass it back as `state=` to rehydrate on any worker."""
+        return {
+            "version": self.version,
+            "token_digest": self.token_digest,
+            "user_id": self.user_id,
+            "cn_id": self.cn_id,
+            "contents": [c.model_dump(mode="json", exclude_none=True) for c in self.contents],
+            "constants": self.dynamic_constants.to_state(),
+        }
+
+    def _build_prompts(self) -> None:
+        self._static_snapshot = self.dynamic_constants.static_constants.snapshot
+        self.static_prompt = get_static_system_prompt(self.dynamic_constants)
+        self._build_member_prompt()
+
+    def _build_member_prompt(self) -> None:
+        # may wait for the background insights prefetch on the first turn
+        self.member_prompt = get_member_context_prompt(self.dynamic_constants)
+        # uncached fallback: full prompt + tools on every request
         self.config = types.GenerateContentConfig(
-            tools=TOOLS,
-            system_instruction=types.Content(role="system", parts=[types.Part(text=system_prompt)])
+            tools=self.tools,
+            system_instruction=types.Content(role="system", parts=[types.Part(text=self.static_prompt + self.member_prompt)])
         )
 
+    def _route_tools(self, user_message: str) -> None:
+        """
+        Tool declarations for this turn's uncached requests. With a prompt cache configured every
+        request goes through the cached prefix, which carries the full TOOLS list, so routing is skipped.
+        """
+        if _prompt_cache is not None:
+            self.tools = TOOLS
+        else:
+            self.tools = select_tools(self.dynamic_constants, user_message, self.contents)
+
+    def _refresh_prompts(self) -> None:
+        """
+        Start of a turn: rebuild the static prefix only if the static snapshot was refreshed (new hash
+        -> new cached prefix); the member context is cheap and is rebuilt so lists loaded on demand show up.
+        """
+        if self.dynamic_constants.static_constants.snapshot is not self._static_snapshot:
+            print("[prompt] static constants refreshed; rebuilding prompts")
+            self._build_prompts()
+        else:
+            self._build_member_prompt()
+
+    def _cached_request(self, req_contents: list[types.Content], cache_name: Optional[str]):
+        """
+        (contents, config) for one model call; with a cached prefix only the member context is sent inline.
+        The cached prefix always carries the full TOOLS list, so one cache serves every routed turn.
+        """
+        if not cache_name:
+            return req_contents, self.config
+        member_context = types.Content(role="user", parts=[types.Part(text=self.member_prompt)])
+        return [member_context] + req_contents, types.GenerateContentConfig(cached_content=cache_name)
+
     def _generate_with_retries(self, req_contents: list[types.Content]):
         last_err = None
+        use_cache = _prompt_cache is not None
+        _gemini_retry_budget.record_request()
         for attempt in range(1, MAX_RETRIES + 1):
+            _gemini_breaker.check()
+            cache_name = _prompt_cache.get(MODEL_NAME, self.static_prompt, TOOLS) if use_cache else None
+            contents, config = self._cached_request(req_contents, cache_name)
             try:
                 print(f"[llm] attempt {attempt}, contents len={len(req_contents)}")
                 resp = _client.models.generate_content(
                     model=MODEL_NAME,
-                    contents=req_contents,
-                    config=self.config
+                    contents=contents,
+                    config=config
                 )
                 # minimal sanity prints
                 has_cands = bool(getattr(resp, "candidates", None))
                 print(f"[llm] got response, candidates={has_cands}")
+                _gemini_breaker.record_success()
+                _record_usage(getattr(resp, "usage_metadata", None))
                 return resp
             except ClientError as e:
-                code = getattr(e, "code", None)
-                print(f"[llm] ClientError code={code} msg={getattr(e,'message',str(e))}")
                 last_err = e
-                if code and int(code) in (400, 401, 403):
+                if _is_rate_limited(e):
+                    _gemini_breaker.record_failure(retry_after_seconds(e))
+                else:
+                    # Gemini is up; this request was rejected
+                    _gemini_breaker.record_success()
+                    if cache_name and _is_cache_error(e):
+                        # the cache may have expired server-side; retry with the full prompt
+                        _prompt_cache.invalidate(cache_name)
+                        use_cache = False
+                    elif _is_fatal_client_error(e):
+                        break
+            except Exception as e:
+                print(f"[llm] Unexpected error: {type(e).__name__}: {e}")
+                last_err = e
+                _gemini_breaker.record_failure(retry_after_seconds(e))
+            if not _can_retry(attempt):
+                break
+            _sleep_with_jitter(attempt, last_err)
+        if last_err:
+            raise last_err
+
+    async def _agenerate_once(self, contents: list[types.Content], config, on_event: Optional[EventCallback], state: dict) -> Optional[types.Content]:
+        """
+        One model call. Streams when `on_event` is given, forwarding text deltas as they arrive and
+        merging the parts back into one content; `state["emitted"]` records whether anything went out.
+        """
+        tokens = state.get("tokens", 0)
+        if not on_event:
+            resp = await _hedged(
+                lambda: _client.aio.models.generate_content(model=MODEL_NAME, contents=contents, config=config), tokens
+            )
+            state["usage_metadata"] = getattr(resp, "usage_metadata", None)
+            state["usage"] = getattr(state["usage_metadata"], "total_token_count", None)
+            has_cands = bool(getattr(resp, "candidates", None))
+            print(f"[llm] got response, candidates={has_cands}")
+            return resp.candidates[0].content if has_cands else None
+
+        parts: list[types.Part] = []
+        first, it = await _hedged(lambda: _open_stream(contents, config), tokens, on_discard=_close_stream)
+        async for chunk in _stream_chunks(first, it):
+            usage = getattr(getattr(chunk, "usage_metadata", None), "total_token_count", None)
+            if usage:
+                state["usage"] = usage
+                state["usage_metadata"] = chunk.usage_metadata
+            if not getattr(chunk, "candidates", None):
+                continue
+            content = chunk.candidates[0].content
+            for p in (getattr(content, "parts", None) or []):
+                if getattr(p, "text", None) and not getattr(p, "thought", None):
+                    state["emitted"] = True
+                    await on_event("chunk", {"text": p.text})
+                _merge_stream_part(parts, p)
+        return types.Content(role="model", parts=parts) if parts else None
+
+    def _estimate_request_tokens(self, req_contents: list[types.Content]) -> int:
+        """Rough input size of one call (cached prefix tokens still count towards TPM)."""
+        prompt_chars = len(self.static_prompt) + len(self.member_prompt)
+        return prompt_chars // CHARS_PER_TOKEN + sum(estimate_tokens(c) for c in req_contents)
+
+    async def _agenerate_with_retries(self, req_contents: list[types.Content], on_event: Optional[EventCallback] = None) -> Optional[types.Content]:
+        """
+        Async twin of `_generate_with_retries`: uses the aio client and never blocks the event loop.
+        Returns the model content of the step. A stream is only retried while nothing has been emitted.
+        Every attempt is admitted by the process-wide `llm_scheduler` (concurrency, RPM/TPM, fair per cnId).
+        """
+        last_err = None
+        use_cache = _prompt_cache is not None
+        tokens = self._estimate_request_tokens(req_contents)
+        _gemini_retry_budget.record_request()
+
+        async def on_wait(queued: int) -> None:
+            if on_event:
+                await on_event("queued", {"queued": queued})
+
+        for attempt in range(1, MAX_RETRIES + 1):
+            _gemini_breaker.check()
+            cache_name = await _prompt_cache.aget(MODEL_NAME, self.static_prompt, TOOLS) if use_cache else None
+            contents, config = self._cached_request(req_contents, cache_name)
+            state = {"emitted": False, "tokens": tokens}
+            try:
+                async with llm_scheduler.slot(self.cn_id or self.user_id, tokens, on_wait) as usage:
+                    if usage["wait"] >= 0.05:
+                        print(f"[llm] waited {usage['wait']:.2f}s for a Gemini slot")
+                    print(f"[llm] attempt {attempt}, contents len={len(req_contents)}, stream={bool(on_event)}")
+                    content = await self._agenerate_once(contents, config, on_event, state)
+                    usage["tokens"] = state.get("usage")
+                    _gemini_breaker.record_success()
+                    _record_usage(state.get("usage_metadata"))
+                    return content
+            except (LLMOverloaded, CircuitOpen):
+                raise
+            except ClientError as e:
+                last_err = e
+                if _is_rate_limited(e):
+                    retry_after = retry_after_seconds(e)
+                    _gemini_breaker.record_failure(retry_after)
+                    if state["emitted"] or not _can_retry(attempt):
+                        break
+                    # hold back every session rather than each one retrying into the limit
+                    delay = _retry_delay(attempt, e)
+                    print(f"[llm] 429 from Gemini; pausing admission for {delay:.2f}s")
+                    llm_scheduler.pause(delay)
+                    continue
+                _gemini_breaker.record_success()
+                if state["emitted"]:
+                    break
+                if cache_name and _is_cache_error(e):
+                    await _prompt_cache.ainvalidate(cache_name)
+                    use_cache = False
+                elif _is_fatal_client_error(e):
                     break
             except Exception as e:
                 print(f"[llm] Unexpected error: {type(e).__name__}: {e}")
                 last_err = e
-            if attempt < MAX_RETRIES:
-                _sleep_with_jitter(BASE_BACKOFF, attempt)
+                _gemini_breaker.record_failure(retry_after_seconds(e))
+                if state["emitted"]:
+                    break
+            if not _can_retry(attempt):
+                break
+            await _async_sleep_with_jitter(attempt, last_err)
         if last_err:
             raise last_err
 
+    def _function_calls(self, content: types.Content) -> list[tuple]:
+        """All (name, args) function calls in a model turn, in the order the model emitted them."""
+        calls = []
+        for p in (getattr(content, "parts", None) or []):
+            function_call = getattr(p, "function_call", None)
+            if function_call:
+                calls.append((getattr(function_call, "name", None), getattr(function_call, "args", {}) or {}))
+        return calls
+
+    def _check_function_calls(self, calls: list[tuple]) -> Optional[str]:
+        for name, args in calls:
+            print(f"[tool] model wants to call: {name} with args={args}")
+            if not name:
+                print("[tool] missing tool name; bail")
+                return "Try Again!"
+            if name not in self.tool_map:
+                print(f"[tool] not implemented: {name}")
+                return f"Tool '{name}' is not implemented."
+        return None
+
+    def _function_response_content(self, calls: list[tuple], results: list) -> types.Content:
+        """One `function` content carrying every result, matching the order of the calls."""
+        return types.Content(
+            role="function",
+            parts=[
+                types.Part.from_function_response(
+                    name=name, response=project_tool_result(name, result, self.dynamic_constants.result_pages)
+                )
+                for (name, _), result in zip(calls, results)
+            ]
+        )
+
+    def _record_fast_path(self, user_message: str, intent: Intent, args: dict, result: Any) -> Optional[str]:
+        """
+        Append the user message and the intent's tool call / function response to `contents`, as a
+        model-driven turn would leave them, then the templated reply. Returns None (nothing after the
+        function response) when the result can't be rendered: the model turn then answers from the
+        recorded result instead of calling the tool again.
+        """
+        self.contents.append(types.Content(role="user", parts=[types.Part(text=f"User: {user_message}")]))
+        self.contents.append(types.Content(role="model", parts=[types.Part(function_call=types.FunctionCall(name=intent.tool, args=args))]))
+        self.contents.append(self._function_response_content([(intent.tool, args)], [result]))
+        reply = intent.answer(result)
+        if reply is None:
+            print(f"[fast_path] {intent.name} result not renderable; handing it to the model")
+            return None
+        print(f"[fast_path] {intent.name} answered without the model")
+        self.contents.append(types.Content(role="model", parts=[types.Part(text=reply)]))
+        return reply
+
+    def _run_tool(self, name: str, args: dict) -> Dict[str, Any]:
+        func = self.tool_map[name]
+        started = time.perf_counter()
+        try:
+            result = func(**args)
+            print(f"[tool] result: {result}")
+        except Exception as e:
+            print(f"[tool] error in {name}: {e}")
+            result = {"error": f"Tool '{name}' failed", "detail": str(e)}
+        metrics.record_tool(name, time.perf_counter() - started, result)
+        self.dynamic_constants.entities.invalidate_after(name, args)
+        return result
+
+    async def _arun_tool(self, name: str, args: dict) -> Dict[str, Any]:
+        """
+        Await the tool's async twin when it has one (ASYNC_TOOL_MAP); otherwise run the blocking tool
+        on a worker thread only for the duration of the backend call.
+        """
+        started = time.perf_counter()
+        try:
+            if name in self.async_tool_map:
+                result = await self.async_tool_map[name](**args)
+            else:
+                result = await asyncio.to_thread(self.tool_map[name], **args)
+            print(f"[tool] result: {result}")
+        except Exception as e:
+            print(f"[tool] error in {name}: {e}")
+            result = {"error": f"Tool '{name}' failed", "detail": str(e)}
+        metrics.record_tool(name, time.perf_counter() - started, result)
+        self.dynamic_constants.entities.invalidate_after(name, args)
+        return result
+
     def _safe_text_from_content(self, content: types.Content) -> str:
         texts = []
         if getattr(content, "parts", None):
@@ -137,56 +516,62 @@ class LLMChatSession:
         return "\n".join(texts).strip() if texts else "No text response."
 
     def ask(self, user_message: str) -> str:
+        started = time.perf_counter()
+        path, outcome, tool_steps = "model", "error", None
         try:
             print(f"[ask] User says: {user_message}")
-            user_part = types.Part(text=f"User: {user_message}")
-            self.contents.append(types.Content(role="user", parts=[user_part]))
+            intent = intent_matcher.match(user_message, self.dynamic_constants)
+            recorded = False  # the fast path already appended the user message and its tool result
+            if intent and intent.tool in self.tool_map:
+                args = intent.args()
+                reply = self._record_fast_path(user_message, intent, args, self._run_tool(intent.tool, args))
+                if reply is not None:
+                    path, outcome = "fast_path", "answered"
+                    return reply
+                recorded = True
+            self._route_tools(user_message)
+            self._refresh_prompts()
+            if not recorded:
+                user_part = types.Part(text=f"User: {user_message}")
+                self.contents.append(types.Content(role="user", parts=[user_part]))
             print(f"[ask] contents now has {len(self.contents)} messages")
 
+            tool_steps = 0
             for step in range(MAX_TOOL_STEPS):
                 print(f"[loop] step {step+1}/{MAX_TOOL_STEPS}")
-                resp = self._generate_with_retries(self.contents)
+                self.history.compact(self.contents)
+                with metrics.llm_step_seconds.time(stream="false"):
+                    resp = self._generate_with_retries(self.contents)
                 if not resp or not getattr(resp, "candidates", None):
                     print("[loop] no candidates, returning Try Again!")
+                    outcome = "empty"
                     return "Try Again!"
 
                 content = resp.candidates[0].content
                 if not content:
                     print("[loop] empty content, returning Try Again!")
+                    outcome = "empty"
                     return "Try Again!"
 
-                # inspect for function call
-                part = content.parts[0] if getattr(content, "parts", None) else None
-                function_call = getattr(part, "function_call", None) if part else None
-
-                if function_call:
-                    name = getattr(function_call, "name", None)
-                    args = getattr(function_call, "args", {}) or {}
-                    print(f"[tool] model wants to call: {name} with args={args}")
-
-                    if not name:
-                        print("[tool] missing tool name; bail")
-                        return "Try Again!"
+                # inspect for function calls (the model may emit several in one turn)
+                calls = self._function_calls(content)
+                if calls:
+                    problem = self._check_function_calls(calls)
+                    if problem:
+                        outcome = "invalid_call"
+                        return problem
 
-                    func = self.tool_map.get(name)
-                    if not func:
-                        print(f"[tool] not implemented: {name}")
-                        return f"Tool '{name}' is not implemented."
+                    if len(calls) == 1:
+                        results = [self._run_tool(*calls[0])]
+                    else:
+                        with concurrent.futures.ThreadPoolExecutor(max_workers=MAX_PARALLEL_TOOLS) as executor:
+                            results = list(executor.map(lambda call: self._run_tool(*call), calls))
 
-                    try:
-                        result = func(**args)
-                        print(f"[tool] result: {result}")
-                    except Exception as e:
-                        print(f"[tool] error in {name}: {e}")
-                        result = {"error": f"Tool '{name}' failed", "detail": str(e)}
-
-                    # append tool call (model) and tool result (function) back
+                    # append tool calls (model) and all tool results (function) back
                     self.contents.append(content)
-                    self.contents.append(types.Content(
-                        role="function",
-                        parts=[types.Part.from_function_response(name=name, response=result)]
-                    ))
-                    print(f"[tool] appended tool result; contents size={len(self.contents)}")
+                    self.contents.append(self._function_response_content(calls, results))
+                    print(f"[tool] appended {len(results)} tool result(s); contents size={len(self.contents)}")
+                    tool_steps += 1
                     continue
 
                 # final text
@@ -197,14 +582,117 @@ class LLMChatSession:
                 print(f"model's response: {final_text}")
                 print("--------------------------------------------")
                 print("Start time", datetime.now())
+                outcome = "answered"
                 return final_text
 
             print("[loop] reached MAX_TOOL_STEPS")
+            outcome = "max_steps"
             return "The request required too many tool steps. Please try a simpler request."
 
+        except CircuitOpen as e:
+            print(f"[ask] {e}")
+            outcome = "circuit_open"
+            return f"The assistant is temporarily unavailable. Please try again in about {int(e.retry_in) + 1} seconds."
         except Exception as e:
             print(f"[ask] Fatal error: {type(e).__name__}: {e}")
             return f"Internal error: {type(e).__name__}: {str(e)}"
+        finally:
+            _record_turn(started, path, outcome, tool_steps)
+
+    async def ask_async(self, user_message: str, on_event: Optional[EventCallback] = None) -> str:
+        """
+        Same turn loop as `ask`, but awaits the model, backoff and tools instead of blocking a thread.
+        With `on_event` the model is streamed: text deltas arrive as "chunk" events and each tool
+        step reports "tool_call" / "tool_result" progress events.
+        """
+        started = time.perf_counter()
+        path, outcome, tool_steps = "model", "error", None
+        try:
+            print(f"[ask_async] User says: {user_message}")
+            intent = intent_matcher.match(user_message, self.dynamic_constants)
+            recorded = False  # the fast path already appended the user message and its tool result
+            if intent and intent.tool in self.tool_map:
+                args = intent.args()
+                if on_event:
+                    await on_event("tool_call", {"tool": intent.tool, "step": 0})
+                result = await self._arun_tool(intent.tool, args)
+                if on_event:
+                    await on_event("tool_result", {"tool": intent.tool, "step": 0, "ok": metrics.result_outcome(result) == "ok"})
+                reply = self._record_fast_path(user_message, intent, args, result)
+                if reply is not None:
+                    path, outcome = "fast_path", "answered"
+                    if on_event:
+                        await on_event("chunk", {"text": reply})
+                    return reply
+                recorded = True
+            self._route_tools(user_message)
+            await asyncio.to_thread(self._refresh_prompts)
+            if not recorded:
+                user_part = types.Part(text=f"User: {user_message}")
+                self.contents.append(types.Content(role="user", parts=[user_part]))
+            print(f"[ask_async] contents now has {len(self.contents)} messages")
+
+            tool_steps = 0
+            for step in range(MAX_TOOL_STEPS):
+                print(f"[loop] step {step+1}/{MAX_TOOL_STEPS}")
+                self.history.compact(self.contents)
+                with metrics.llm_step_seconds.time(stream="true" if on_event else "false"):
+                    content = await self._agenerate_with_retries(self.contents, on_event)
+                if not content:
+                    print("[loop] empty content, returning Try Again!")
+                    outcome = "empty"
+                    return "Try Again!"
+
+                calls = self._function_calls(content)
+                if calls:
+                    problem = self._check_function_calls(calls)
+                    if problem:
+                        outcome = "invalid_call"
+                        return problem
+
+                    if self._tool_semaphore is None:
+                        self._tool_semaphore = asyncio.Semaphore(MAX_PARALLEL_TOOLS)
+
+                    async def run(name: str, args: dict) -> Dict[str, Any]:
+                        async with self._tool_semaphore:
+                            if on_event:
+                                await on_event("tool_call", {"tool": name, "step": step + 1})
+                            result = await self._arun_tool(name, args)
+                            if on_event:
+                                await on_event("tool_result", {"tool": name, "step": step + 1, "ok": metrics.result_outcome(result) == "ok"})
+                            return result
+
+                    results = await asyncio.gather(*(run(name, args) for name, args in calls))
+
+                    self.contents.append(content)
+                    self.contents.append(self._function_response_content(calls, results))
+                    print(f"[tool] appended {len(results)} tool result(s); contents size={len(self.contents)}")
+                    tool_steps += 1
+                    continue
+
+                final_text = self._safe_text_from_content(content)
+                print(f"[final] {final_text}")
+                self.contents.append(content)
+                outcome = "answered"
+                return final_text
+
+            print("[loop] reached MAX_TOOL_STEPS")
+            outcome = "max_steps"
+            return "The request required too many tool steps. Please try a simpler request."
+
+        except LLMOverloaded as e:
+            print(f"[ask_async] {e}")
+            outcome = "overloaded"
+            return "I'm handling a lot of requests right now. Please try again in a moment."
+        except CircuitOpen as e:
+            print(f"[ask_async] {e}")
+            outcome = "circuit_open"
+            return f"The assistant is temporarily unavailable. Please try again in about {int(e.retry_in) + 1} seconds."
+        except Exception as e:
+            print(f"[ask_async] Fatal error: {type(e).__name__}: {e}")
+            return f"Internal error: {type(e).__name__}: {str(e)}"
+        finally:
+            _record_turn(started, path, outcome, tool_steps)
 
 def web_io(input: str) -> str:
     session = LLMChatSession(tool_map=TOOL_MAP)
@@ -0,0 +1,192 @@
+import asyncio
+import os
+import time
+from collections import OrderedDict, deque
+from contextlib import asynccontextmanager
+from typing import Any, Awaitable, Callable, Deque, Dict, Optional
+
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "16"))
+LLM_RPM = int(os.getenv("LLM_RPM", "900"))             # requests per minute, 0 = unlimited
+LLM_TPM = int(os.getenv("LLM_TPM", "900000"))          # input+output tokens per minute, 0 = unlimited
+LLM_QUEUE_TIMEOUT = float(os.getenv("LLM_QUEUE_TIMEOUT", "45"))
+
+class LLMOverloaded(Exception):
+    """A request waited longer than the queue timeout for a Gemini slot."""
+
+class TokenBucket:
+    """Refills `per_minute` units evenly over a minute; bursts up to one minute's worth."""
+
+    def __init__(self, per_minute: int):
+        self.capacity = float(per_minute)
+        self.rate = per_minute / 60.0
+        self.level = self.capacity
+        self.updated = time.monotonic()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def time_until(self, amount: float) -> float:
+        self._refill()
+        amount = min(amount, self.capacity)  # a single oversized request must still be admissible
+        return 0.0 if self.level >= amount else (amount - self.level) / self.rate
+
+    def consume(self, amount: float) -> None:
+        self._refill()
+        self.level -= min(amount, self.capacity)
+
+    def adjust(self, delta: float) -> None:
+        """Correct an estimate once the real usage is known (negative delta refunds)."""
+        self._refill()
+        self.level = min(self.capacity, self.level - delta)
+
+class _Waiter:
+    __slots__ = ("tenant", "tokens", "future", "enqueued_at")
+
+    def __init__(self, tenant: str, tokens: int):
+        self.tenant = tenant
+        self.tokens = tokens
+        self.future: asyncio.Future = asyncio.get_running_loop().create_future()
+        self.enqueued_at = time.monotonic()
+
+class LLMScheduler:
+    """
+    Process-wide admission control for Gemini calls: at most `max_concurrency` in flight, within
+    the RPM/TPM budgets, with waiting requests served round-robin across tenants (cnId) so one busy
+    navigator cannot starve the others. A 429 pauses admission for everyone (`pause`) instead of
+    each session retrying into the limit on its own.
+    """
+
+    def __init__(self, max_concurrency: int = LLM_MAX_CONCURRENCY, rpm: int = LLM_RPM, tpm: int = LLM_TPM,
+                 queue_timeout: float = LLM_QUEUE_TIMEOUT):
+        self.max_concurrency = max_concurrency
+        self.queue_timeout = queue_timeout
+        self._requests = TokenBucket(rpm) if rpm else None
+        self._tokens = TokenBucket(tpm) if tpm else None
+        self._active = 0
+        self._queues: "OrderedDict[str, Deque[_Waiter]]" = OrderedDict()
+        self._paused_until = 0.0
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self.granted = 0
+        self.rejected = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    @property
+    def queued(self) -> int:
+        return sum(len(q) for q in self._queues.values())
+
+    def _delay_for(self, tokens: int) -> float:
+        delay = self._paused_until - time.monotonic()
+        if self._requests:
+            delay = max(delay, self._requests.time_until(1))
+        if self._tokens:
+            delay = max(delay, self._tokens.time_until(tokens))
+        return delay
+
+    def _admit(self, tokens: int) -> None:
+        if self._requests:
+            self._requests.consume(1)
+        if self._tokens:
+            self._tokens.consume(tokens)
+        self._active += 1
+
+    def _dispatch(self) -> None:
+        while self._queues and self._active < self.max_concurrency:
+            tenant, queue = next(iter(self._queues.items()))
+            waiter = queue[0]
+            delay = self._delay_for(waiter.tokens)
+            if delay > 0:
+                if self._timer is None:
+                    self._timer = asyncio.get_running_loop().call_later(delay, self._on_timer)
+                return
+            queue.popleft()
+            if queue:
+                self._queues.move_to_end(tenant)  # round-robin: this tenant goes to the back
+            else:
+                del self._queues[tenant]
+            self._admit(waiter.tokens)
+            waiter.future.set_result(None)
+
+    def _on_timer(self) -> None:
+        self._timer = None
+        self._dispatch()
+
+    def _remove(self, waiter: _Waiter) -> None:
+        queue = self._queues.get(waiter.tenant)
+        if queue and waiter in queue:
+            queue.remove(waiter)
+            if not queue:
+                del self._queues[waiter.tenant]
+
+    async def acquire(self, tenant: str, tokens: int,
+                      on_wait: Optional[Callable[[int], Awaitable[None]]] = None) -> float:
+        """Wait for a slot; returns seconds spent queued. Raises LLMOverloaded after `queue_timeout`."""
+        waiter = _Waiter(tenant or "", tokens)
+        self._queues.setdefault(waiter.tenant, deque()).append(waiter)
+        self._dispatch()
+        try:
+            if not waiter.future.done() and on_wait:
+                await on_wait(self.queued)
+            await asyncio.wait_for(asyncio.shield(waiter.future), self.queue_timeout)
+        except asyncio.TimeoutError:
+            if not waiter.future.done():
+                self._remove(waiter)
+                self.rejected += 1
+                raise LLMOverloaded(f"no Gemini slot within {self.queue_timeout:g}s ({self.queued} queued)")
+        except BaseException:
+            # cancelled (or on_wait failed): give back a slot we may already hold
+            if waiter.future.done():
+                self.release(tokens)
+            else:
+                self._remove(waiter)
+            raise
+        wait = time.monotonic() - waiter.enqueued_at
+        self.granted += 1
+        self.total_wait += wait
+        self.max_wait = max(self.max_wait, wait)
+        return wait
+
+    def has_free_slot(self, tokens: int) -> bool:
+        return not self._queues and self._active < self.max_concurrency and self._delay_for(tokens) <= 0
+
+    def try_acquire(self, tokens: int) -> bool:
+        """Take a slot only if one is free right now with nobody queued (e.g. for an optional hedge)."""
+        if not self.has_free_slot(tokens):
+            return False
+        self._admit(tokens)
+        self.granted += 1
+        return True
+
+    def release(self, estimated_tokens: int = 0, used_tokens: Optional[int] = None) -> None:
+        self._active -= 1
+        if self._tokens and used_tokens is not None:
+            self._tokens.adjust(used_tokens - estimated_tokens)
+        self._dispatch()
+
+    def pause(self, seconds: float) -> None:
+        """Hold back every queued request, e.g. after a 429 from Gemini."""
+        self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+
+    @asynccontextmanager
+    async def slot(self, tenant: str, tokens: int, on_wait: Optional[Callable[[int], Awaitable[None]]] = None):
+        """`async with scheduler.slot(...) as usage:` set `usage["tokens"]` to the real count if known."""
+        usage: Dict[str, Any] = {"wait": await self.acquire(tenant, tokens, on_wait), "tokens": None}
+        try:
+            yield usage
+        finally:
+            self.release(tokens, usage["tokens"])
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "active": self._active,
+            "queued": self.queued,
+            "tenants_waiting": len(self._queues),
+            "granted": self.granted,
+            "rejected": self.rejected,
+            "avg_wait": round(self.total_wait / self.granted, 3) if self.granted else 0.0,
+            "max_wait": round(self.max_wait, 3),
+        }
+
+llm_scheduler = LLMScheduler()
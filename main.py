@@ -2,16 +2,22 @@
 
 import asyncio
 import logging
+import os
 from datetime import datetime, timezone
-from typing import Dict, Optional
-from inspect import iscoroutinefunction
+from typing import Dict
 
 import socketio
 import uvicorn
 
 from llm_client import LLMChatSession
 from tool_funcs import TOOL_MAP
-from constants import StaticConstants
+from constants import StaticConstants, StaticConstantsRefresher
+import transport
+from session_registry import SessionRegistry, token_digest
+from conversation_store import build_conversation_store, store_key
+from socket_manager import build_client_manager
+from turn_queue import BUSY, MERGED, TurnQueues
+import metrics
 
 # ---------- Logging ----------
 logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
@@ -19,28 +25,111 @@ logger = logging.getLogger("socketio_server")
 
 HOST = "0.0.0.0"
 PORT = 5000
+# How long the very first request may wait for static constants when none are loaded yet
+STATIC_READY_TIMEOUT = float(os.getenv("STATIC_READY_TIMEOUT", "10"))
+# Stream model tokens to clients as `ai_chat_response_chunk` events before the final `ai_chat_response`
+STREAM_RESPONSES = os.getenv("STREAM_RESPONSES", "1") == "1"
 
 sio = socketio.AsyncServer(
     async_mode="asgi",
+    # room emits go through the shared message queue when SOCKETIO_MESSAGE_QUEUE is set
+    client_manager=build_client_manager(),
     cors_allowed_origins="*",
     ping_interval=20,
     ping_timeout=20,
     logger=False,
     engineio_logger=False,
 )
-app = socketio.ASGIApp(sio)
+static_constants = StaticConstants()
+static_refresher = StaticConstantsRefresher(static_constants)
 
+async def on_startup():
+    await static_refresher.start()
+
+async def on_shutdown():
+    await static_refresher.stop()
+    await transport.aclose()
+
+# GET /metrics (Prometheus text format) is served next to /socket.io
+app = socketio.ASGIApp(sio, other_asgi_app=metrics.metrics_app, on_startup=on_startup, on_shutdown=on_shutdown)
+
+# Chat sessions keyed by (cnId, userId, sessionId), not by sid
+sessions = SessionRegistry()
+# Serialized history + member constants, so any worker can pick up a session (CONVERSATION_STORE)
+conversation_store = build_conversation_store()
+# One ordered turn at a time per session; duplicates merged, overflow answered with `busy`
+turn_queues = TurnQueues()
+metrics.registry.gauge("agent_sessions", "Warm chat sessions on this worker", lambda: len(sessions))
+metrics.registry.gauge("agent_turn_queue_depth", "Turns running or waiting across all sessions", turn_queues.total_depth)
+metrics.registry.gauge("agent_turns_refused_total", "Turns merged into an identical one or refused as busy",
+                       lambda: {"merged": turn_queues.merged, "busy": turn_queues.rejected}, ("reason",), "counter")
 # Per-socket state
-sid_to_chat: Dict[str, LLMChatSession] = {}
 sid_to_room: Dict[str, str] = {}
-static_constants: Optional[StaticConstants] = None
 
 def now_iso() -> str:
     return datetime.now(timezone.utc).isoformat()
 
+async def open_chat(key, user_id, access_token, cn_id) -> LLMChatSession:
+    """
+    The warm session for `key`, rehydrated from the conversation store when this worker has none
+    or when another worker saved a newer turn since (shared stores only). The key comes from the
+    client, so a session (warm or stored) opened with a different token is never resumed: the
+    caller gets a new session under the same key instead.
+    """
+    store_id = store_key(key)
+    digest = token_digest(access_token)
+
+    async def build(state=None):
+        if state is None:
+            state = await asyncio.to_thread(conversation_store.load, store_id)
+        version = int(state.get("version", 0)) if state else 0
+        if state and state.get("token_digest") != digest:
+            logger.info(f"[conversation_store] {store_id} was opened with another token; starting a new session")
+            state = None
+        if state:
+            logger.info(f"[conversation_store] rehydrating {store_id} at version {state.get('version')}")
+        chat = await asyncio.to_thread(
+            LLMChatSession, user_id=user_id, access_token=access_token, cn_id=cn_id,
+            static_constants=static_constants, state=state,
+        )
+        # continue the stored version so a replaced state is not re-read on the next turn
+        chat.version = max(chat.version, version)
+        return chat
+
+    chat = await sessions.get_or_create(key, build)
+    if chat.token_digest != digest:
+        logger.info(f"[session] {store_id} was opened with another token; starting a new session")
+        chat = await build()
+        sessions.put(key, chat)
+    elif conversation_store.shared and await asyncio.to_thread(conversation_store.version, store_id) > chat.version:
+        chat = await build()
+        sessions.put(key, chat)
+    return chat
+
+async def save_chat(key, chat: LLMChatSession) -> None:
+    chat.version += 1
+    try:
+        await asyncio.to_thread(conversation_store.save, store_key(key), chat.to_state())
+    except Exception:
+        logger.exception("[conversation_store] save failed")
+
+async def enter_session_room(sid: str, session_id) -> None:
+    prev = sid_to_room.get(sid)
+    if prev and prev != str(session_id):
+        await sio.leave_room(sid, prev)
+
+    sid_to_room[sid] = str(session_id)
+    await sio.enter_room(sid, str(session_id))
+
 @sio.event
 async def connect(sid, environ, auth):
     logger.info(f"[connect] sid={sid}")
+    # Client: io(url, { auth: { sessionId } }) -> rejoins its room on every (re)connect, including
+    # after the worker that held the old socket restarted
+    session_id = auth.get("sessionId") if isinstance(auth, dict) else None
+    if session_id:
+        await enter_session_room(sid, session_id)
+        logger.info(f"[connect] sid={sid} rejoined room={session_id}")
     await sio.emit("welcome_message", "Hello, I am your assistant. How can I help you?", to=sid)
 
 @sio.event
@@ -52,7 +141,7 @@ async def disconnect(sid):
             await sio.leave_room(sid, room)
         except Exception:
             pass
-    sid_to_chat.pop(sid, None)
+    # the chat session stays warm for a reconnect / reload
 
 # Optional: join a "room" keyed by sessionId
 # Client: socket.emit('join_session', { sessionId })
@@ -64,12 +153,7 @@ async def join_session(sid, payload):
         await sio.emit("ai_chat_response", {"data": "Missing sessionId"}, to=sid)
         return
 
-    prev = sid_to_room.get(sid)
-    if prev and prev != str(session_id):
-        await sio.leave_room(sid, prev)
-
-    sid_to_room[sid] = str(session_id)
-    await sio.enter_room(sid, str(session_id))
+    await enter_session_room(sid, session_id)
     logger.info(f"[join_session] sid={sid} -> room={session_id}")
     await sio.emit(
         "ai_chat_response",
@@ -104,25 +188,55 @@ async def handle_ai_chat_success(sid, payload):
 
     logger.info(f"[ai_chat_success] sid={sid} sessionId={session_id} userId={user_id} cnId={cn_id} message={message!r}")
 
-    global static_constants
-    if static_constants is None and access_token:
-        static_constants = StaticConstants(access_token=access_token)
+    if not access_token:
+        # sessions are resumed by client-supplied ids, so the token is what proves ownership
+        await sio.emit("ai_chat_response", {"data": "Missing accessToken", "sessionId": session_id, "timestamp": now_iso()}, to=sid)
+        return
 
-    chat = sid_to_chat.get(sid)
-    if not chat or chat.user_id != user_id:
-        chat = LLMChatSession(user_id=user_id, access_token=access_token, cn_id=cn_id, static_constants=static_constants)
-        sid_to_chat[sid] = chat
-        
-    try:
-        # support both sync and async ask()
-        if iscoroutinefunction(chat.ask):
-            reply_text = await chat.ask(message)  # <-- NO meta here
-        else:
-            loop = asyncio.get_running_loop()
-            reply_text = await loop.run_in_executor(None, chat.ask, message)  # <-- NO meta here
-    except Exception as e:
-        logger.exception("LLM error")
-        reply_text = f"Sorry, I hit an error: {type(e).__name__}"
+    static_refresher.offer_token(access_token)
+    await static_refresher.wait_ready(STATIC_READY_TIMEOUT)
+
+    key = sessions.key_for(cn_id, user_id, session_id)
+
+    async def on_event(event: str, data: dict):
+        # incremental events go to the sid and the rest of the room (skip_sid avoids duplicate chunks)
+        name = "ai_chat_response_chunk" if event == "chunk" else "ai_chat_progress"
+        out = {"event": event, **data, "sessionId": session_id, "userId": user_id, "cnId": cn_id, "timestamp": now_iso()}
+        if event == "chunk":
+            out["data"] = data["text"]
+        await sio.emit(name, out, to=sid)
+        if session_id is not None:
+            await sio.emit(name, out, room=str(session_id), skip_sid=sid)
+
+    async def run_turn() -> str:
+        # runs only after the session's previous turn finished (and was saved)
+        chat = await open_chat(key, user_id, access_token, cn_id)
+        try:
+            reply_text = await chat.ask_async(message, on_event=on_event if STREAM_RESPONSES else None)  # <-- NO meta here
+            await save_chat(key, chat)
+        except Exception as e:
+            logger.exception("LLM error")
+            reply_text = f"Sorry, I hit an error: {type(e).__name__}"
+        return reply_text
+
+    status, turn = turn_queues.submit(key, message, run_turn, origin=sid)
+    if status == BUSY:
+        logger.info(f"[ai_chat_success] busy sessionId={session_id} depth={turn_queues.depth(key)}")
+        await sio.emit("busy", {
+            "data": "Still working on your earlier messages. Please wait for a reply before sending more.",
+            "message": message,
+            "queueDepth": turn_queues.depth(key),
+            "sessionId": session_id,
+            "userId": user_id,
+            "cnId": cn_id,
+            "timestamp": now_iso(),
+        }, to=sid)
+        return
+    if status == MERGED:
+        # the identical turn this socket just sent is still in flight and will answer it
+        logger.info(f"[ai_chat_success] merged duplicate message sessionId={session_id}")
+        return
+    reply_text = await turn
 
     out = {
         "data": reply_text,
@@ -0,0 +1,247 @@
+import bisect
+import math
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Tuple
+
+from hedging import hedger
+from llm_scheduler import llm_scheduler
+from response_cache import response_cache
+from single_flight import single_flight
+import resilience
+
+METRICS_PATH = os.getenv("METRICS_PATH", "/metrics")
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+LLM_BUCKETS = (0.25, 0.5, 1, 2, 4, 8, 16, 32, 64)
+CALL_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2, 5, 10, 30)
+STEP_BUCKETS = (0, 1, 2, 3, 4, 5, 6, 7, 8)
+
+Sample = Tuple[str, Dict[str, str], float]  # (name suffix, labels, value)
+
+def _escape(value: Any) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _format_labels(labels: Dict[str, str]) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in labels.items()) + "}"
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value))
+
+class _Metric:
+    kind = "untyped"
+
+    def __init__(self, name: str, help: str, labels: Tuple[str, ...] = ()):
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, Any]) -> Tuple[str, ...]:
+        if set(labels) != set(self.labels):
+            raise ValueError(f"{self.name} expects labels {self.labels}, got {tuple(labels)}")
+        return tuple(str(labels[l]) for l in self.labels)
+
+    def samples(self) -> Iterable[Sample]:
+        return ()
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, help: str, labels: Tuple[str, ...] = ()):
+        super().__init__(name, help, labels)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: Any) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def samples(self) -> Iterable[Sample]:
+        with self._lock:
+            values = list(self._values.items())
+        return [("", dict(zip(self.labels, key)), value) for key, value in values]
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, labels: Tuple[str, ...] = (), buckets: Tuple[float, ...] = CALL_BUCKETS):
+        super().__init__(name, help, labels)
+        self.buckets = tuple(sorted(buckets))
+        self._series: Dict[Tuple[str, ...], list] = {}  # key -> [per-bucket counts (+Inf last), sum, count]
+
+    def observe(self, value: float, **labels: Any) -> None:
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    @contextmanager
+    def time(self, **labels: Any) -> Iterator[None]:
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def samples(self) -> Iterable[Sample]:
+        with self._lock:
+            series = [(key, list(counts), total, count) for key, (counts, total, count) in self._series.items()]
+        out: List[Sample] = []
+        for key, counts, total, count in series:
+            labels = dict(zip(self.labels, key))
+            cumulative = 0
+            for bound, n in zip(self.buckets + (math.inf,), counts):
+                cumulative += n
+                out.append(("_bucket", {**labels, "le": _format_value(bound)}, cumulative))
+            out.append(("_sum", labels, total))
+            out.append(("_count", labels, count))
+        return out
+
+class Gauge(_Metric):
+    """Read at scrape time from `fn`: a number, or {label values tuple: number} for labelled gauges."""
+    kind = "gauge"
+
+    def __init__(self, name: str, help: str, fn: Callable[[], Any], labels: Tuple[str, ...] = (), kind: str = "gauge"):
+        super().__init__(name, help, labels)
+        self.fn = fn
+        self.kind = kind  # "counter" for totals kept by another module's stats()
+
+    def samples(self) -> Iterable[Sample]:
+        value = self.fn()
+        if value is None:
+            return []
+        if not isinstance(value, dict):
+            return [("", {}, value)]
+        return [("", dict(zip(self.labels, key if isinstance(key, tuple) else (key,))), v) for key, v in value.items()]
+
+class Registry:
+    """Metrics of this worker process, rendered in the Prometheus text format."""
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+
+    def _add(self, metric: _Metric) -> Any:
+        with self._lock:
+            if metric.name in self._metrics:
+                raise ValueError(f"metric {metric.name} already registered")
+            self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, help: str, labels: Tuple[str, ...] = ()) -> Counter:
+        return self._add(Counter(name, help, labels))
+
+    def histogram(self, name: str, help: str, labels: Tuple[str, ...] = (), buckets: Tuple[float, ...] = CALL_BUCKETS) -> Histogram:
+        return self._add(Histogram(name, help, labels, buckets))
+
+    def gauge(self, name: str, help: str, fn: Callable[[], Any], labels: Tuple[str, ...] = (), kind: str = "gauge") -> Gauge:
+        return self._add(Gauge(name, help, fn, labels, kind))
+
+    def render(self) -> str:
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines: List[str] = []
+        for metric in metrics:
+            try:
+                samples = list(metric.samples())
+            except Exception as e:
+                print(f"[metrics] {metric.name} failed: {type(e).__name__}: {e}")
+                continue
+            lines.append(f"# HELP {metric.name} {_escape(metric.help)}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            for suffix, labels, value in samples:
+                lines.append(f"{metric.name}{suffix}{_format_labels(labels)} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+registry = Registry()
+
+# ---------- Turns and model steps (llm_client) ----------
+turns = registry.counter("agent_turns_total", "Chat turns by path (model, fast_path) and outcome", ("path", "outcome"))
+turn_seconds = registry.histogram("agent_turn_seconds", "Wall time of a chat turn, queueing excluded", buckets=LLM_BUCKETS)
+llm_step_seconds = registry.histogram("agent_llm_step_seconds", "Latency of one model step, retries and admission wait included",
+                                      ("stream",), LLM_BUCKETS)
+tool_steps_per_turn = registry.histogram("agent_tool_steps_per_turn", "Model steps that called tools, per model turn",
+                                         buckets=STEP_BUCKETS)
+llm_tokens = registry.counter("agent_llm_tokens_total", "Gemini tokens reported by usage metadata", ("direction",))
+
+# ---------- Tools and backend endpoints ----------
+tool_seconds = registry.histogram("agent_tool_seconds", "Latency of a TOOL_MAP function", ("tool",))
+tool_calls = registry.counter("agent_tool_calls_total", "TOOL_MAP calls by outcome (ok, error)", ("tool", "outcome"))
+backend_seconds = registry.histogram("agent_backend_request_seconds", "Latency of an upstream BASE_URL request, retries included",
+                                     ("endpoint",))
+backend_requests = registry.counter("agent_backend_requests_total",
+                                    "Upstream BASE_URL requests by outcome (ok, error, circuit_open)", ("endpoint", "outcome"))
+entity_lookups = registry.counter("agent_entity_store_lookups_total", "Per-session entity store lookups", ("result",))
+
+def result_outcome(result: Any) -> str:
+    """'ok', or 'error' for the `{"error": ...}` dicts tools and make_request return."""
+    return "error" if isinstance(result, dict) and "error" in result else "ok"
+
+def record_tool(name: str, seconds: float, result: Any) -> None:
+    tool_seconds.observe(seconds, tool=name)
+    tool_calls.inc(tool=name, outcome=result_outcome(result))
+
+def record_backend(endpoint_name: str, seconds: float, output: Any) -> None:
+    outcome = result_outcome(output)
+    if outcome == "error" and "dependency" in output:
+        outcome = "circuit_open"  # RetryPolicy.open_error(): nothing was sent
+    else:
+        backend_seconds.observe(seconds, endpoint=endpoint_name)
+    backend_requests.inc(endpoint=endpoint_name, outcome=outcome)
+
+# ---------- Process-wide stats of the existing components ----------
+def _cache_lookups() -> Dict[str, int]:
+    s = response_cache.stats()
+    return {"hit": s["hits"], "miss": s["misses"]}
+
+def _single_flight() -> Dict[str, int]:
+    s = single_flight.stats()
+    return {"leader": s["upstream_calls"], "joined": s["joined"]}
+
+def _breaker_open() -> Dict[str, int]:
+    return {name: int(s["state"] != "closed") for name, s in resilience.stats().items()}
+
+def _retries() -> Dict[str, int]:
+    return {name: s["retries"] for name, s in resilience.stats().items()}
+
+registry.gauge("agent_response_cache_entries", "Entries in the backend response cache", lambda: response_cache.stats()["entries"])
+registry.gauge("agent_response_cache_lookups_total", "Backend response cache lookups", _cache_lookups, ("result",), "counter")
+registry.gauge("agent_response_cache_hit_ratio", "Backend response cache hits / lookups", lambda: response_cache.stats()["hit_rate"])
+registry.gauge("agent_single_flight_calls_total", "Backend reads that went upstream (leader) or joined one in flight",
+               _single_flight, ("role",), "counter")
+registry.gauge("agent_single_flight_in_flight", "Backend reads in flight", lambda: single_flight.stats()["in_flight"])
+registry.gauge("agent_llm_active", "Gemini calls holding a scheduler slot", lambda: llm_scheduler.stats()["active"])
+registry.gauge("agent_llm_queued", "Gemini calls waiting for a scheduler slot", lambda: llm_scheduler.stats()["queued"])
+registry.gauge("agent_llm_rejected_total", "Gemini calls refused by the scheduler", lambda: llm_scheduler.stats()["rejected"],
+               kind="counter")
+registry.gauge("agent_retries_total", "Retries spent per dependency (gemini, backend:<area>)", _retries, ("dependency",), "counter")
+registry.gauge("agent_circuit_open", "1 while the dependency's circuit breaker is open or half-open", _breaker_open, ("dependency",))
+registry.gauge("agent_llm_hedged_total", "Hedged Gemini requests sent", lambda: hedger.hedged, kind="counter")
+registry.gauge("agent_llm_hedge_wins_total", "Hedged Gemini requests that answered first", lambda: hedger.hedge_wins, kind="counter")
+
+async def metrics_app(scope: dict, receive: Callable, send: Callable) -> None:
+    """ASGI app serving GET `METRICS_PATH`; mounted as Socket.IO's `other_asgi_app`."""
+    if scope["type"] == "websocket":
+        await send({"type": "websocket.close"})
+        return
+    if scope["type"] != "http":
+        return
+    if scope["path"].rstrip("/") != METRICS_PATH.rstrip("/") or scope["method"] not in ("GET", "HEAD"):
+        status, body, content_type = 404, b"Not Found", "text/plain"
+    else:
+        status, body, content_type = 200, registry.render().encode("utf-8"), CONTENT_TYPE
+    await send({"type": "http.response.start", "status": status,
+                "headers": [(b"content-type", content_type.encode()), (b"content-length", str(len(body)).encode())]})
+    await send({"type": "http.response.body", "body": body if scope["method"] != "HEAD" else b""})
@@ -0,0 +1,106 @@
+import difflib
+import re
+from typing import Any, Callable, Dict, Iterable, List, Mapping, Optional, Tuple, Union
+
+MAX_SUGGESTIONS = 3
+SUGGESTION_CUTOFF = 0.6
+
+def normalize_name(name: Any) -> str:
+    """Casefolded, '&' -> 'and', punctuation and repeated whitespace collapsed; 12.0 -> '12'."""
+    if isinstance(name, float) and name.is_integer():
+        name = int(name)
+    text = str(name).casefold().replace("&", " and ")
+    return " ".join(re.sub(r"[^\w]+", " ", text).replace("_", " ").split())
+
+def same_name(a: Any, b: Any) -> bool:
+    return a is not None and b is not None and normalize_name(a) == normalize_name(b)
+
+class NameIndex:
+    """
+    Name -> value lookups that tolerate casing, spacing and punctuation differences, plus aliases,
+    with ranked suggestions for names that still do not match. Build it once per fetched list or
+    snapshot; a key shared by two different names is dropped rather than resolved to either.
+    Only for human-readable names: IDs and datetimes must be matched exactly.
+    """
+
+    def __init__(self, entries: Iterable[Tuple[Any, Any]] = (), aliases: Optional[Mapping[Any, Any]] = None):
+        self._exact: Dict[str, Tuple[str, Any]] = {}
+        self._normalized: Dict[str, Tuple[str, Any]] = {}
+        self._compact: Dict[str, Tuple[str, Any]] = {}
+        self._ambiguous = set()
+        self._suggest_keys: Optional[Dict[str, str]] = None  # normalised key -> name, built on first miss
+        for name, value in entries:
+            if name is None or name == "":
+                continue
+            name = str(name)
+            self._exact.setdefault(name, (name, value))
+            self._add(normalize_name(name), name, value)
+        for alias, name in (aliases or {}).items():
+            if alias and str(name) in self._exact:
+                self._add(normalize_name(alias), *self._exact[str(name)])
+
+    def _add(self, key: str, name: str, value: Any) -> None:
+        for level, table, k in (("normalized", self._normalized, key), ("compact", self._compact, key.replace(" ", ""))):
+            if (level, k) in self._ambiguous:
+                continue
+            if k in table and table[k][0] != name:
+                del table[k]
+                self._ambiguous.add((level, k))
+            else:
+                table.setdefault(k, (name, value))
+
+    @classmethod
+    def from_records(cls, records: Iterable[dict], field: Union[str, Callable[[dict], Any]],
+                     alias_field: Optional[str] = None) -> "NameIndex":
+        """Index dict records by `field` (a key or a function of the record); values are the records."""
+        records = [r for r in (records or []) if isinstance(r, dict)]
+        name_of = field if callable(field) else (lambda r: r.get(field))
+        aliases = {r.get(alias_field): name_of(r) for r in records} if alias_field else None
+        return cls(((name_of(r), r) for r in records), aliases)
+
+    @property
+    def names(self) -> List[str]:
+        return list(self._exact)
+
+    def __len__(self) -> int:
+        return len(self._exact)
+
+    def __contains__(self, name: Any) -> bool:
+        return self.resolve(name) is not None
+
+    def resolve(self, name: Any) -> Optional[Tuple[str, Any]]:
+        """(canonical name, value) for `name`, or None. Never guesses: fuzzy matches are only suggested."""
+        if name is None:
+            return None
+        hit = self._exact.get(str(name))
+        if hit is None:
+            key = normalize_name(name)
+            hit = self._normalized.get(key) or self._compact.get(key.replace(" ", ""))
+        return hit
+
+    def get(self, name: Any, default: Any = None) -> Any:
+        hit = self.resolve(name)
+        return hit[1] if hit else default
+
+    def canonical(self, name: Any) -> Any:
+        """The indexed spelling of `name`, or `name` unchanged when it does not resolve."""
+        hit = self.resolve(name)
+        return hit[0] if hit else name
+
+    def suggest(self, name: Any, n: int = MAX_SUGGESTIONS) -> List[str]:
+        """Closest indexed names: containment matches first (shortest first), then difflib ratio."""
+        key = normalize_name(name) if name is not None else ""
+        if not key:
+            return []
+        if self._suggest_keys is None:
+            self._suggest_keys = {normalize_name(n_): n_ for n_ in self._exact}
+        by_key = self._suggest_keys
+        contained = sorted((k for k in by_key if key in k or k in key), key=len)
+        close = difflib.get_close_matches(key, list(by_key), n=n, cutoff=SUGGESTION_CUTOFF)
+        ranked = list(dict.fromkeys(contained + close))
+        return [by_key[k] for k in ranked[:n]]
+
+    def hint(self, name: Any) -> str:
+        """' Did you mean ...?' for error messages, or '' when nothing is close."""
+        suggestions = self.suggest(name)
+        return f" Did you mean {' or '.join(repr(s) for s in suggestions)}?" if suggestions else ""
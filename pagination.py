@@ -0,0 +1,219 @@
+import asyncio
+import os
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, AsyncIterator, Callable, Deque, Iterator, List, Optional, Tuple
+
+from enc_dec import make_request, make_request_async
+
+PAGE_CONCURRENCY = int(os.getenv("PAGE_CONCURRENCY", "4"))    # follow-up pages in flight at once
+PAGE_MAX_PAGES = int(os.getenv("PAGE_MAX_PAGES", "20"))       # hard cap per call
+TASK_PAGE_SIZE = int(os.getenv("TASK_PAGE_SIZE", "200"))
+MEMBER_SEARCH_LIMIT = int(os.getenv("MEMBER_SEARCH_LIMIT", "50"))  # search tools stop after this many matches
+
+# Response fields that tell how far a list goes, when the endpoint sends them
+PAGE_COUNT_KEYS = ("totalPages", "total_pages", "lastPage", "pageCount")
+ITEM_COUNT_KEYS = ("totalCount", "totalRecords", "totalItems", "total", "count")
+
+Page = Tuple[int, dict, list]  # (page number, raw output, items)
+
+def _find_list(value: Any, items_key: str) -> Tuple[Optional[dict], Optional[list]]:
+    """(dict holding the list, list): the list under `items_key` anywhere in the payload."""
+    if isinstance(value, dict):
+        v = value.get(items_key)
+        if isinstance(v, list):
+            return value, v
+        for v in value.values():
+            found = _find_list(v, items_key)
+            if found[1] is not None:
+                return found
+    return None, None
+
+def _find_count(value: Any, keys: Tuple[str, ...]) -> Optional[int]:
+    if isinstance(value, dict):
+        for k in keys:
+            if isinstance(value.get(k), (int, float)) or (isinstance(value.get(k), str) and value[k].isdigit()):
+                return int(value[k])
+        for v in value.values():
+            found = _find_count(v, keys)
+            if found is not None:
+                return found
+    return None
+
+class PagedRequest:
+    """
+    A list endpoint read page by page, as a lazily consumed sync (`pages`) or async (`apages`)
+    iterator. Page 1 is fetched alone; after that up to `concurrency` pages are kept in flight and
+    yielded in order.
+    Iteration stops at a short or empty page, at the page count the backend reports, at
+    `max_pages` (`truncated` is then set), or when the consumer stops early. `items_key` names the
+    endpoint's list; the merged response keeps the backend's shape, and how much of the list was
+    read is reported on the request (`pages_fetched`, `complete`), not in the payload.
+    """
+
+    def __init__(self, endpoint_name: str, data: dict, access_token: str, items_key: str,
+                 page_key: str = "page", per_page_key: Optional[str] = None, per_page: Optional[int] = None,
+                 concurrency: int = PAGE_CONCURRENCY, max_pages: int = PAGE_MAX_PAGES):
+        self.endpoint_name = endpoint_name
+        self.data = data
+        self.access_token = access_token
+        self.items_key = items_key
+        self.page_key = page_key
+        self.per_page_key = per_page_key
+        self.per_page = per_page
+        self.concurrency = max(1, concurrency)
+        self.max_pages = max(1, max_pages)
+        self.pages_fetched = 0
+        self.truncated = False
+        self.stopped_early = False
+
+    @property
+    def complete(self) -> bool:
+        """Whether the collected list is the whole list (no cap, failed page or early stop)."""
+        return not self.truncated and not self.stopped_early
+
+    def _payload(self, page: int) -> dict:
+        payload = dict(self.data)
+        payload[self.page_key] = page
+        if self.per_page_key and self.per_page:
+            payload[self.per_page_key] = self.per_page
+        return payload
+
+    def _items(self, output: Any) -> Optional[list]:
+        if not isinstance(output, dict) or "error" in output:
+            return None
+        return _find_list(output, self.items_key)[1]
+
+    def _last_page(self, first: dict, page_size: int) -> Optional[int]:
+        pages = _find_count(first, PAGE_COUNT_KEYS)
+        if pages is None:
+            count = _find_count(first, ITEM_COUNT_KEYS)
+            pages = -(-count // page_size) if count is not None and page_size else None
+        return pages
+
+    def _plan(self, first: dict, items: Optional[list]) -> Tuple[int, int]:
+        """(page size, last page to fetch); last page 1 means page 1 was the whole list."""
+        page_size = self.per_page or len(items or [])
+        if not items or len(items) < page_size:
+            return page_size, 1
+        last = self._last_page(first, page_size)
+        if last is not None and last > self.max_pages:
+            self.truncated = True
+        return page_size, min(last or self.max_pages, self.max_pages)
+
+    def _done(self, page: int, items: Optional[list], page_size: int, last: int) -> bool:
+        """Whether `page` ends the list; a failed page, or `max_pages` with a full page, marks the result truncated."""
+        self.pages_fetched = page
+        if items is None:
+            self.truncated = True
+            return True
+        if not items or len(items) < page_size:
+            return True
+        if page >= last and last == self.max_pages:
+            self.truncated = True
+        return page >= last
+
+    def first(self) -> Any:
+        """Page 1 only, for callers that need the response's summary fields rather than the list."""
+        return make_request(endpoint_name=self.endpoint_name, data=self._payload(1), access_token=self.access_token)
+
+    def pages(self) -> Iterator[Page]:
+        first = make_request(endpoint_name=self.endpoint_name, data=self._payload(1), access_token=self.access_token)
+        items = self._items(first)
+        self.pages_fetched = 1
+        yield 1, first, items or []
+        page_size, last = self._plan(first, items)
+        if last <= 1:
+            return
+        pool = ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix="pages")
+        in_flight: Deque = deque()
+        next_page = 2
+        try:
+            while True:
+                while next_page <= last and len(in_flight) < self.concurrency:
+                    in_flight.append((next_page, pool.submit(make_request, endpoint_name=self.endpoint_name,
+                                                             data=self._payload(next_page), access_token=self.access_token)))
+                    next_page += 1
+                if not in_flight:
+                    return
+                page, future = in_flight.popleft()
+                output = future.result()
+                items = self._items(output)
+                if items:
+                    yield page, output, items
+                if self._done(page, items, page_size, last):
+                    return
+        finally:
+            pool.shutdown(wait=False, cancel_futures=True)
+
+    async def apages(self) -> AsyncIterator[Page]:
+        first = await make_request_async(endpoint_name=self.endpoint_name, data=self._payload(1), access_token=self.access_token)
+        items = self._items(first)
+        self.pages_fetched = 1
+        yield 1, first, items or []
+        page_size, last = self._plan(first, items)
+        if last <= 1:
+            return
+        in_flight: Deque = deque()
+        next_page = 2
+        try:
+            while True:
+                while next_page <= last and len(in_flight) < self.concurrency:
+                    in_flight.append((next_page, asyncio.ensure_future(make_request_async(
+                        endpoint_name=self.endpoint_name, data=self._payload(next_page), access_token=self.access_token))))
+                    next_page += 1
+                if not in_flight:
+                    return
+                page, task = in_flight.popleft()
+                output = await task
+                items = self._items(output)
+                if items:
+                    yield page, output, items
+                if self._done(page, items, page_size, last):
+                    return
+        finally:
+            for _, task in in_flight:
+                task.cancel()
+
+    def _merge(self, first: Optional[dict], collected: List[Any], stopped_early: bool) -> Any:
+        """Page 1's output with its list replaced by everything collected."""
+        self.stopped_early = stopped_early
+        if not self.complete:
+            print(f"[pagination] {self.endpoint_name}: {len(collected)} {self.items_key} from "
+                  f"{self.pages_fetched} page(s), list not complete")
+        if not isinstance(first, dict) or "error" in first:
+            return first
+        container, _ = _find_list(first, self.items_key)
+        if container is not None:
+            container[self.items_key] = collected
+        return first
+
+    def collect(self, limit: Optional[int] = None, match: Optional[Callable[[Any], bool]] = None) -> Any:
+        """All items (or the first `limit` that satisfy `match`), merged into page 1's response."""
+        first, collected, stopped = None, [], False
+        pages = self.pages()
+        try:
+            for page, output, items in pages:
+                first = output if first is None else first
+                collected.extend(i for i in items if match is None or match(i))
+                if limit is not None and len(collected) >= limit:
+                    collected, stopped = collected[:limit], True
+                    break
+        finally:
+            pages.close()
+        return self._merge(first, collected, stopped)
+
+    async def acollect(self, limit: Optional[int] = None, match: Optional[Callable[[Any], bool]] = None) -> Any:
+        """Async `collect`, for async tools."""
+        first, collected, stopped = None, [], False
+        pages = self.apages()
+        try:
+            async for page, output, items in pages:
+                first = output if first is None else first
+                collected.extend(i for i in items if match is None or match(i))
+                if limit is not None and len(collected) >= limit:
+                    collected, stopped = collected[:limit], True
+                    break
+        finally:
+            await pages.aclose()
+        return self._merge(first, collected, stopped)
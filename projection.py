@@ -0,0 +1,87 @@
+from collections import Counter
+from typing import Any, Dict, List, Optional
+
+# Per-tool projection of backend payloads before they reach the model.
+# Keys are list names found anywhere in the payload; each spec may set
+#   fields   - item keys to keep (items that carry none of them are passed through untouched)
+#   limit    - max items sent to the model; the rest stay available via `more_tool_results`
+#   count_by - item keys to pre-aggregate over the FULL list, so totals stay correct after the cut
+PROJECTIONS: Dict[str, Dict[str, Dict[str, Any]]] = {
+    "get_task_list": {
+        "tasks": {
+            "fields": ["taskId", "taskDescription", "description", "memberName", "membershipNumber", "status", "currentStatus", "priority", "dueDate", "taskType"],
+            "limit": 25,
+            "count_by": ["status", "currentStatus", "priority"],
+        },
+    },
+    "get_calender_calls": {
+        "calls": {
+            "fields": ["callId", "memberName", "userId", "date", "time", "status", "callType", "title"],
+            "limit": 30,
+            "count_by": ["status"],
+        },
+    },
+    "search_view_member_under_cn": {
+        "users": {
+            "fields": ["userId", "memberName", "membershipNumber", "mobile", "email", "city", "gender", "age", "programs", "conditions"],
+            "limit": 20,
+        },
+    },
+    "member_profile_details": {
+        "memberPathways": {"limit": 20},
+        "notes": {"limit": 10},
+        "calls": {"limit": 10},
+    },
+}
+
+def _project_item(item: Any, fields: Optional[List[str]]) -> Any:
+    if not fields or not isinstance(item, dict):
+        return item
+    kept = {k: item[k] for k in fields if k in item}
+    return kept or item
+
+def project_list(tool_name: str, list_name: str, items: list, offset: int = 0) -> Dict[str, Any]:
+    """One page of `items` shaped by the tool's spec, with an "N more" marker when truncated."""
+    spec = PROJECTIONS.get(tool_name, {}).get(list_name, {})
+    limit = spec.get("limit") or len(items)
+    page = [_project_item(i, spec.get("fields")) for i in items[offset:offset + limit]]
+    out: Dict[str, Any] = {"items": page, "offset": offset, "total": len(items)}
+    remaining = len(items) - (offset + len(page))
+    if remaining > 0:
+        out["more"] = (f"{remaining} more {list_name} not shown. Call more_tool_results with "
+                       f"toolName='{tool_name}', listName='{list_name}', offset={offset + len(page)} to see them.")
+    return out
+
+def _walk(tool_name: str, value: Any, specs: Dict[str, Dict[str, Any]], pages: Optional[dict]) -> Any:
+    if isinstance(value, dict):
+        out = {}
+        for k, v in value.items():
+            if k in specs and isinstance(v, list):
+                page = project_list(tool_name, k, v)
+                out[k] = page["items"]
+                if "more" in page:
+                    out[f"{k}_more"] = page["more"]
+                    if pages is not None:
+                        pages[(tool_name, k)] = v
+                if len(v) > len(page["items"]):
+                    out[f"{k}_total"] = len(v)
+                for field in specs[k].get("count_by", []):
+                    counts = Counter(str(i.get(field)) for i in v if isinstance(i, dict) and field in i)
+                    if counts:
+                        out[f"{k}_count_by_{field}"] = dict(counts)
+            else:
+                out[k] = _walk(tool_name, v, specs, pages)
+        return out
+    if isinstance(value, list):
+        return [_walk(tool_name, v, specs, pages) for v in value]
+    return value
+
+def project_tool_result(tool_name: str, result: Any, pages: Optional[dict] = None) -> Any:
+    """
+    Return a trimmed copy of `result` for the model; the original is never mutated.
+    Full lists that were cut are remembered in `pages` (keyed by (tool, list)) for follow-up paging.
+    """
+    specs = PROJECTIONS.get(tool_name)
+    if not specs or not isinstance(result, dict):
+        return result
+    return _walk(tool_name, result, specs, pages)
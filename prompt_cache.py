@@ -0,0 +1,190 @@
+import asyncio
+import itertools
+import os
+import threading
+import time
+from typing import Dict, Optional
+
+from google.genai import types
+
+from system_prompt import static_prompt_hash
+
+# "gemini" registers the static prefix with Gemini context caching, "local" uses the in-process
+# stand-in (tests / offline), "off" always sends the full prompt.
+PROMPT_CACHE_BACKEND = os.getenv("PROMPT_CACHE_BACKEND", "gemini")
+PROMPT_CACHE_TTL = int(os.getenv("PROMPT_CACHE_TTL", "3600"))
+REFRESH_MARGIN = 120  # recreate this many seconds before the server-side expiry
+
+class GeminiCacheBackend:
+    """Thin wrapper over `client.caches` / `client.aio.caches`."""
+
+    def __init__(self, client):
+        self.client = client
+
+    def _config(self, static_prompt: str, tools: list, ttl: int) -> types.CreateCachedContentConfig:
+        return types.CreateCachedContentConfig(
+            system_instruction=types.Content(role="system", parts=[types.Part(text=static_prompt)]),
+            tools=tools,
+            ttl=f"{ttl}s",
+            display_name="navi-static-prefix",
+        )
+
+    def create(self, model: str, static_prompt: str, tools: list, ttl: int) -> str:
+        return self.client.caches.create(model=model, config=self._config(static_prompt, tools, ttl)).name
+
+    async def acreate(self, model: str, static_prompt: str, tools: list, ttl: int) -> str:
+        cached = await self.client.aio.caches.create(model=model, config=self._config(static_prompt, tools, ttl))
+        return cached.name
+
+    def delete(self, name: str) -> None:
+        self.client.caches.delete(name=name)
+
+    async def adelete(self, name: str) -> None:
+        await self.client.aio.caches.delete(name=name)
+
+class LocalCacheBackend:
+    """In-process stand-in for the Gemini cache API; records what would have been cached."""
+
+    def __init__(self):
+        self.entries: Dict[str, dict] = {}
+        self._ids = itertools.count(1)
+
+    def create(self, model: str, static_prompt: str, tools: list, ttl: int) -> str:
+        name = f"cachedContents/local-{next(self._ids)}"
+        self.entries[name] = {"model": model, "static_prompt": static_prompt, "tools": tools, "ttl": ttl}
+        return name
+
+    async def acreate(self, model: str, static_prompt: str, tools: list, ttl: int) -> str:
+        return self.create(model, static_prompt, tools, ttl)
+
+    def delete(self, name: str) -> None:
+        self.entries.pop(name, None)
+
+    async def adelete(self, name: str) -> None:
+        self.delete(name)
+
+class PromptCache:
+    """
+    Maps hash(model, static prefix, tool names) -> cached content name. An entry is created on
+    first use and recreated shortly before it expires; when the hash for a model changes (e.g.
+    refreshed static constants) the entry it replaces is deleted. Concurrent requests for the
+    same key share one create. Any backend failure returns None so callers fall back to
+    sending the full prompt.
+    """
+
+    def __init__(self, backend, ttl: int = PROMPT_CACHE_TTL):
+        self.backend = backend
+        self.ttl = ttl
+        self._entries: Dict[str, tuple] = {}  # key -> (name, expires_at)
+        self._current: Dict[str, str] = {}    # model -> key in use
+        self._lock = threading.Lock()
+        self._create_locks: Dict[str, threading.Lock] = {}
+        self._creating: Dict[str, asyncio.Future] = {}
+
+    def _key(self, model: str, static_prompt: str, tools: list) -> str:
+        names = ",".join(d.name for t in tools for d in (t.function_declarations or []))
+        return static_prompt_hash(f"{model}\n{names}\n{static_prompt}")
+
+    def _fresh(self, key: str) -> Optional[str]:
+        entry = self._entries.get(key)
+        if entry and entry[1] - REFRESH_MARGIN > time.monotonic():
+            return entry[0]
+        return None
+
+    def _store(self, model: str, key: str, name: str) -> Optional[str]:
+        """
+        Record `name` as the model's entry; a different key it replaces is forgotten and its name
+        returned for the caller to delete.
+        """
+        with self._lock:
+            replaced = self._current.get(model)
+            self._current[model] = key
+            self._entries[key] = (name, time.monotonic() + self.ttl)
+            old = None
+            if replaced not in (None, key):
+                old = self._entries.pop(replaced, None)
+                self._create_locks.pop(replaced, None)
+        # a refreshed entry for the same key is left to expire: requests may still be using it
+        return old[0] if old else None
+
+    def _delete(self, name: Optional[str]) -> None:
+        if not name:
+            return
+        try:
+            self.backend.delete(name)
+        except Exception as e:
+            print(f"[prompt_cache] delete failed for {name}: {e}")
+
+    async def _adelete(self, name: Optional[str]) -> None:
+        if not name:
+            return
+        try:
+            await self.backend.adelete(name)
+        except Exception as e:
+            print(f"[prompt_cache] delete failed for {name}: {e}")
+
+    def _create_lock(self, key: str) -> threading.Lock:
+        with self._lock:
+            return self._create_locks.setdefault(key, threading.Lock())
+
+    def get(self, model: str, static_prompt: str, tools: list) -> Optional[str]:
+        key = self._key(model, static_prompt, tools)
+        name = self._fresh(key)
+        if name:
+            return name
+        with self._create_lock(key):
+            name = self._fresh(key)  # created by the caller we waited for
+            if name:
+                return name
+            try:
+                name = self.backend.create(model, static_prompt, tools, self.ttl)
+            except Exception as e:
+                print(f"[prompt_cache] create failed: {type(e).__name__}: {e}")
+                return None
+            print(f"[prompt_cache] registered {name} for prefix {key[:12]}")
+            self._delete(self._store(model, key, name))
+            return name
+
+    async def aget(self, model: str, static_prompt: str, tools: list) -> Optional[str]:
+        key = self._key(model, static_prompt, tools)
+        name = self._fresh(key)
+        if name:
+            return name
+        pending = self._creating.get(key)
+        if pending is None:
+            pending = self._creating[key] = asyncio.ensure_future(self._acreate(model, key, static_prompt, tools))
+            pending.add_done_callback(lambda _f, key=key: self._creating.pop(key, None))
+        return await asyncio.shield(pending)
+
+    async def _acreate(self, model: str, key: str, static_prompt: str, tools: list) -> Optional[str]:
+        try:
+            name = await self.backend.acreate(model, static_prompt, tools, self.ttl)
+        except Exception as e:
+            print(f"[prompt_cache] create failed: {type(e).__name__}: {e}")
+            return None
+        print(f"[prompt_cache] registered {name} for prefix {key[:12]}")
+        await self._adelete(self._store(model, key, name))
+        return name
+
+    def _forget(self, name: str) -> bool:
+        with self._lock:
+            keys = [key for key, entry in self._entries.items() if entry[0] == name]
+            for key in keys:
+                del self._entries[key]
+        return bool(keys)
+
+    def invalidate(self, name: str) -> None:
+        """Forget an entry the server rejected and delete it server-side (best-effort; it may be gone already)."""
+        if self._forget(name):
+            self._delete(name)
+
+    async def ainvalidate(self, name: str) -> None:
+        if self._forget(name):
+            await self._adelete(name)
+
+def build_prompt_cache(client) -> Optional[PromptCache]:
+    if PROMPT_CACHE_BACKEND == "off":
+        return None
+    if PROMPT_CACHE_BACKEND == "local":
+        return PromptCache(LocalCacheBackend())
+    return PromptCache(GeminiCacheBackend(client))
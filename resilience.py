@@ -0,0 +1,247 @@
+import email.utils
+import os
+import random
+import threading
+import time
+from typing import Any, Dict, Mapping, Optional
+
+BREAKER_FAILURE_THRESHOLD = int(os.getenv("BREAKER_FAILURE_THRESHOLD", "5"))    # consecutive failures
+BREAKER_RESET_TIMEOUT = float(os.getenv("BREAKER_RESET_TIMEOUT", "30"))         # seconds open before a probe
+RETRY_BUDGET_RATIO = float(os.getenv("RETRY_BUDGET_RATIO", "0.2"))              # retries per request
+RETRY_BUDGET_MIN_PER_SEC = float(os.getenv("RETRY_BUDGET_MIN_PER_SEC", "0.5"))  # floor for quiet periods
+BACKEND_MAX_ATTEMPTS = int(os.getenv("BACKEND_MAX_ATTEMPTS", "3"))
+MAX_INLINE_RETRY_WAIT = float(os.getenv("MAX_INLINE_RETRY_WAIT", "5"))         # longer Retry-After -> open the circuit
+
+RETRYABLE_STATUS = (408, 429, 500, 502, 503, 504)
+
+# BASE_URL endpoints grouped by the backend area they hit; first matching keyword wins, else "member"
+ENDPOINT_GROUPS = (
+    ("tickets", ("ticket",)),
+    ("calendar", ("call", "appointment", "break", "working_plans", "schedule")),
+    ("tasks", ("task",)),
+    ("programs", ("pathway", "program", "condition", "disenrollment")),
+    ("health_locker", ("healthlocker", "report")),
+    ("services", ("service", "home_care", "home_base", "lab_request", "form_data", "dropdown")),
+)
+
+class CircuitOpen(Exception):
+    """Raised (LLM) or reported (backend) instead of calling a dependency that is known to be down."""
+
+    def __init__(self, dependency: str, retry_in: float):
+        self.dependency = dependency
+        self.retry_in = retry_in
+        super().__init__(f"{dependency} circuit open; retry in {retry_in:.0f}s")
+
+class CircuitBreaker:
+    """
+    Closed -> open after `failure_threshold` consecutive failures (or a long Retry-After), open ->
+    half-open after `reset_timeout`, where a single probe decides between closed and open again.
+    Thread-safe: backend calls run on worker threads.
+    """
+
+    CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+    def __init__(self, name: str, failure_threshold: int = BREAKER_FAILURE_THRESHOLD,
+                 reset_timeout: float = BREAKER_RESET_TIMEOUT):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self.open_for = reset_timeout
+        self.probe_started = 0.0
+        self.times_opened = 0
+        self.rejected = 0
+        self._lock = threading.Lock()
+
+    def retry_in(self) -> float:
+        return max(0.0, self.opened_at + self.open_for - time.monotonic())
+
+    def allow(self) -> bool:
+        with self._lock:
+            now = time.monotonic()
+            if self.state == self.OPEN and now >= self.opened_at + self.open_for:
+                self.state = self.HALF_OPEN
+                self.probe_started = 0.0
+            if self.state == self.HALF_OPEN:
+                # one probe at a time; a probe that never reported back is replaced after reset_timeout
+                if self.probe_started and now - self.probe_started < self.reset_timeout:
+                    self.rejected += 1
+                    return False
+                self.probe_started = now
+                return True
+            if self.state == self.OPEN:
+                self.rejected += 1
+                return False
+            return True
+
+    def check(self) -> None:
+        if not self.allow():
+            raise CircuitOpen(self.name, self.retry_in())
+
+    def record_success(self) -> None:
+        with self._lock:
+            if self.state != self.CLOSED:
+                print(f"[resilience] {self.name} circuit closed")
+            self.state = self.CLOSED
+            self.failures = 0
+
+    def record_failure(self, retry_after: Optional[float] = None) -> None:
+        with self._lock:
+            self.failures += 1
+            long_wait = retry_after is not None and retry_after > MAX_INLINE_RETRY_WAIT
+            if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold or long_wait:
+                if self.state != self.OPEN:
+                    self.times_opened += 1
+                self.state = self.OPEN
+                self.opened_at = time.monotonic()
+                self.open_for = max(self.reset_timeout, retry_after or 0.0)
+                print(f"[resilience] {self.name} circuit open for {self.open_for:.0f}s after {self.failures} failure(s)")
+
+class RetryBudget:
+    """Retries allowed as a fraction of recent requests, so an outage cannot multiply traffic."""
+
+    def __init__(self, ratio: float = RETRY_BUDGET_RATIO, min_per_sec: float = RETRY_BUDGET_MIN_PER_SEC,
+                 max_balance: float = 10.0):
+        self.ratio = ratio
+        self.min_per_sec = min_per_sec
+        self.max_balance = max_balance
+        self.balance = max_balance
+        self.updated = time.monotonic()
+        self.exhausted = 0
+        self.spent = 0
+        self._lock = threading.Lock()
+
+    def record_request(self) -> None:
+        with self._lock:
+            self.balance = min(self.max_balance, self.balance + self.ratio)
+
+    def try_spend(self) -> bool:
+        with self._lock:
+            now = time.monotonic()
+            self.balance = min(self.max_balance, self.balance + (now - self.updated) * self.min_per_sec)
+            self.updated = now
+            if self.balance < 1:
+                self.exhausted += 1
+                return False
+            self.balance -= 1
+            self.spent += 1
+            return True
+
+def _parse_retry_after(value: Any) -> Optional[float]:
+    if value is None:
+        return None
+    value = str(value).strip()
+    try:
+        return max(0.0, float(value.rstrip("s")))  # "120" (HTTP) or "13s" (google.rpc.RetryInfo)
+    except ValueError:
+        pass
+    try:
+        when = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, when.timestamp() - time.time()) if when else None
+
+def retry_after_seconds(source: Any) -> Optional[float]:
+    """Retry-After from a response, or from an exception carrying one (HTTP header or Gemini RetryInfo)."""
+    headers: Optional[Mapping] = getattr(source, "headers", None)
+    if headers is None:
+        headers = getattr(getattr(source, "response", None), "headers", None)
+    if headers is not None:
+        try:
+            parsed = _parse_retry_after(headers.get("Retry-After"))
+        except Exception:
+            parsed = None
+        if parsed is not None:
+            return parsed
+    details = getattr(source, "details", None)
+    if isinstance(details, dict):
+        for item in (details.get("error") or {}).get("details") or []:
+            if isinstance(item, dict) and "retryDelay" in item:
+                return _parse_retry_after(item["retryDelay"])
+    return None
+
+def backoff_delay(base: float, attempt: int, cap: float = 8.0) -> float:
+    delay = min(cap, base * (2 ** (attempt - 1)))
+    return delay * (0.5 + random.random())
+
+_breakers: Dict[str, CircuitBreaker] = {}
+_budgets: Dict[str, RetryBudget] = {}
+_registry_lock = threading.Lock()
+
+def breaker_for(dependency: str) -> CircuitBreaker:
+    with _registry_lock:
+        if dependency not in _breakers:
+            _breakers[dependency] = CircuitBreaker(dependency)
+        return _breakers[dependency]
+
+def budget_for(dependency: str) -> RetryBudget:
+    with _registry_lock:
+        if dependency not in _budgets:
+            _budgets[dependency] = RetryBudget()
+        return _budgets[dependency]
+
+def endpoint_group(endpoint_name: str) -> str:
+    name = endpoint_name.lower()
+    for group, keywords in ENDPOINT_GROUPS:
+        if any(k in name for k in keywords):
+            return f"backend:{group}"
+    return "backend:member"
+
+class RetryPolicy:
+    """
+    Per-call retry decisions for one dependency: the breaker gates the call, `failed()` records the
+    failure and returns how long to wait before the next attempt, or None to give up (not
+    idempotent, attempts used, budget spent, circuit opened, or Retry-After too long to wait inline).
+    """
+
+    def __init__(self, dependency: str, idempotent: bool = True, max_attempts: int = BACKEND_MAX_ATTEMPTS,
+                 base_backoff: float = 0.3):
+        self.dependency = dependency
+        self.breaker = breaker_for(dependency)
+        self.budget = budget_for(dependency)
+        self.idempotent = idempotent
+        self.max_attempts = max_attempts
+        self.base_backoff = base_backoff
+        self.attempt = 1
+
+    def allow(self) -> bool:
+        if not self.breaker.allow():
+            return False
+        self.budget.record_request()
+        return True
+
+    def open_error(self) -> Dict[str, Any]:
+        retry_in = int(self.breaker.retry_in()) + 1
+        return {
+            "error": f"This service is temporarily unavailable. Please try again in about {retry_in} seconds.",
+            "dependency": self.dependency,
+            "retryAfter": retry_in,
+        }
+
+    def succeeded(self) -> None:
+        self.breaker.record_success()
+
+    def failed(self, source: Any = None) -> Optional[float]:
+        retry_after = retry_after_seconds(source) if source is not None else None
+        self.breaker.record_failure(retry_after)
+        if not self.idempotent or self.attempt >= self.max_attempts:
+            return None
+        if retry_after is not None and retry_after > MAX_INLINE_RETRY_WAIT:
+            return None
+        if not self.breaker.allow() or not self.budget.try_spend():
+            return None
+        self.attempt += 1
+        delay = retry_after if retry_after is not None else backoff_delay(self.base_backoff, self.attempt - 1)
+        print(f"[resilience] {self.dependency} retry {self.attempt}/{self.max_attempts} in {delay:.2f}s")
+        return delay
+
+def stats() -> Dict[str, Any]:
+    with _registry_lock:
+        return {
+            name: {"state": b.state, "failures": b.failures, "times_opened": b.times_opened, "rejected": b.rejected,
+                   "retries": _budgets[name].spent if name in _budgets else 0,
+                   "retry_budget_exhausted": _budgets[name].exhausted if name in _budgets else 0}
+            for name, b in _breakers.items()
+        }
@@ -0,0 +1,124 @@
+import copy
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+# Read-only catalog endpoints shared across sessions -> TTL in seconds
+CACHEABLE_ENDPOINTS: Dict[str, int] = {
+    "/fetch_service_by_category": 900,          # services_by_category
+    "/fetch_program_condition_pathway": 600,    # program_details
+    "/fetch_pathways": 600,                     # available_pathways_for_program_condition
+    "/fetch_form_data": 900,                    # lab_providers, DynamicConstants form data
+    "/fetch_home_care": 900,                    # homecare_lab_providers, homecare_health_products
+    "/fetch_home_base": 900,                    # DynamicConstants home base products
+}
+
+# Mutating endpoint -> cached endpoints whose entries for the same entity become stale
+INVALIDATED_BY: Dict[str, list] = {
+    "/add_new_program": ["/fetch_program_condition_pathway", "/fetch_pathways"],
+    "/assign_pathway": ["/fetch_program_condition_pathway", "/fetch_pathways"],
+    "/stop_pathway": ["/fetch_program_condition_pathway", "/fetch_pathways"],
+    "/restart_pathway": ["/fetch_program_condition_pathway", "/fetch_pathways"],
+    "/remove_pathway": ["/fetch_program_condition_pathway", "/fetch_pathways"],
+}
+
+# Payload fields identifying the member an entry belongs to
+ENTITY_KEYS = ("userId", "membership", "membershipNo", "membershipNumber")
+
+RESPONSE_CACHE_MAX_ENTRIES = int(os.getenv("RESPONSE_CACHE_MAX_ENTRIES", "2000"))
+
+def _normalize(data: Any) -> str:
+    return json.dumps(data, sort_keys=True, separators=(",", ":"), default=str)
+
+def _entity(data: Any) -> Optional[tuple]:
+    if not isinstance(data, dict):
+        return None
+    found = data.get("formData") if isinstance(data.get("formData"), dict) else data
+    values = tuple((k, str(found[k])) for k in ENTITY_KEYS if found.get(k))
+    return values or None
+
+def _cache_key(endpoint_name: str, data: Any, access_token: Optional[str]) -> tuple:
+    """
+    Catalog payloads are shared process-wide; a payload naming a member is also keyed by the
+    caller's token (digest), so one navigator never gets a member response fetched with another's.
+    """
+    scope = hashlib.sha256((access_token or "").encode("utf-8")).hexdigest()[:16] if _entity(data) else ""
+    return endpoint_name, _normalize(data), scope
+
+class ResponseCache:
+    """Process-wide LRU + per-endpoint TTL cache for decoded backend responses."""
+
+    def __init__(self, max_entries: int = RESPONSE_CACHE_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[tuple, tuple]" = OrderedDict()  # (endpoint, payload, scope) -> (expires_at, entity, value)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def get(self, endpoint_name: str, data: Any, access_token: Optional[str] = None) -> Optional[dict]:
+        if endpoint_name not in CACHEABLE_ENDPOINTS:
+            return None
+        key = _cache_key(endpoint_name, data, access_token)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] < time.monotonic():
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            value = entry[2]
+        # callers may mutate what they get back
+        return copy.deepcopy(value)
+
+    def put(self, endpoint_name: str, data: Any, value: dict, access_token: Optional[str] = None) -> None:
+        ttl = CACHEABLE_ENDPOINTS.get(endpoint_name)
+        if not ttl or not isinstance(value, dict) or "error" in value or value.get("code", 200) != 200:
+            return
+        key = _cache_key(endpoint_name, data, access_token)
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, _entity(data), copy.deepcopy(value))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate_for(self, endpoint_name: str, data: Any) -> None:
+        """Drop entries made stale by a mutating call; limited to the same member when the payload names one."""
+        targets = INVALIDATED_BY.get(endpoint_name)
+        if not targets:
+            return
+        entity = set(_entity(data) or ())
+        with self._lock:
+            for key in list(self._entries):
+                if key[0] not in targets:
+                    continue
+                cached_entity = set(self._entries[key][1] or ())
+                if not entity or not cached_entity or entity & cached_entity:
+                    del self._entries[key]
+                    self.invalidations += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+            }
+
+response_cache = ResponseCache()
@@ -0,0 +1,89 @@
+import asyncio
+import hashlib
+import os
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+SESSION_MAX_ENTRIES = int(os.getenv("SESSION_MAX_ENTRIES", "500"))
+SESSION_IDLE_TTL = int(os.getenv("SESSION_IDLE_TTL", "3600"))
+
+SessionKey = Tuple[str, str, str]
+
+def token_digest(access_token: Optional[str]) -> str:
+    """What a session remembers of the token that opened it; a resume must present the same token."""
+    return hashlib.sha256(access_token.encode("utf-8")).hexdigest() if access_token else ""
+
+class SessionRegistry:
+    """
+    Chat sessions keyed by (cnId, userId, sessionId) instead of Socket.IO sid, so a reconnect,
+    reload or second tab resumes the warm session. The key is client-supplied: callers must check
+    the session's `token_digest` against the caller's token before resuming it. Bounded by LRU
+    size and idle TTL; sids can come and go without touching the session itself.
+    """
+
+    def __init__(self, max_sessions: int = SESSION_MAX_ENTRIES, idle_ttl: int = SESSION_IDLE_TTL):
+        self.max_sessions = max_sessions
+        self.idle_ttl = idle_ttl
+        self._sessions: "OrderedDict[SessionKey, list]" = OrderedDict()  # key -> [session, last_used]
+        self._creating: Dict[SessionKey, asyncio.Future] = {}
+        self.evictions = 0
+
+    @staticmethod
+    def key_for(cn_id: Any, user_id: Any, session_id: Any) -> SessionKey:
+        return (str(cn_id or ""), str(user_id or ""), str(session_id or ""))
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    def get(self, key: SessionKey) -> Optional[Any]:
+        entry = self._sessions.get(key)
+        if entry is None:
+            return None
+        if time.monotonic() - entry[1] > self.idle_ttl:
+            self._drop(key)
+            return None
+        entry[1] = time.monotonic()
+        self._sessions.move_to_end(key)
+        return entry[0]
+
+    def put(self, key: SessionKey, session: Any) -> None:
+        self._sessions[key] = [session, time.monotonic()]
+        self._sessions.move_to_end(key)
+        self.evict_idle()
+        while len(self._sessions) > self.max_sessions:
+            oldest = next(iter(self._sessions))
+            self._drop(oldest)
+
+    async def get_or_create(self, key: SessionKey, factory: Callable[[], Awaitable[Any]]) -> Any:
+        """Return the warm session for `key`, building it once even if several events race for it."""
+        session = self.get(key)
+        if session is not None:
+            return session
+        pending = self._creating.get(key)
+        if pending is not None:
+            return await asyncio.shield(pending)
+        future = asyncio.get_running_loop().create_future()
+        self._creating[key] = future
+        try:
+            session = await factory()
+            self.put(key, session)
+            future.set_result(session)
+            return session
+        except BaseException as exc:
+            future.set_exception(exc)
+            future.exception()  # mark retrieved when nobody else was waiting
+            raise
+        finally:
+            self._creating.pop(key, None)
+
+    def evict_idle(self) -> int:
+        cutoff = time.monotonic() - self.idle_ttl
+        expired = [k for k, (_, last_used) in self._sessions.items() if last_used < cutoff]
+        for key in expired:
+            self._drop(key)
+        return len(expired)
+
+    def _drop(self, key: SessionKey) -> None:
+        self._sessions.pop(key, None)
+        self.evictions += 1
@@ -0,0 +1,135 @@
+import asyncio
+import copy
+import hashlib
+import json
+import os
+import threading
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+# Identical backend reads issued while one is already in flight wait for that one instead
+SINGLE_FLIGHT_ENABLED = os.getenv("SINGLE_FLIGHT_ENABLED", "1") == "1"
+
+def flight_key(endpoint_name: str, data: Any, access_token: Optional[str]) -> Tuple[str, str, str]:
+    """Endpoint + canonical payload + access scope (token digest, so tokens are not kept as keys)."""
+    payload = json.dumps(data, sort_keys=True, separators=(",", ":"), default=str)
+    scope = hashlib.sha256((access_token or "").encode("utf-8")).hexdigest()[:16]
+    return endpoint_name, payload, scope
+
+class _Call:
+    __slots__ = ("done", "result", "error", "joined")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+        self.joined = 0
+
+class _AsyncCall:
+    __slots__ = ("task", "joined")
+
+    def __init__(self, task: "asyncio.Task"):
+        self.task = task
+        self.joined = 0
+
+class SingleFlight:
+    """
+    Collapses concurrent identical calls into one: the first caller (leader) runs the call, later
+    callers with the same key block on it and get a deep copy of its result (or its exception).
+    Nothing is remembered once the call finishes; that is the response cache's job.
+    `do` is for worker threads (make_request), `ado` for coroutines on one event loop (make_request_async).
+    """
+
+    def __init__(self, enabled: bool = SINGLE_FLIGHT_ENABLED):
+        self.enabled = enabled
+        self._calls: Dict[Any, _Call] = {}
+        self._async_calls: Dict[Any, _AsyncCall] = {}
+        self._lock = threading.Lock()
+        self.leaders = 0
+        self.joined = 0
+        self.max_fanout = 0
+        self.by_endpoint: Dict[str, Dict[str, int]] = {}
+
+    def _count(self, key: Any, leader: bool) -> None:
+        counts = self.by_endpoint.setdefault(key[0] if isinstance(key, tuple) else str(key), {"leaders": 0, "joined": 0})
+        if leader:
+            self.leaders += 1
+            counts["leaders"] += 1
+        else:
+            self.joined += 1
+            counts["joined"] += 1
+
+    def _finished(self, joined: int) -> None:
+        self.max_fanout = max(self.max_fanout, joined + 1)
+
+    def do(self, key: Any, fn: Callable[[], Any]) -> Any:
+        if not self.enabled:
+            return fn()
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+            else:
+                call.joined += 1
+            self._count(key, leader)
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return copy.deepcopy(call.result)
+        result = None
+        try:
+            result = fn()
+            return result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+                self._finished(call.joined)
+            if call.joined:
+                # snapshot before the leader's caller can mutate what it gets back
+                call.result = copy.deepcopy(result)
+            call.done.set()
+
+    async def ado(self, key: Any, factory: Callable[[], Awaitable[Any]]) -> Any:
+        if not self.enabled:
+            return await factory()
+        key = (key, id(asyncio.get_running_loop()))
+        call = self._async_calls.get(key)
+        if call is not None and call.task.done():
+            # finished but not yet removed (done callbacks run on a later loop pass): the leader may
+            # already have its result back, so a late caller starts a fresh call instead of sharing it
+            call = None
+        with self._lock:
+            self._count(key[0], call is None)
+        if call is None:
+            call = self._async_calls[key] = _AsyncCall(asyncio.ensure_future(factory()))
+
+            def _remove(_task, key=key, call=call):
+                if self._async_calls.get(key) is call:
+                    del self._async_calls[key]
+                with self._lock:
+                    self._finished(call.joined)
+
+            call.task.add_done_callback(_remove)
+        else:
+            call.joined += 1
+        # shielded so a cancelled caller (leader included) does not cancel the call for the others
+        result = await asyncio.shield(call.task)
+        return copy.deepcopy(result) if call.joined else result
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            calls = self.leaders + self.joined
+            return {
+                "in_flight": len(self._calls) + len(self._async_calls),
+                "upstream_calls": self.leaders,
+                "joined": self.joined,
+                "dedup_ratio": round(self.joined / calls, 4) if calls else 0.0,
+                "max_fanout": self.max_fanout,
+                "by_endpoint": {k: dict(v) for k, v in self.by_endpoint.items() if v["joined"]},
+            }
+
+single_flight = SingleFlight()
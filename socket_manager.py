@@ -0,0 +1,53 @@
+import asyncio
+import os
+from typing import Dict, List, Optional
+
+import socketio
+from socketio.async_pubsub_manager import AsyncPubSubManager
+
+# Message queue shared by all workers so room emits reach sockets held by other processes:
+#   ""                    -> default in-process manager (single worker)
+#   "redis://host:6379/0" -> socketio.AsyncRedisManager (needs the `redis` package)
+#   "amqp://..."          -> socketio.AsyncAioPikaManager (needs `aio_pika`)
+#   "memory://"           -> LocalPubSubManager, an in-process stand-in broker for tests/dev
+SOCKETIO_MESSAGE_QUEUE = os.getenv("SOCKETIO_MESSAGE_QUEUE", "")
+SOCKETIO_CHANNEL = os.getenv("SOCKETIO_CHANNEL", "navi-socketio")
+
+class LocalPubSubManager(AsyncPubSubManager):
+    """
+    Pub/sub over asyncio queues shared by every manager in this process on the same channel.
+    Exercises the same code path as Redis (publish -> listen -> local emit) without a broker,
+    e.g. several AsyncServer instances in one test process.
+    """
+
+    name = "local"
+    _subscribers: Dict[str, List[asyncio.Queue]] = {}
+
+    def __init__(self, url: str = "memory://", channel: str = "socketio", write_only: bool = False, logger=None):
+        super().__init__(channel=channel, write_only=write_only, logger=logger)
+        self.url = url
+        self._queue: Optional[asyncio.Queue] = None
+
+    async def _publish(self, data):
+        for queue in list(self._subscribers.get(self.channel, [])):
+            queue.put_nowait(self.json.dumps(data))
+
+    async def _listen(self):
+        self._queue = asyncio.Queue()
+        self._subscribers.setdefault(self.channel, []).append(self._queue)
+        try:
+            while True:
+                yield await self._queue.get()
+        finally:
+            self._subscribers[self.channel].remove(self._queue)
+
+def build_client_manager(url: str = SOCKETIO_MESSAGE_QUEUE, channel: str = SOCKETIO_CHANNEL):
+    if not url:
+        return None
+    if url.startswith("memory://"):
+        return LocalPubSubManager(url, channel=channel)
+    if url.startswith(("redis://", "rediss://", "unix://")):
+        return socketio.AsyncRedisManager(url, channel=channel)
+    if url.startswith(("amqp://", "amqps://")):
+        return socketio.AsyncAioPikaManager(url, channel=channel)
+    raise ValueError(f"Unsupported SOCKETIO_MESSAGE_QUEUE: {url}")
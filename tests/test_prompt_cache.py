@@ -0,0 +1,143 @@
+import asyncio
+import threading
+import unittest
+from unittest import mock
+
+from google.genai import types
+
+import prompt_cache
+from prompt_cache import REFRESH_MARGIN, LocalCacheBackend, PromptCache
+
+MODEL = "gemini-test"
+TOOLS = [types.Tool(function_declarations=[types.FunctionDeclaration(name="member_profile_details")])]
+
+class FailingBackend(LocalCacheBackend):
+    def create(self, model, static_prompt, tools, ttl):
+        raise RuntimeError("cache API unavailable")
+
+class SlowBackend(LocalCacheBackend):
+    """Counts creates and holds each one open so concurrent callers overlap."""
+
+    def __init__(self):
+        super().__init__()
+        self.creates = 0
+        self.release = threading.Event()
+
+    def create(self, model, static_prompt, tools, ttl):
+        self.creates += 1
+        self.release.wait(1)
+        return super().create(model, static_prompt, tools, ttl)
+
+    async def acreate(self, model, static_prompt, tools, ttl):
+        self.creates += 1
+        await asyncio.sleep(0.01)
+        return super().create(model, static_prompt, tools, ttl)
+
+class AsyncOnlyDeleteBackend(LocalCacheBackend):
+    """Fails the test if the async path reaches the blocking delete."""
+
+    def delete(self, name):
+        raise AssertionError("sync delete called from aget")
+
+    async def adelete(self, name):
+        self.entries.pop(name, None)
+
+class PromptCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.backend = LocalCacheBackend()
+        self.cache = PromptCache(self.backend, ttl=600)
+
+    def test_create_registers_prefix(self):
+        name = self.cache.get(MODEL, "static prompt", TOOLS)
+        self.assertIn(name, self.backend.entries)
+        self.assertEqual(self.backend.entries[name]["static_prompt"], "static prompt")
+        self.assertEqual(self.backend.entries[name]["ttl"], 600)
+
+    def test_reuse_while_fresh(self):
+        first = self.cache.get(MODEL, "static prompt", TOOLS)
+        self.assertEqual(self.cache.get(MODEL, "static prompt", TOOLS), first)
+        self.assertEqual(len(self.backend.entries), 1)
+
+    def test_refresh_before_expiry(self):
+        with mock.patch.object(prompt_cache.time, "monotonic", return_value=1000.0):
+            first = self.cache.get(MODEL, "static prompt", TOOLS)
+        # inside the refresh margin of the 600s TTL
+        with mock.patch.object(prompt_cache.time, "monotonic", return_value=1000.0 + 600 - REFRESH_MARGIN + 1):
+            second = self.cache.get(MODEL, "static prompt", TOOLS)
+        self.assertNotEqual(first, second)
+
+    def test_hash_change_deletes_replaced_entry(self):
+        first = self.cache.get(MODEL, "static prompt v1", TOOLS)
+        second = self.cache.get(MODEL, "static prompt v2", TOOLS)
+        self.assertNotEqual(first, second)
+        self.assertNotIn(first, self.backend.entries)
+        self.assertIn(second, self.backend.entries)
+        self.assertEqual(len(self.cache._entries), 1)
+
+    def test_other_model_is_kept(self):
+        first = self.cache.get(MODEL, "static prompt", TOOLS)
+        self.cache.get("other-model", "static prompt", TOOLS)
+        self.assertIn(first, self.backend.entries)
+
+    def test_invalidate_forces_new_create(self):
+        first = self.cache.get(MODEL, "static prompt", TOOLS)
+        self.cache.invalidate(first)
+        second = self.cache.get(MODEL, "static prompt", TOOLS)
+        self.assertNotEqual(first, second)
+
+    def test_invalidate_deletes_server_side_entry(self):
+        first = self.cache.get(MODEL, "static prompt", TOOLS)
+        self.cache.invalidate(first)
+        self.assertNotIn(first, self.backend.entries)
+        asyncio.run(self.cache.ainvalidate(first))  # already forgotten: no second delete
+
+    def test_async_replacement_uses_async_delete(self):
+        backend = AsyncOnlyDeleteBackend()
+        cache = PromptCache(backend)
+
+        async def run():
+            first = await cache.aget(MODEL, "static prompt v1", TOOLS)
+            await cache.aget(MODEL, "static prompt v2", TOOLS)
+            await cache.ainvalidate(await cache.aget(MODEL, "static prompt v2", TOOLS))
+            return first
+
+        first = asyncio.run(run())
+        self.assertNotIn(first, backend.entries)
+        self.assertEqual(backend.entries, {})
+
+    def test_backend_failure_falls_back(self):
+        cache = PromptCache(FailingBackend())
+        self.assertIsNone(cache.get(MODEL, "static prompt", TOOLS))
+        self.assertIsNone(asyncio.run(cache.aget(MODEL, "static prompt", TOOLS)))
+
+    def test_async_get_reuses_sync_entry(self):
+        first = self.cache.get(MODEL, "static prompt", TOOLS)
+        self.assertEqual(asyncio.run(self.cache.aget(MODEL, "static prompt", TOOLS)), first)
+
+    def test_concurrent_async_gets_share_one_create(self):
+        backend = SlowBackend()
+        cache = PromptCache(backend)
+
+        async def run():
+            return await asyncio.gather(*(cache.aget(MODEL, "static prompt", TOOLS) for _ in range(5)))
+
+        names = asyncio.run(run())
+        self.assertEqual(backend.creates, 1)
+        self.assertEqual(len(set(names)), 1)
+
+    def test_concurrent_sync_gets_share_one_create(self):
+        backend = SlowBackend()
+        cache = PromptCache(backend)
+        names = []
+        threads = [threading.Thread(target=lambda: names.append(cache.get(MODEL, "static prompt", TOOLS)))
+                   for _ in range(5)]
+        for t in threads:
+            t.start()
+        backend.release.set()
+        for t in threads:
+            t.join()
+        self.assertEqual(backend.creates, 1)
+        self.assertEqual(len(set(names)), 1)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1080,6 +1080,45 @@ complete_task_declaration = {
     }
 }
 
+more_tool_results_declaration = {
+    "name": "more_tool_results",
+    "description": "Returns the next page of a list that an earlier tool result cut short (the result says 'N more ... not shown').",
+    "parameters": {
+        "type": "object",
+        "properties": {
+            "toolName": {
+                "type": "string",
+                "description": "Name of the tool whose result was cut short, e.g. 'get_task_list'."
+            },
+            "listName": {
+                "type": "string",
+                "description": "Name of the list that was cut short, e.g. 'tasks'."
+            },
+            "offset": {
+                "type": "integer",
+                "description": "Index of the first item to return, as given in the 'more' note."
+            }
+        },
+        "required": ["toolName", "listName", "offset"]
+    }
+}
+
+member_option_lists_declaration = {
+    "name": "member_option_lists",
+    "description": "Returns option names for the currently logged-in member that are not loaded in the Member Context yet.",
+    "parameters": {
+        "type": "object",
+        "properties": {
+            "listName": {
+                "type": "string",
+                "enum": ["disenrollment_reasons", "health_metrics", "cities", "partner_clinics", "lab_tests", "home_care_categories", "home_based_products"],
+                "description": "Which option list to load."
+            }
+        },
+        "required": ["listName"]
+    }
+}
+
 
 TOOLS = [
     types.Tool(
@@ -1096,6 +1135,7 @@ TOOLS = [
                                fetch_requested_services_declaration, fetch_working_plans_and_breaks_declaration, add_break_declaration, delete_break_declaration,
                                search_view_member_under_cn_declaration, fetch_calender_calls_declaration, add_bmi_declaration, fetch_member_call_history_declaration,
                                fetch_member_services_declaration, fetch_task_list_declaration, dismiss_task_declaration, transfer_task_declaration, fetch_monthly_service_suggestions_declaration, complete_task_declaration,
+                               more_tool_results_declaration, member_option_lists_declaration,
                                ],
     )
 ]
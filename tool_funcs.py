@@ -1,8 +1,11 @@
-from enc_dec import make_request
+from enc_dec import make_request, make_request_async
 from datetime import datetime, date, timedelta
 from dateutil.tz import gettz
 import webbrowser
-from constants import DynamicConstants
+from constants import MEMBER_OPTION_LISTS, DynamicConstants
+from projection import project_list
+from name_index import NameIndex, same_name
+from pagination import MEMBER_SEARCH_LIMIT, TASK_PAGE_SIZE, PagedRequest
 
 def add_note(dynamic_constants: DynamicConstants, notes: str):
     """Add notes for the member"""
@@ -24,9 +27,9 @@ def disenroll_member(dynamic_constants: DynamicConstants, reason: str, disEnroll
 
     try:
         endpoint_name = "/request_disenrollment"
-        disEnrollmentReason = dynamic_constants.reason_lookup.get(reason)
+        disEnrollmentReason = dynamic_constants.reason_index.get(reason)
         if not disEnrollmentReason:
-           return {"error": f"The reason '{reason}' was not found. Please provide a valid reason from the available options."}
+           return {"error": f"The reason '{reason}' was not found.{dynamic_constants.reason_index.hint(reason)} Please provide a valid reason from the available options."}
         data = {"userId": dynamic_constants.user_id, "disEnrollmentReason": disEnrollmentReason, "disEnrollmentNote": disEnrollmentNote}
         output = make_request(endpoint_name=endpoint_name, data=data, access_token=dynamic_constants.access_token)
         return output
@@ -39,10 +42,10 @@ def add_health_metric(dynamic_constants: DynamicConstants, metricsName: str, met
     try:
         endpoint_name = "/add_generic_metrics_vals"
         membershipNo = dynamic_constants.user_profile["data"]["info"]["membershipNumber"]
-        metrics_lookup = {entry["metricsName"]: entry for entry in dynamic_constants.metrics_details_list}
-        details = metrics_lookup.get(metricsName)
+        details = dynamic_constants.metrics_index.get(metricsName)
         if details is None:
-            return {"error": f"The metric '{metricsName}' was not found. Please provide a valid metric name."}
+            return {"error": f"The metric '{metricsName}' was not found.{dynamic_constants.metrics_index.hint(metricsName)} Please provide a valid metric name."}
+        metricsName = details["metricsName"]
         metricsId = details["metricsId"]
         keyword   = details["keyword"]
         data = {"formData": {"userId": dynamic_constants.user_id, "membershipNo": membershipNo,"metricsName": metricsName, "metricsVal": metricsVal, "metricsDate": metricsDate, "metricsId": metricsId, "keyword": keyword}}
@@ -56,9 +59,9 @@ def services_by_category(dynamic_constants: DynamicConstants, categoryName: str)
 
     try:
         endpoint_name = "/fetch_service_by_category"
-        categoryId = dynamic_constants.category_lookup.get(categoryName)
+        categoryId = dynamic_constants.category_index.get(categoryName)
         if categoryId is None:
-            return {"error": f"The category '{categoryName}' was not found. Please provide a valid category name."}
+            return {"error": f"The category '{categoryName}' was not found.{dynamic_constants.category_index.hint(categoryName)} Please provide a valid category name."}
         data = {"categoryId": categoryId}
         output = make_request(endpoint_name=endpoint_name, data=data, access_token=dynamic_constants.access_token)
         return output.get("data", {})
@@ -74,15 +77,15 @@ def add_new_service(dynamic_constants: DynamicConstants, categoryName: str, serv
         services_list = services_resp.get("services", [])
         if not services_list:
             return {"error": f"No services were found under the category '{categoryName}'. Please select a different category."}
-        service_lookup = {s["serviceName"]: s["serviceId"] for s in services_list}
-        serviceId = service_lookup.get(serviceName)
+        service_index = NameIndex((s["serviceName"], s["serviceId"]) for s in services_list)
+        serviceId = service_index.get(serviceName)
         if serviceId is None:
-            return {"error": f"The service '{serviceName}' was not found. Please choose from the following available services: {', '.join(service_lookup.keys())}."}
+            return {"error": f"The service '{serviceName}' was not found.{service_index.hint(serviceName)} Please choose from the following available services: {', '.join(service_index.names)}."}
         pathways = dynamic_constants.user_profile["data"]["info"]["memberPathways"]
         if not pathways:
             return {"error": "Sorry, I cannot add a new service because no active pathway was found for this member."}
         pathwayId = pathways[0]["pathwayId"]
-        data = {"userId": dynamic_constants.user_id, "formData": {"pathwayId": pathwayId, "categoryId": dynamic_constants.category_lookup[categoryName], "serviceId": serviceId, "date": date, "time": time, "notes": notes or ""}}
+        data = {"userId": dynamic_constants.user_id, "formData": {"pathwayId": pathwayId, "categoryId": dynamic_constants.category_index.get(categoryName), "serviceId": serviceId, "date": date, "time": time, "notes": notes or ""}}
         output = make_request(endpoint_name=endpoint_name, data=data, access_token=dynamic_constants.access_token)
         return output
     except Exception as e:
@@ -94,7 +97,7 @@ def raise_new_ticket(dynamic_constants: DynamicConstants, title: str, ticketType
     try:
         endpoint_name = "/add_new_ticket"
         membershipNo = dynamic_constants.user_profile["data"]["info"]["membershipNumber"]
-        type = dynamic_constants.ticket_type_lookup.get(ticketType)
+        type = dynamic_constants.ticket_type_index.get(ticketType)
         data = {"membershipNo": membershipNo, "type": type, "title": title, "priority": priority, "description": description, "files": "[]"}
         output = make_request(endpoint_name=endpoint_name, data=data, access_token=dynamic_constants.access_token)
         return output
@@ -119,24 +122,27 @@ def assign_program(dynamic_constants: DynamicConstants, programName: str, condit
         endpoint_name = "/add_new_program"
         programs_info = program_details(dynamic_constants)
         programs_list = programs_info["programs"]
-        selected_program = next((p for p in programs_list if p["programName"] == programName),None)
+        program_index = NameIndex.from_records(programs_list, "programName")
+        selected_program = program_index.get(programName)
         if not selected_program:
-            available_programs = [p["programName"] for p in programs_list]
-            return {"error": f"Unknown program name: '{programName}'. Available programs: {available_programs}"}  
+            available_programs = program_index.names
+            return {"error": f"Unknown program name: '{programName}'.{program_index.hint(programName)} Available programs: {available_programs}"}  
         programId = selected_program["programId"]
         conditions = selected_program.get("conditions", [])
-        selected_condition = next((c for c in conditions if c["conditionName"] == conditionName),None)
+        condition_index = NameIndex.from_records(conditions, "conditionName")
+        selected_condition = condition_index.get(conditionName)
         if not selected_condition:
-            available_conditions = [c["conditionName"] for c in conditions]
-            return {"error": f"Unknown condition name: '{conditionName}' under program '{programName}'. Available conditions: {available_conditions}"}
+            available_conditions = condition_index.names
+            return {"error": f"Unknown condition name: '{conditionName}' under program '{programName}'.{condition_index.hint(conditionName)} Available conditions: {available_conditions}"}
         conditionId = selected_condition["conditionId"]
         pathwayId = ""
         if pathwayName:
             pathways = selected_condition.get("pathways", [])
-            selected_pathway = next((pw for pw in pathways if pw["pathwayName"] == pathwayName),None)
+            pathway_index = NameIndex.from_records(pathways, "pathwayName")
+            selected_pathway = pathway_index.get(pathwayName)
             if not selected_pathway:
-                available_pathways = [pw["pathwayName"] for pw in pathways]
-                return {"error": f"Unknown pathway name: '{pathwayName}' under condition '{conditionName}'. Available pathways: {available_pathways}"}
+                available_pathways = pathway_index.names
+                return {"error": f"Unknown pathway name: '{pathwayName}' under condition '{conditionName}'.{pathway_index.hint(pathwayName)} Available pathways: {available_pathways}"}
             pathwayId = selected_pathway["pathwayId"]
         data = {"userId": dynamic_constants.user_id, "formData": {"programId": programId, "conditionId": conditionId, "pathwayId": pathwayId}}
         output = make_request(endpoint_name=endpoint_name, data=data, access_token=dynamic_constants.access_token)
@@ -144,11 +150,17 @@ def assign_program(dynamic_constants: DynamicConstants, programName: str, condit
     except Exception as e:
         return {"error": "Sorry, I can't assign a new program at this moment for the member. Please try again later."}
 
+def _assigned_programs(dynamic_constants: DynamicConstants) -> dict:
+    """Assigned programs for the name lookups of the pathway tools; the stored profile stands in for a fetch."""
+    member_profile = dynamic_constants.entities.fetch("profile", dynamic_constants.fetch_user_profile_details)
+    return member_profile.get("data", {}).get("info", {})
+
 def user_assigned_programs(dynamic_constants: DynamicConstants):
     """Fetches a list of all programs currently assigned to the member"""
 
     try:
         member_profile = dynamic_constants.fetch_user_profile_details()
+        dynamic_constants.entities.put("profile", member_profile)
         return member_profile.get("data", {}).get("info", {})
     except Exception as e:
         return {"error": "Sorry, I couldn't fetch the member's currently assigned programs at the moment. Please try again later."}
@@ -158,12 +170,13 @@ def stop_condition(dynamic_constants: DynamicConstants, pathwayName: str, remark
 
     try:
         endpoint_name = "/stop_pathway"
-        member_info = user_assigned_programs(dynamic_constants)
+        member_info = _assigned_programs(dynamic_constants)
         member_pathways = member_info.get("memberPathways", [])
-        selected_pathway = next((p for p in member_pathways if p["pathwayName"] == pathwayName),None)
+        pathway_index = NameIndex.from_records(member_pathways, "pathwayName")
+        selected_pathway = pathway_index.get(pathwayName)
         if not selected_pathway:
             available_active_pathways = [p["pathwayName"] for p in member_pathways if p.get("pathwayStatus") == "active"]
-            return {"error": f"The pathway '{pathwayName}' could not be found or is not a active pathway. "
+            return {"error": f"The pathway '{pathwayName}' could not be found or is not a active pathway.{pathway_index.hint(pathwayName)} "
                             f"Available active pathways: {available_active_pathways}"}
         if selected_pathway.get("pathwayStatus") != "active":
             return {"error": f"The pathway '{pathwayName}' cannot be stopped as its status is '{selected_pathway.get('pathwayStatus')}', not 'active'."}
@@ -180,12 +193,13 @@ def restart_condition(dynamic_constants: DynamicConstants, pathwayName: str, rem
 
     try:
         endpoint_name = "/restart_pathway"
-        member_info = user_assigned_programs(dynamic_constants)
+        member_info = _assigned_programs(dynamic_constants)
         member_pathways = member_info.get("memberPathways", [])
-        selected_pathway = next((p for p in member_pathways if p["pathwayName"] == pathwayName),None)
+        pathway_index = NameIndex.from_records(member_pathways, "pathwayName")
+        selected_pathway = pathway_index.get(pathwayName)
         if not selected_pathway:
             available_stopped_pathways = [p["pathwayName"] for p in member_pathways if p.get("pathwayStatus") == "stopped"]
-            return {"error": f"The pathway '{pathwayName}' could not be found or is not a stopped pathway. "
+            return {"error": f"The pathway '{pathwayName}' could not be found or is not a stopped pathway.{pathway_index.hint(pathwayName)} "
                             f"Available stopped pathways: {available_stopped_pathways}"}
         if selected_pathway.get("pathwayStatus") != "stopped":
             return {"error": f"The pathway '{pathwayName}' cannot be restarted as its status is '{selected_pathway.get('pathwayStatus')}', not 'stopped'."}
@@ -202,11 +216,12 @@ def remove_condition(dynamic_constants: DynamicConstants, conditionName: str):
 
     try:
         endpoint_name = "/remove_pathway"
-        member_info = user_assigned_programs(dynamic_constants)
+        member_info = _assigned_programs(dynamic_constants)
         member_pathways = member_info.get("memberPathways", [])
-        selected_condition = next((p for p in member_pathways if p["conditionName"] == conditionName),None)
+        condition_index = NameIndex.from_records(member_pathways, "conditionName")
+        selected_condition = condition_index.get(conditionName)
         if not selected_condition:
-            return {"error": f"The condition '{conditionName}' could not be found for the member."}
+            return {"error": f"The condition '{conditionName}' could not be found for the member.{condition_index.hint(conditionName)}"}
         if selected_condition.get("pathwayStatus") != "notset":
             return {"error": f"The condition '{conditionName}' cannot be removed because its pathway status is "
                             f"'{selected_condition.get('pathwayStatus')}', not 'notset'."}
@@ -222,9 +237,9 @@ def available_pathways_for_program_condition(dynamic_constants: DynamicConstants
 
     try:
         endpoint_name = "/fetch_pathways"
-        member_info = user_assigned_programs(dynamic_constants)
+        member_info = _assigned_programs(dynamic_constants)
         member_pathways = member_info.get("memberPathways", [])
-        assigned_program_condition = next((p for p in member_pathways if p["programName"] == programName and p["conditionName"] == conditionName),None)
+        assigned_program_condition = next((p for p in member_pathways if same_name(p["programName"], programName) and same_name(p["conditionName"], conditionName)),None)
         if not assigned_program_condition:
             return {"error": f"Program '{programName}' with condition '{conditionName}' not found in member's assigned programs."}
         programId = assigned_program_condition.get("programId")
@@ -241,9 +256,9 @@ def change_pathway(dynamic_constants: DynamicConstants, programName: str, condit
 
     try:
         endpoint_name = "/assign_pathway"
-        member_info = user_assigned_programs(dynamic_constants)
+        member_info = _assigned_programs(dynamic_constants)
         member_pathways = member_info.get("memberPathways", [])
-        assigned_program_condition = next((p for p in member_pathways if p["programName"] == programName and p["conditionName"] == conditionName and p["pathwayName"] == oldPathwayName), None)
+        assigned_program_condition = next((p for p in member_pathways if same_name(p["programName"], programName) and same_name(p["conditionName"], conditionName) and same_name(p["pathwayName"], oldPathwayName)), None)
         if not assigned_program_condition:
             return {"error": f"Could not find an assigned pathway matching '{oldPathwayName}' under program '{programName}' and condition '{conditionName}'."}
         programId = assigned_program_condition.get("programId")
@@ -253,10 +268,11 @@ def change_pathway(dynamic_constants: DynamicConstants, programName: str, condit
         pathways_list = new_pathway_details.get("pathways", [])
         if not pathways_list:
             return {"error": f"No pathways available for program '{programName}' and condition '{conditionName}'."}
-        new_pathway_match = next((p for p in pathways_list if p["pathwayName"] == newPathwayName),None)
+        pathway_index = NameIndex.from_records(pathways_list, "pathwayName")
+        new_pathway_match = pathway_index.get(newPathwayName)
         if not new_pathway_match:
-            available_pathway_names = [p["pathwayName"] for p in pathways_list]
-            return {"error": f"New pathway '{newPathwayName}' not found. Available pathways are: {available_pathway_names}"}
+            available_pathway_names = pathway_index.names
+            return {"error": f"New pathway '{newPathwayName}' not found.{pathway_index.hint(newPathwayName)} Available pathways are: {available_pathway_names}"}
         newPathwayId = new_pathway_match.get("pathwayId")
         data = {"userId": dynamic_constants.user_id, "programId": programId, "conditionId": conditionId, "oldPathwayId": oldPathwayId, "pathwayId": newPathwayId, "notes": notes}
         output = make_request(endpoint_name=endpoint_name, data=data, access_token=dynamic_constants.access_token)
@@ -275,6 +291,7 @@ def member_upcoming_scheduled_call(dynamic_constants: DynamicConstants):
             all_calls = response["data"]["calls"]
             scheduled_calls = [call for call in all_calls if call.get("status") == "Scheduled"]
             output = {"code": 200, "data": {"calls": scheduled_calls}}
+            dynamic_constants.entities.put("scheduled_calls", output["data"])
             return output.get("data", {})
         else:
             return {"error": "No calls scheduled for member."}
@@ -286,7 +303,7 @@ def cancel_or_reschedule_call(dynamic_constants: DynamicConstants, action: str,
 
     try:
         endpoint_name = "/cancel_or_reschedule_appointment"
-        scheduled_calls_data = member_upcoming_scheduled_call(dynamic_constants)
+        scheduled_calls_data = dynamic_constants.entities.fetch("scheduled_calls", lambda: member_upcoming_scheduled_call(dynamic_constants))
         all_scheduled_calls = scheduled_calls_data["calls"]
         target_appointment = next((call for call in all_scheduled_calls if call.get("date") == old_slot_date and call.get("time") == old_slot_time), None)
 
@@ -298,8 +315,8 @@ def cancel_or_reschedule_call(dynamic_constants: DynamicConstants, action: str,
         streams_payload = []
         if action == "cancel" and streamNames:
             for streamName in streamNames:
-                streamValue = dynamic_constants.streams_lookup.get(streamName)
-                streams_payload.append({"label": streamName, "value": streamValue})
+                streamValue = dynamic_constants.streams_index.get(streamName)
+                streams_payload.append({"label": dynamic_constants.streams_index.canonical(streamName), "value": streamValue})
 
         data = {
             "userId": dynamic_constants.user_id,
@@ -324,6 +341,7 @@ def available_tickets(dynamic_constants: DynamicConstants):
         membershipNo = dynamic_constants.user_profile["data"]["info"]["membershipNumber"]
         data = {"perPage": 7, "pageNumber": 1, "membershipNo": membershipNo}
         output = make_request(endpoint_name=endpoint_name, data=data, access_token=dynamic_constants.access_token)
+        dynamic_constants.entities.put("tickets", output.get("data"))
         return output.get("data", {})
     except Exception as e:
          return {"error": "Sorry, I can't fetch the available tickets at this moment. Please try again later."}
@@ -333,12 +351,13 @@ def add_comment_on_ticket(dynamic_constants: DynamicConstants, ticketTitle: str,
 
     try:
         endpoint_name = "/comment_on_ticket"
-        members_all_tickets_info = available_tickets(dynamic_constants)
+        members_all_tickets_info = dynamic_constants.entities.fetch("tickets", lambda: available_tickets(dynamic_constants))
         all_tickets = members_all_tickets_info.get("tickets", [])
-        selected_ticket = next((p for p in all_tickets if p.get("title") == ticketTitle),None)
+        ticket_index = NameIndex.from_records(all_tickets, "title")
+        selected_ticket = ticket_index.get(ticketTitle)
         if not selected_ticket:
             available_titles = [t["title"] for t in all_tickets]
-            return {"error": f"Ticket with title '{ticketTitle}' not found. Available titles: {available_titles}"}
+            return {"error": f"Ticket with title '{ticketTitle}' not found.{ticket_index.hint(ticketTitle)} Available titles: {available_titles}"}
         encTicketId = selected_ticket.get("encTicketId")
         data = {"comment": comment, "ticketId": encTicketId, "commentBy": "carenavigator"}
         output = make_request(data=data, endpoint_name=endpoint_name, access_token=dynamic_constants.access_token)
@@ -351,10 +370,10 @@ def lab_providers(dynamic_constants: DynamicConstants, cityName: str):
 
     try:
         endpoint_name = "/fetch_form_data"
-        city_id = dynamic_constants.city_lookup.get(cityName)
+        city_id = dynamic_constants.city_index.get(cityName)
         if city_id is None:
-            available_cities = list(dynamic_constants.city_lookup.keys())
-            return {"error": f"The city '{cityName}' was not found. Please select from the available cities: {', '.join(available_cities)}."}
+            available_cities = dynamic_constants.city_index.names
+            return {"error": f"The city '{cityName}' was not found.{dynamic_constants.city_index.hint(cityName)} Please select from the available cities: {', '.join(available_cities)}."}
         data = {"cityId": city_id, "membership": dynamic_constants.user_profile["data"]["info"]["membershipNumber"]}
         output = make_request(data=data, endpoint_name=endpoint_name, access_token=dynamic_constants.access_token)
         return output.get("data", {})
@@ -372,9 +391,10 @@ def lab_request(dynamic_constants: DynamicConstants, coPayment: str, preferredAp
         lab_providers_list = available_lab_providers.get("lab", [])
         if not lab_providers_list:
             return {"result": f"No lab providers were found in {cityName}."}
-        lab_provider_lookup = {l["labName"]: l["id"] for l in lab_providers_list}
-        labProviderId = lab_provider_lookup.get(labProviderName)
-        mapped_lab_types = [dynamic_constants.labtest_lookup.get(test) for test in requestedLabTest]
+        lab_provider_index = NameIndex((l["labName"], l["id"]) for l in lab_providers_list)
+        labProviderId = lab_provider_index.get(labProviderName)
+        labProviderName = lab_provider_index.canonical(labProviderName)
+        mapped_lab_types = [dynamic_constants.labtest_index.get(test) for test in requestedLabTest]
         labTests = ",".join(mapped_lab_types)
 
         data = {
@@ -394,9 +414,9 @@ def lab_request(dynamic_constants: DynamicConstants, coPayment: str, preferredAp
                 "district": district,
                 "remarks": remarks,
                 "approvalNumber": approvalNumber if isinstance(approvalNumber, int) else "",
-                "city": cityName,
-                "cityId": dynamic_constants.city_lookup.get(cityName),
-                "partnerClinic": dynamic_constants.partner_lookup.get(partnerClinic),
+                "city": dynamic_constants.city_index.canonical(cityName),
+                "cityId": dynamic_constants.city_index.get(cityName),
+                "partnerClinic": dynamic_constants.partner_index.get(partnerClinic),
                 "requestedLabTest": labTests,
                 "selectedUserNames": labTests,
                 "productCount": len(requestedLabTest)
@@ -412,7 +432,7 @@ def homecare_lab_providers(dynamic_constants: DynamicConstants, cityName: str, c
     
     try:
         endpoint_name = "/fetch_home_care"
-        data = {"cityName": dynamic_constants.city_lookup.get(cityName), "categoryName": dynamic_constants.hc_cat_lookup.get(categoryName), "membership": dynamic_constants.user_profile["data"]["info"]["membershipNumber"]}
+        data = {"cityName": dynamic_constants.city_index.get(cityName), "categoryName": dynamic_constants.hc_cat_index.get(categoryName), "membership": dynamic_constants.user_profile["data"]["info"]["membershipNumber"]}
         output = make_request(data=data, endpoint_name=endpoint_name, access_token=dynamic_constants.access_token)
         return output.get("data", {})
     except Exception as e:
@@ -423,7 +443,7 @@ def homecare_health_products(dynamic_constants: DynamicConstants, cityName: str,
 
     try:
         endpoint_name = "/fetch_home_care"
-        data = {"cityName": dynamic_constants.city_lookup.get(cityName), "categoryName": dynamic_constants.hc_cat_lookup.get(categoryName), "membership": dynamic_constants.user_profile["data"]["info"]["membershipNumber"]}
+        data = {"cityName": dynamic_constants.city_index.get(cityName), "categoryName": dynamic_constants.hc_cat_index.get(categoryName), "membership": dynamic_constants.user_profile["data"]["info"]["membershipNumber"]}
         output = make_request(data=data, endpoint_name=endpoint_name, access_token=dynamic_constants.access_token)
         return output.get("data", {})
     except Exception as e:
@@ -440,14 +460,14 @@ def home_care_request(dynamic_constants: DynamicConstants, coPayment: str, prefe
         hc_lab_providers_list = available_hc_lab_providers.get("provider", [])
         if not hc_lab_providers_list:
             return {"error": f"No home care lab providers available for category '{categoryName}' in {cityName}."}
-        hc_lab_provider_lookup = {hc["providerName"]: hc["id"] for hc in hc_lab_providers_list}
-        homeHealthCareId = hc_lab_provider_lookup.get(labProviderName)
+        hc_lab_provider_index = NameIndex((hc["providerName"], hc["id"]) for hc in hc_lab_providers_list)
+        homeHealthCareId = hc_lab_provider_index.get(labProviderName)
+        labProviderName = hc_lab_provider_index.canonical(labProviderName)
         available_hc_products = homecare_health_products(dynamic_constants, cityName=cityName, categoryName=categoryName)
         hc_products_list = available_hc_products.get("products", [])
         if not hc_products_list:
             return {"error": f"No home care products available for category '{categoryName}' in {cityName}."}
-        hc_products_lookup = {hc["label"]: hc["value"] for hc in hc_products_list}
-        product = hc_products_lookup.get(productName)
+        product = NameIndex((hc["label"], hc["value"]) for hc in hc_products_list).get(productName)
         data = {
             "formData": {
                 "userId": dynamic_constants.user_id,
@@ -462,10 +482,10 @@ def home_care_request(dynamic_constants: DynamicConstants, coPayment: str, prefe
                 "nationality": dynamic_constants.user_profile["data"]["info"]["nationality"],
                 "district": district,
                 "remarks": remarks,
-                "city": cityName,
-                "cityId": dynamic_constants.city_lookup.get(cityName),
+                "city": dynamic_constants.city_index.canonical(cityName),
+                "cityId": dynamic_constants.city_index.get(cityName),
                 "partnerClinic": "Direct Request",
-                "category": dynamic_constants.hc_cat_lookup.get(categoryName),
+                "category": dynamic_constants.hc_cat_index.get(categoryName),
                 "labProviderName": labProviderName,
                 "homeHealthCare": homeHealthCareId,
                 "product": product
@@ -487,15 +507,15 @@ def homebase_vaccine_request(dynamic_constants: DynamicConstants, cityName: str,
             "membership": dynamic_constants.user_profile["data"]["info"]["membershipNumber"],
             "name": dynamic_constants.user_profile["data"]["info"]["memberName"],
             "mobileNumber":dynamic_constants.user_profile["data"]["info"]["mobile"],
-            "city": cityName,
-            "cityId": dynamic_constants.city_lookup.get(cityName),
+            "city": dynamic_constants.city_index.canonical(cityName),
+            "cityId": dynamic_constants.city_index.get(cityName),
             "partnerClinic": "Direct Request",
             "deductible": deductible,
             "vaccine": vaccine,
             "nationality": dynamic_constants.user_profile["data"]["info"]["nationality"],
             "district": district,
             "remarks": remarks,
-            "requestedHomeHealth": dynamic_constants.hb_product_lookup.get(productName),
+            "requestedHomeHealth": dynamic_constants.hb_product_index.get(productName),
             }
         }
         output = make_request(data=data, endpoint_name=endpoint_name, access_token=dynamic_constants.access_token)
@@ -521,34 +541,70 @@ def scheduled_calls_under_cn(dynamic_constants: DynamicConstants):
     except Exception as e:
         return {"error": "Sorry, I couldn't retrieve all scheduled calls under the current care navigator at this moment. Please try again later."}
 
+def _id_key(value) -> str:
+    """Exact key for an ID the model may send as 12 or 12.0; IDs are never fuzzy-matched (see NameIndex)."""
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    return str(value)
+
+def _member_search(dynamic_constants: DynamicConstants, searchStr: str, **filters) -> PagedRequest:
+    """Paged `/fetch_users_list_v2` member search."""
+    data = {"searchStr": searchStr, "appliedFilter": {}, **filters}
+    return PagedRequest("/fetch_users_list_v2", data, dynamic_constants.access_token, items_key="users", page_key="pageNumber")
+
 def userinfo_by_name_query(dynamic_constants: DynamicConstants, searchQuery: str):
     """Fetches user info by name for scheduling calls"""
 
     try:
-        endpoint_name = "/fetch_users_list_v2"
-        data = {"searchStr": searchQuery, "appliedFilter": {}, "pageNumber": 1}
-        output = make_request(data=data, endpoint_name=endpoint_name, access_token=dynamic_constants.access_token)
+        output = _member_search(dynamic_constants, searchQuery).collect(limit=MEMBER_SEARCH_LIMIT)
+        return output.get("data", {})
+    except Exception as e:
+        return {"error": "Sorry, I couldn't search the member name at the moment. Please try again later."}
+
+async def auserinfo_by_name_query(dynamic_constants: DynamicConstants, searchQuery: str):
+    try:
+        output = await _member_search(dynamic_constants, searchQuery).acollect(limit=MEMBER_SEARCH_LIMIT)
         return output.get("data", {})
     except Exception as e:
         return {"error": "Sorry, I couldn't search the member name at the moment. Please try again later."}
 
+def _first_member_named(memberName: str) -> dict:
+    """collect()/acollect() arguments that stop paging at the first member with this name."""
+    return {"limit": 1, "match": lambda user: same_name(user.get("memberName"), memberName)}
+
+def _call_with_cn_payload(search_output: dict, memberName: str, appointmentDateTime) -> dict:
+    """`/schedule_carenavigator_call` payload for the matched member, or an `{"error": ...}`."""
+    user_names_list = search_output.get("data", {}).get("users", [])
+    if not user_names_list:
+        return {"error": f"No members found matching the search query: '{memberName}'."}
+    userId = NameIndex((user["memberName"], user["userId"]) for user in user_names_list).get(memberName)
+    return {"userId": userId, "date": appointmentDateTime}
+
 def schedule_call_with_cn(dynamic_constants: DynamicConstants, memberName: str, appointmentDateTime):
     """Schedule member's call with care navigator"""
 
     try:
         endpoint_name = "/schedule_carenavigator_call"
-        users_info = userinfo_by_name_query(dynamic_constants, searchQuery=memberName)
-        user_names_list = users_info.get("users", [])
-        if not user_names_list:
-            return {"error": f"No members found matching the search query: '{memberName}'."}
-        member_lookup = {user["memberName"]: user["userId"] for user in user_names_list}
-        userId = member_lookup.get(memberName)
-        data = {"userId": userId,"date": appointmentDateTime}
+        users_info = _member_search(dynamic_constants, memberName).collect(**_first_member_named(memberName))
+        data = _call_with_cn_payload(users_info, memberName, appointmentDateTime)
+        if "error" in data:
+            return data
         output = make_request(data=data, endpoint_name=endpoint_name, access_token=dynamic_constants.access_token)
         return output
     except Exception as e:
        return {"error": "Sorry, I couldn't schedule a call at this time. Please try again later."}
 
+async def aschedule_call_with_cn(dynamic_constants: DynamicConstants, memberName: str, appointmentDateTime):
+    try:
+        endpoint_name = "/schedule_carenavigator_call"
+        users_info = await _member_search(dynamic_constants, memberName).acollect(**_first_member_named(memberName))
+        data = _call_with_cn_payload(users_info, memberName, appointmentDateTime)
+        if "error" in data:
+            return data
+        return await make_request_async(data=data, endpoint_name=endpoint_name, access_token=dynamic_constants.access_token)
+    except Exception as e:
+       return {"error": "Sorry, I couldn't schedule a call at this time. Please try again later."}
+
 def member_profile_details(dynamic_constants: DynamicConstants):
     """Retrieve all available information about a member"""
 
@@ -556,6 +612,7 @@ def member_profile_details(dynamic_constants: DynamicConstants):
         endpoint_name = "/fetch_user_profile_v2"
         data = {"userId": dynamic_constants.user_id}
         output = make_request(data=data, endpoint_name=endpoint_name, access_token=dynamic_constants.access_token)
+        dynamic_constants.entities.put("profile", output)
         return output.get("data", {})
     except Exception as e:
         return {"error": "Sorry, I can't fetch user profile details at this moment."}
@@ -565,8 +622,9 @@ def user_health_metric_data(dynamic_constants: DynamicConstants, metricName: str
 
     try:
         endpoint_name = "/fetch_vital_graph"
-        metrics_lookup = {entry["metricsName"]: entry for entry in dynamic_constants.metrics_details_list}
-        details = metrics_lookup.get(metricName)
+        details = dynamic_constants.metrics_index.get(metricName)
+        if details is None:
+            return {"error": f"Sorry, the selected metric name {metricName} is not available.{dynamic_constants.metrics_index.hint(metricName)}"}
         # print("details--------------------------------------------------------------------------------------------------------", details)
         metricsId = details["metricsId"]
         if metricsId is None:
@@ -611,7 +669,7 @@ def add_member_record(dynamic_constants: DynamicConstants, reportType: str, desc
             return {"error": file["error"]}
         file_data = file.get("fileData")
         file_name = file.get("originalFileName")
-        data = {"userId": dynamic_constants.user_id, "formData": {"reportTypeId": dynamic_constants.report_type_lookup.get(reportType), "title": description, "file": file_data,"originalName": file_name}}
+        data = {"userId": dynamic_constants.user_id, "formData": {"reportTypeId": dynamic_constants.report_type_index.get(reportType), "title": description, "file": file_data,"originalName": file_name}}
         output = make_request(data=data, endpoint_name=endpoint_name, access_token=dynamic_constants.access_token)
         return output
     except Exception as e:
@@ -622,8 +680,9 @@ def health_locker_files(dynamic_constants: DynamicConstants, reportType: str):
 
     try:
         endpoint_name = "/fetch_healthlocker_files_v2"
-        data = {"userId": dynamic_constants.user_id, "reportTypeId": dynamic_constants.report_type_lookup.get(reportType)}
+        data = {"userId": dynamic_constants.user_id, "reportTypeId": dynamic_constants.report_type_index.get(reportType)}
         output = make_request(data=data, endpoint_name=endpoint_name, access_token=dynamic_constants.access_token)
+        dynamic_constants.entities.put("locker_files", output.get("data"), key=reportType)
         return output.get("data", {})
     except Exception as e:
        return {"error": "Sorry, I couldn't retrieve the health locker files at this moment."}
@@ -633,15 +692,11 @@ def view_specific_record(dynamic_constants: DynamicConstants, reportType: str, f
 
     try:
         endpoint_name = "/fetch_healthlocker_file_url"
-        file_list_data = health_locker_files(dynamic_constants, reportType)
+        file_list_data = dynamic_constants.entities.fetch("locker_files", lambda: health_locker_files(dynamic_constants, reportType), key=reportType)
         # print("file_list_data-------------------------------------------------------------------------", file_list_data)
-        file_id = None
         files = file_list_data.get("files", [])
         print("files-------------------------------------------------------------------------", files)
-        for file_info in files:
-            if file_info.get("fileId") == fileId:
-                file_id = file_info.get("fileId")
-                break
+        file_id = ({_id_key(f.get("fileId")): f for f in files}.get(_id_key(fileId)) or {}).get("fileId")
         if file_id is None:
             return {"error": f"Sorry, the file '{fileId}' was not found under the '{reportType}' category."}
         
@@ -657,13 +712,9 @@ def remove_specific_record(dynamic_constants: DynamicConstants, reportType: str,
 
     try:
         endpoint_name = "/remove_healthlocker_files"
-        file_list_data = health_locker_files(dynamic_constants, reportType)
-        file_id = None
+        file_list_data = dynamic_constants.entities.fetch("locker_files", lambda: health_locker_files(dynamic_constants, reportType), key=reportType)
         files = file_list_data.get("files", [])
-        for file_info in files:
-            if file_info.get("fileId") == fileId:
-                file_id = file_info.get("fileId")
-                break
+        file_id = ({_id_key(f.get("fileId")): f for f in files}.get(_id_key(fileId)) or {}).get("fileId")
         if file_id is None:
             return {"error": f"File '{fileId}' not found under report type '{reportType}'."}
         
@@ -719,7 +770,7 @@ def get_all_members_stratification(dynamic_constants: DynamicConstants, conditio
 
     try:
         endpoint_name = "/diabetic_data"
-        data = {"extraParams": {"conditionId": dynamic_constants.condition_lookup.get(conditionName)}}
+        data = {"extraParams": {"conditionId": dynamic_constants.condition_index.get(conditionName)}}
         output = make_request(data=data, endpoint_name=endpoint_name, access_token=dynamic_constants.access_token)
         return output.get("data", {})
     except Exception as e:
@@ -730,7 +781,7 @@ def get_all_members_pathway_breakup(dynamic_constants: DynamicConstants, conditi
 
     try:
         endpoint_name = "/pathway_breakup_v2"
-        data = {"conditionId": dynamic_constants.condition_lookup.get(conditionName)}
+        data = {"conditionId": dynamic_constants.condition_index.get(conditionName)}
         output = make_request(data=data, endpoint_name=endpoint_name, access_token=dynamic_constants.access_token)
         return output.get("data", {})
     except Exception as e:
@@ -752,7 +803,7 @@ def get_requested_services(dynamic_constants: DynamicConstants, startDate: str,
 
     try:
         endpoint_name = "/fetch_home_based_service_tracking_v2"
-        request_type_code = dynamic_constants.request_type_lookup.get(requestType)
+        request_type_code = dynamic_constants.request_type_index.get(requestType)
         data = {"requestType": request_type_code, "requestStartDate": startDate, "requestEndDate": endDate, "requestStatus": requestStatus}
         output = make_request(data=data, endpoint_name=endpoint_name, access_token=dynamic_constants.access_token)
         return output.get("data", {})
@@ -766,6 +817,7 @@ def get_working_plans_and_breaks(dynamic_constants: DynamicConstants):
         endpoint_name = "/fetch_working_plans_and_breaks"
         data = {}
         output = make_request(data=data, endpoint_name=endpoint_name, access_token=dynamic_constants.access_token)
+        dynamic_constants.entities.put("breaks", output.get("data"))
         return output.get("data", {})
     except Exception as e:
         return {"error": "Sorry, I can't retrieve working plans and breaks at the moment. Please try again later."}
@@ -787,9 +839,9 @@ def delete_break(dynamic_constants: DynamicConstants, startDateTime: str, endDat
 
     try:
         endpoint_name = "/remove_appointment_break"
-        plan_breaks = get_working_plans_and_breaks(dynamic_constants)
+        plan_breaks = dynamic_constants.entities.fetch("breaks", lambda: get_working_plans_and_breaks(dynamic_constants))
         all_breaks = plan_breaks.get("breaks", [])
-        selected_break = next((b for b in all_breaks if b.get("start") == startDateTime and b.get("end") == endDateTime), None)
+        selected_break = {(b.get("start"), b.get("end")): b for b in all_breaks}.get((startDateTime, endDateTime))
         if not selected_break:
             return {"error": f"No break found from '{startDateTime}' to {endDateTime} for carenavigator"}
         breakId = selected_break.get("id")
@@ -803,13 +855,17 @@ def search_view_member_under_cn(dynamic_constants: DynamicConstants, searchStr:
     """"Searches and views member under the care navigator"""
 
     try:
-        endpoint_name = "/fetch_users_list_v2"
-        data = { "searchStr": searchStr, "appliedFilter": {}, "pageNumber": 1, "messageStatus": "all"}
-        output = make_request(data=data, endpoint_name=endpoint_name, access_token=dynamic_constants.access_token)
+        output = _member_search(dynamic_constants, searchStr, messageStatus="all").collect(limit=MEMBER_SEARCH_LIMIT)
         return output
     except Exception as e:
         return {"error": "Sorry, I can't search or view members at the moment. Please try again later."}
 
+async def asearch_view_member_under_cn(dynamic_constants: DynamicConstants, searchStr: str = ""):
+    try:
+        return await _member_search(dynamic_constants, searchStr, messageStatus="all").acollect(limit=MEMBER_SEARCH_LIMIT)
+    except Exception as e:
+        return {"error": "Sorry, I can't search or view members at the moment. Please try again later."}
+
 def get_calender_calls(dynamic_constants: DynamicConstants):
     """"Retrieves all the scheduled, cancelled or completed calls for all mambers under a care navigator"""
 
@@ -827,8 +883,7 @@ def add_bmi(dynamic_constants: DynamicConstants, height: int, weight: int, metri
     try:
         endpoint_name = "/add_metrics_weight"
         metricsName = "BMI"
-        metrics_lookup = {entry["metricsName"]: entry for entry in dynamic_constants.metrics_details_list}
-        details = metrics_lookup.get(metricsName)
+        details = dynamic_constants.metrics_index.get(metricsName)
         if details is None:
             return {"error": f"The metric '{metricsName}' was not found."}
         metricsId = details["metricsId"]
@@ -895,13 +950,12 @@ def get_task_list(dynamic_constants: DynamicConstants, startDate: str, endDate:
             "searchCompletedBy": "",
             "searchContract": "",
             "calledFrom": "tasklist",
-            "page": 1,
-            "perPage": 1000,  
             "sortColumn": "",
             "sortDirection": "asc",
             "download": "N"
         } 
-        output = make_request(data=data, endpoint_name=endpoint_name, access_token=dynamic_constants.access_token)
+        output = PagedRequest(endpoint_name, data, dynamic_constants.access_token, items_key="tasks",
+                              per_page_key="perPage", per_page=TASK_PAGE_SIZE).collect()
         return output
     except Exception as e:
         return {"error": "Sorry, I can't fetch care navigator's task list at the moment. Please try again later."}
@@ -928,9 +982,9 @@ def transfer_task(dynamic_constants: DynamicConstants, taskId: int, careNavigato
 
     try:
         endpoint_name = "/transfer_task"
-        care_navigator_id = dynamic_constants.care_navigator_lookup.get(careNavigatorName)
+        care_navigator_id = dynamic_constants.care_navigator_index.get(careNavigatorName)
         if not care_navigator_id:
-            return {"error": f"The care navigator '{careNavigatorName}' was not found. Please provide a valid name."}
+            return {"error": f"The care navigator '{careNavigatorName}' was not found.{dynamic_constants.care_navigator_index.hint(careNavigatorName)} Please provide a valid name."}
         data = {"taskId": taskId, "transferredToCNID": care_navigator_id, "transferRemarks": transferRemarks}
         output = make_request(
             data=data,
@@ -973,6 +1027,28 @@ def complete_task(dynamic_constants: DynamicConstants, taskId: int, completionOu
     except Exception as e:
         return {"error": "Sorry, I can't complete the task at the moment. Please try again later."}
 
+def more_tool_results(dynamic_constants: DynamicConstants, toolName: str, listName: str, offset: int = 0):
+    """Pages through a list that was cut short in an earlier tool result"""
+
+    try:
+        items = dynamic_constants.result_pages.get((toolName, listName))
+        if items is None:
+            return {"error": f"No stored results for '{listName}' from '{toolName}'. Please call '{toolName}' again."}
+        return project_list(toolName, listName, items, offset=int(offset))
+    except Exception as e:
+        return {"error": "Sorry, I can't fetch more results at the moment. Please try again later."}
+
+def member_option_lists(dynamic_constants: DynamicConstants, listName: str):
+    """Loads member-specific option names on demand"""
+
+    try:
+        field = MEMBER_OPTION_LISTS.get(listName)
+        if not field:
+            return {"error": f"Unknown list '{listName}'. Available lists: {list(MEMBER_OPTION_LISTS)}"}
+        return {"listName": listName, "options": getattr(dynamic_constants, field)}
+    except Exception as e:
+        return {"error": "Sorry, I can't load those options at the moment. Please try again later."}
+
 TOOL_MAP = {
     "add_note": add_note,
     "disenroll_member": disenroll_member,
@@ -1029,4 +1105,14 @@ TOOL_MAP = {
     "transfer_task": transfer_task, 
     "fetch_monthly_service_suggestions": fetch_monthly_service_suggestions,
     "complete_task": complete_task,
+    "more_tool_results": more_tool_results,
+    "member_option_lists": member_option_lists,
+}
+
+# Async twins of paged tools; ask_async awaits these on the event loop instead of running the
+# TOOL_MAP function on a worker thread. Same arguments and results as their TOOL_MAP entries.
+ASYNC_TOOL_MAP = {
+    "userinfo_by_name_query": auserinfo_by_name_query,
+    "schedule_call_with_cn": aschedule_call_with_cn,
+    "search_view_member_under_cn": asearch_view_member_under_cn,
 }
@@ -0,0 +1,108 @@
+import os
+import re
+from typing import Dict, FrozenSet, Iterable, List
+
+from google.genai import types
+
+from tool_config import TOOLS
+
+# Send only the declarations relevant to the current request instead of all of TOOLS. Applies to
+# uncached requests only: a cached prefix (prompt_cache) always carries the full list.
+TOOL_ROUTING = os.getenv("TOOL_ROUTING", "1") == "1"
+
+# The four tool groups described to the model in system_prompt.get_static_system_prompt
+MEMBER_TOOLS = [
+    "add_note", "disenroll_member", "add_health_metric", "add_new_service", "raise_new_ticket", "assign_program",
+    "user_assigned_programs", "stop_condition", "restart_condition", "remove_condition", "change_pathway",
+    "member_upcoming_scheduled_call", "cancel_or_reschedule_call", "available_tickets", "add_comment_on_ticket",
+    "lab_request", "home_care_request", "homebase_vaccine_request", "member_profile_details", "user_health_metric_data",
+    "member_notes_history", "member_journey", "add_member_record", "health_locker_files", "view_specific_record",
+    "remove_specific_record", "add_bmi", "member_call_history", "get_member_services", "get_task_list",
+]
+GENERAL_TOOLS = [
+    "services_by_category", "program_details", "available_pathways_for_program_condition", "lab_providers",
+    "homecare_lab_providers", "homecare_health_products",
+]
+CN_TEAM_TOOLS = [
+    "scheduled_calls_under_cn", "userinfo_by_name_query", "schedule_call_with_cn", "get_all_care_navigator_scheduled_calls",
+    "get_todays_tasks", "get_weekly_summary", "get_all_members_stratification", "get_all_members_pathway_breakup",
+    "get_new_report_members", "get_requested_services", "search_view_member_under_cn", "get_calender_calls", "get_task_list",
+]
+CN_SELF_TOOLS = ["get_working_plans_and_breaks", "add_break", "delete_break"]
+
+TOOL_GROUPS: Dict[str, List[str]] = {
+    "member": MEMBER_TOOLS,
+    "general": GENERAL_TOOLS,
+    "cn_team": CN_TEAM_TOOLS,
+    "cn_self": CN_SELF_TOOLS,
+}
+
+# Tools outside the prompt's groups
+ALWAYS_TOOLS = ["more_tool_results", "member_option_lists"]
+GROUP_EXTRAS: Dict[str, List[str]] = {
+    "member": ["fetch_monthly_service_suggestions", "dismiss_task", "transfer_task", "complete_task"],
+    "cn_team": ["dismiss_task", "transfer_task", "complete_task"],
+}
+
+# Groups offered from member state alone; a message cue below adds a group on top
+GROUPS_WITH_MEMBER = ("member", "general")
+GROUPS_WITHOUT_MEMBER = ("general", "cn_team", "cn_self")
+GROUP_HINTS: Dict[str, "re.Pattern"] = {
+    "cn_team": re.compile(
+        r"\b(all (of )?(my )?members|my members|members under|today'?s tasks?|weekly summary|stratification|"
+        r"pathway breakup|new reports?|requested services|calend[ae]r|scheduled calls|team|search|find (a )?member|"
+        r"schedule (a )?call)\b", re.I),
+    "cn_self": re.compile(r"\b(breaks?|working plans?|working hours|shifts?)\b", re.I),
+}
+
+_DECLARATIONS = [d for tool in TOOLS for d in (tool.function_declarations or [])]
+_subsets: Dict[FrozenSet[str], List[types.Tool]] = {}
+
+def _declaration_name(declaration) -> str:
+    return declaration["name"] if isinstance(declaration, dict) else declaration.name
+
+def member_selected(dynamic_constants) -> bool:
+    """Same test as the prompt's member login status."""
+    profile = dynamic_constants.user_profile
+    return bool(profile and isinstance(profile.get("data"), dict) and profile["data"].get("info"))
+
+def _called_tools(contents: Iterable[types.Content]) -> List[str]:
+    names = []
+    for content in contents:
+        for part in (getattr(content, "parts", None) or []):
+            call = getattr(part, "function_call", None)
+            if call and call.name:
+                names.append(call.name)
+    return names
+
+def select_groups(dynamic_constants, user_message: str = "", contents: Iterable[types.Content] = ()) -> List[str]:
+    """
+    Groups from member state, plus any group the message hints at, plus the groups of tools already
+    called in the kept history (whole groups, so the number of distinct tool sets stays small).
+    """
+    groups = list(GROUPS_WITH_MEMBER if member_selected(dynamic_constants) else GROUPS_WITHOUT_MEMBER)
+    for group, pattern in GROUP_HINTS.items():
+        if group not in groups and pattern.search(user_message or ""):
+            groups.append(group)
+    for name in _called_tools(contents):
+        if not any(name in TOOL_GROUPS[g] or name in GROUP_EXTRAS.get(g, []) for g in groups):
+            groups.extend(g for g, tools in TOOL_GROUPS.items()
+                          if (name in tools or name in GROUP_EXTRAS.get(g, [])) and g not in groups)
+    return groups
+
+def select_tools(dynamic_constants, user_message: str = "", contents: Iterable[types.Content] = ()) -> List[types.Tool]:
+    """
+    The TOOLS subset for one uncached turn. Subsets are memoised so repeated selections return the
+    same list object.
+    """
+    if not TOOL_ROUTING:
+        return TOOLS
+    names = set(ALWAYS_TOOLS)
+    for group in select_groups(dynamic_constants, user_message, contents):
+        names.update(TOOL_GROUPS[group])
+        names.update(GROUP_EXTRAS.get(group, []))
+    key = frozenset(names)
+    if key not in _subsets:
+        declarations = [d for d in _DECLARATIONS if _declaration_name(d) in key]
+        _subsets[key] = [types.Tool(function_declarations=declarations)]
+    return _subsets[key]
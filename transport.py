@@ -0,0 +1,69 @@
+import asyncio
+import os
+import threading
+from typing import Optional
+
+import httpx
+import requests
+from requests.adapters import HTTPAdapter
+
+# Every backend call goes to the same BASE_URL host, so the pool size is effectively the per-host limit.
+MAX_CONNECTIONS_PER_HOST = int(os.getenv("HTTP_MAX_CONNECTIONS_PER_HOST", "32"))
+CONNECT_TIMEOUT = float(os.getenv("HTTP_CONNECT_TIMEOUT", "5"))
+READ_TIMEOUT = float(os.getenv("HTTP_READ_TIMEOUT", "30"))
+KEEPALIVE_EXPIRY = float(os.getenv("HTTP_KEEPALIVE_EXPIRY", "60"))
+
+_sync_session = None
+_sync_lock = threading.Lock()
+_async_client = None
+_async_client_loop = None
+
+def get_session() -> requests.Session:
+    """Shared keep-alive session; `pool_block` makes callers wait for a free connection instead of opening extras."""
+    global _sync_session
+    if _sync_session is None:
+        with _sync_lock:
+            if _sync_session is None:
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=4, pool_maxsize=MAX_CONNECTIONS_PER_HOST, pool_block=True)
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                _sync_session = session
+    return _sync_session
+
+def get_async_client() -> httpx.AsyncClient:
+    """Shared async client for the running event loop (recreated if the loop changes, e.g. under tests)."""
+    global _async_client, _async_client_loop
+    loop = asyncio.get_running_loop()
+    if _async_client is None or _async_client_loop is not loop or _async_client.is_closed:
+        _async_client = httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=MAX_CONNECTIONS_PER_HOST,
+                max_keepalive_connections=MAX_CONNECTIONS_PER_HOST,
+                keepalive_expiry=KEEPALIVE_EXPIRY,
+            ),
+            timeout=httpx.Timeout(READ_TIMEOUT, connect=CONNECT_TIMEOUT),
+        )
+        _async_client_loop = loop
+    return _async_client
+
+def post(url: str, json=None, headers=None, content: Optional[bytes] = None, stream: bool = False) -> requests.Response:
+    """`content` sends a prebuilt body as-is; with `stream` the caller reads the body and must close the response."""
+    return get_session().post(url, json=json, data=content, headers=headers, stream=stream,
+                              timeout=(CONNECT_TIMEOUT, READ_TIMEOUT))
+
+async def apost(url: str, json=None, headers=None, content: Optional[bytes] = None, stream: bool = False) -> httpx.Response:
+    """Async `post`; a streamed response must be closed with `await res.aclose()`."""
+    client = get_async_client()
+    request = client.build_request("POST", url, json=json, content=content, headers=headers)
+    return await client.send(request, stream=stream)
+
+async def aclose() -> None:
+    """Close both pools at shutdown."""
+    global _async_client, _sync_session
+    if _async_client is not None and not _async_client.is_closed:
+        await _async_client.aclose()
+    _async_client = None
+    if _sync_session is not None:
+        _sync_session.close()
+    _sync_session = None
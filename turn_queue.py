@@ -0,0 +1,116 @@
+import asyncio
+import os
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, Hashable, Optional, Tuple
+
+TURN_QUEUE_MAX_DEPTH = int(os.getenv("TURN_QUEUE_MAX_DEPTH", "3"))        # waiting turns per session
+TURN_COALESCE_WINDOW = float(os.getenv("TURN_COALESCE_WINDOW", "3.0"))   # seconds
+
+QUEUED, MERGED, BUSY = "queued", "merged", "busy"
+
+def _normalize(message: str) -> str:
+    return " ".join((message or "").split()).casefold()
+
+class Turn:
+    __slots__ = ("message", "origin", "run", "future", "submitted_at")
+
+    def __init__(self, message: str, run: Callable[[], Awaitable[Any]], origin: Hashable = None):
+        self.message = _normalize(message)
+        self.origin = origin
+        self.run = run
+        self.future: asyncio.Future = asyncio.get_running_loop().create_future()
+        self.submitted_at = time.monotonic()
+
+class TurnQueue:
+    """
+    Runs one session's turns strictly one at a time, in arrival order, on a single worker task.
+    A message identical to the latest submitted turn from the same origin (socket) within
+    `coalesce_window` joins that turn instead of starting another; beyond `max_depth` waiting
+    turns new ones are refused.
+    """
+
+    def __init__(self, max_depth: int = TURN_QUEUE_MAX_DEPTH, coalesce_window: float = TURN_COALESCE_WINDOW,
+                 on_idle: Optional[Callable[[], None]] = None):
+        self.max_depth = max_depth
+        self.coalesce_window = coalesce_window
+        self.on_idle = on_idle
+        self._pending: Deque[Turn] = deque()
+        self._running: Optional[Turn] = None
+        self._latest: Optional[Turn] = None
+        self._worker: Optional[asyncio.Task] = None
+
+    @property
+    def depth(self) -> int:
+        return len(self._pending) + (1 if self._running else 0)
+
+    def submit(self, message: str, run: Callable[[], Awaitable[Any]],
+               origin: Hashable = None) -> Tuple[str, Optional[asyncio.Future]]:
+        """(QUEUED, future) for a new turn, (MERGED, future of the turn it joined) or (BUSY, None)."""
+        latest = self._latest
+        if (latest is not None and not latest.future.done() and latest.origin == origin
+                and latest.message == _normalize(message)
+                and time.monotonic() - latest.submitted_at <= self.coalesce_window):
+            return MERGED, latest.future
+        if len(self._pending) >= self.max_depth:
+            return BUSY, None
+        turn = Turn(message, run, origin)
+        self._pending.append(turn)
+        self._latest = turn
+        if self._worker is None or self._worker.done():
+            self._worker = asyncio.create_task(self._drain())
+        return QUEUED, turn.future
+
+    async def _drain(self) -> None:
+        while self._pending:
+            turn = self._running = self._pending.popleft()
+            # the handler awaiting a turn may have been cancelled (disconnect), cancelling the future
+            try:
+                result = await turn.run()
+                if not turn.future.done():
+                    turn.future.set_result(result)
+            except asyncio.CancelledError:
+                turn.future.cancel()
+                raise
+            except Exception as exc:
+                if not turn.future.done():
+                    turn.future.set_exception(exc)
+            finally:
+                self._running = None
+        if self.on_idle:
+            self.on_idle()
+
+class TurnQueues:
+    """TurnQueue per session key; a queue is dropped as soon as it drains."""
+
+    def __init__(self, max_depth: int = TURN_QUEUE_MAX_DEPTH, coalesce_window: float = TURN_COALESCE_WINDOW):
+        self.max_depth = max_depth
+        self.coalesce_window = coalesce_window
+        self._queues: Dict[Hashable, TurnQueue] = {}
+        self.merged = 0
+        self.rejected = 0
+
+    def submit(self, key: Hashable, message: str, run: Callable[[], Awaitable[Any]],
+               origin: Hashable = None) -> Tuple[str, Optional[asyncio.Future]]:
+        queue = self._queues.get(key)
+        if queue is None:
+            queue = self._queues[key] = TurnQueue(self.max_depth, self.coalesce_window,
+                                                  on_idle=lambda: self._drop_if_idle(key))
+        status, future = queue.submit(message, run, origin)
+        if status == MERGED:
+            self.merged += 1
+        elif status == BUSY:
+            self.rejected += 1
+        return status, future
+
+    def _drop_if_idle(self, key: Hashable) -> None:
+        queue = self._queues.get(key)
+        if queue is not None and queue.depth == 0:
+            del self._queues[key]
+
+    def depth(self, key: Hashable) -> int:
+        queue = self._queues.get(key)
+        return queue.depth if queue else 0
+
+    def total_depth(self) -> int:
+        return sum(q.depth for q in self._queues.values())